@@ -19,7 +19,11 @@ import jwt
 import threading
 from pathlib import Path
 import requests
-from collections import defaultdict, deque
+import atexit
+import bisect
+from collections import defaultdict, deque, OrderedDict
+
+from wsgi_server import ServerConfig, serve_wsgi, is_production_mode
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -93,45 +97,431 @@ class APIRequest:
         data['timestamp'] = self.timestamp.isoformat()
         return data
 
-class RateLimiter:
-    """Limiteur de débit avec fenêtre glissante"""
+def _gcra_check(tat: float, now: float, limit: int, window_seconds: int,
+                consume: bool = True) -> tuple:
+    """
+    Algorithme GCRA (seau à jetons à état unique) : `tat` est l'instant
+    d'arrivée théorique. Autorise une rafale de `limit` requêtes puis un
+    débit de `limit` requêtes par fenêtre. Retourne (autorisé, nouveau_tat, restant).
+    """
+    interval = window_seconds / max(limit, 1)
+    tat = max(tat, now)
+    new_tat = tat + interval
     
-    def __init__(self):
-        self.requests = defaultdict(deque)
-        self.lock = threading.Lock()
+    if new_tat - now > window_seconds + 1e-9:
+        remaining = int((now + window_seconds - tat) / interval)
+        return False, tat, max(0, remaining)
     
-    def is_allowed(self, key: str, limit: int, window_seconds: int = 60) -> bool:
-        """Vérifie si la requête est autorisée"""
+    if not consume:
+        new_tat = tat
+    remaining = int((now + window_seconds - new_tat) / interval)
+    return True, new_tat, max(0, min(limit, remaining))
+
+class MemoryRateLimitBackend:
+    """État de limitation en mémoire, verrous répartis par hachage de clé"""
+    
+    def __init__(self, stripes: int = 64, sweep_interval: float = 60.0):
+        self.stripes = [({}, threading.Lock()) for _ in range(stripes)]
+        self.sweep_interval = sweep_interval
+        self.last_sweep = [time.time()] * stripes
+    
+    def check(self, key: str, limit: int, window_seconds: int, consume: bool = True) -> tuple:
+        """Applique le GCRA sur l'état de la clé, retourne (autorisé, restant)"""
+        index = hash(key) % len(self.stripes)
+        states, lock = self.stripes[index]
         now = time.time()
         
-        with self.lock:
-            # Nettoyer les anciennes requêtes
-            while self.requests[key] and self.requests[key][0] < now - window_seconds:
-                self.requests[key].popleft()
+        with lock:
+            allowed, new_tat, remaining = _gcra_check(
+                states.get(key, now), now, limit, window_seconds, consume
+            )
+            if allowed and consume:
+                states[key] = new_tat
             
-            # Vérifier la limite
-            if len(self.requests[key]) >= limit:
-                return False
+            if now - self.last_sweep[index] > self.sweep_interval:
+                self._sweep_locked(states, now)
+                self.last_sweep[index] = now
+        
+        return allowed, remaining
+    
+    def _sweep_locked(self, states: Dict[str, float], now: float):
+        # Une clé dont le TAT est passé a un seau plein : son état est superflu
+        for key in [k for k, tat in states.items() if tat <= now]:
+            del states[key]
+    
+    def size(self) -> int:
+        return sum(len(states) for states, _ in self.stripes)
+
+class SQLiteRateLimitBackend:
+    """
+    État de limitation partagé via SQLite, pour que les limites tiennent
+    entre plusieurs processus de la passerelle sur la même machine.
+    """
+    
+    def __init__(self, db_path: str = "api_rate_limits.db", sweep_interval: float = 300.0):
+        self.db_path = db_path
+        self.sweep_interval = sweep_interval
+        self.last_sweep = time.time()
+        self.local = threading.local()
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    key TEXT PRIMARY KEY,
+                    tat REAL NOT NULL
+                )
+            """)
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            self.local.conn = conn
+        return conn
+    
+    def check(self, key: str, limit: int, window_seconds: int, consume: bool = True) -> tuple:
+        """Applique le GCRA dans une transaction d'écriture, retourne (autorisé, restant)"""
+        conn = self._get_connection()
+        now = time.time()
+        
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            allowed, new_tat, remaining = _gcra_check(
+                row[0] if row else now, now, limit, window_seconds, consume
+            )
+            if allowed and consume:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (key, tat) VALUES (?, ?)",
+                    (key, new_tat)
+                )
+            
+            if now - self.last_sweep > self.sweep_interval:
+                conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+                self.last_sweep = now
             
-            # Ajouter la requête actuelle
-            self.requests[key].append(now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        
+        return allowed, remaining
+    
+    def size(self) -> int:
+        return self._get_connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+class RateLimiter:
+    """Limiteur de débit GCRA (état O(1) par clé), backend mémoire ou partagé"""
+    
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryRateLimitBackend()
+    
+    def is_allowed(self, key: str, limit: int, window_seconds: int = 60) -> bool:
+        """Vérifie si la requête est autorisée"""
+        try:
+            allowed, _ = self.backend.check(key, limit, window_seconds)
+            return allowed
+        except sqlite3.Error as e:
+            # Backend partagé indisponible : ne pas bloquer le trafic
+            logger.error(f"Erreur limiteur de débit: {e}")
             return True
     
     def get_remaining(self, key: str, limit: int, window_seconds: int = 60) -> int:
         """Retourne le nombre de requêtes restantes"""
-        now = time.time()
+        try:
+            _, remaining = self.backend.check(key, limit, window_seconds, consume=False)
+            return remaining
+        except sqlite3.Error as e:
+            logger.error(f"Erreur limiteur de débit: {e}")
+            return limit
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'backend': type(self.backend).__name__,
+            'tracked_keys': self.backend.size()
+        }
+
+# Bornes supérieures (secondes) des classes de l'histogramme de latence
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+def latency_bucket(response_time: float) -> int:
+    """Indice de la classe d'histogramme (la dernière est ouverte)"""
+    return bisect.bisect_left(LATENCY_BUCKETS, response_time)
+
+def histogram_percentile(histogram: List[int], percentile: float) -> Optional[float]:
+    """Estime un percentile par interpolation linéaire dans sa classe"""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    
+    target = total * percentile / 100.0
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        if count and cumulative + count >= target:
+            lower = LATENCY_BUCKETS[index - 1] if index > 0 else 0.0
+            upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1] * 2
+            return round(lower + (upper - lower) * (target - cumulative) / count, 4)
+        cumulative += count
+    return LATENCY_BUCKETS[-1]
+
+def histogram_percentiles(histogram: List[int]) -> Dict[str, Optional[float]]:
+    return {f'p{p}': histogram_percentile(histogram, p) for p in (50, 95, 99)}
+
+def merge_histograms(target: List[int], source: List[int]):
+    for index, count in enumerate(source):
+        target[index] += count
+
+class APIKeyCache:
+    """Cache borné des clés API validées, invalidé à la révocation"""
+    
+    def __init__(self, max_size: int = 10000, ttl_seconds: int = 60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+    
+    def get(self, key: str) -> Optional[APIKey]:
+        """Retourne la clé en cache si elle n'a pas expiré"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or now - entry[1] > self.ttl_seconds:
+                if entry is not None:
+                    del self.entries[key]
+                self.stats['misses'] += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+    
+    def put(self, api_key: APIKey):
+        """Met en cache une clé validée"""
+        with self.lock:
+            self.entries[api_key.key] = (api_key, time.monotonic())
+            self.entries.move_to_end(api_key.key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+    
+    def invalidate(self, key: str):
+        """Retire une clé du cache (révocation, suspension, modification)"""
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.stats['invalidations'] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {'size': len(self.entries), **self.stats}
+
+class APIWriteBuffer:
+    """
+    Tampon d'écritures différées : compteurs d'utilisation des clés API et
+    journal des requêtes, écrits par lots dans une transaction par un thread de fond.
+    """
+    
+    def __init__(self, db_path: str, flush_interval: float = 2.0,
+                 batch_size: int = 500, max_pending: int = 50000):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        
+        self.usage_counts: Dict[str, List[Any]] = {}  # key -> [incrément, last_used]
+        self.request_rows: deque = deque()
+        # (endpoint, method, minute) -> [requêtes, erreurs, temps total, temps max, histogramme]
+        self.rollups: Dict[tuple, List[Any]] = {}
+        self.user_rollups: Dict[tuple, int] = defaultdict(int)  # (user_id, date) -> requêtes
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = True
+        self.stats = {'flushes': 0, 'requests_written': 0, 'requests_dropped': 0}
+        
+        self.thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.thread.start()
+    
+    def record_usage(self, key: str):
+        """Compte une utilisation de clé API en mémoire"""
+        now = datetime.now().isoformat()
+        with self.lock:
+            entry = self.usage_counts.get(key)
+            if entry is None:
+                self.usage_counts[key] = [1, now]
+            else:
+                entry[0] += 1
+                entry[1] = now
+    
+    def record_request(self, row: tuple):
+        """Ajoute une ligne au journal des requêtes et aux agrégats par minute"""
+        _, endpoint, method, user_id, _, _, _, _, response_code, response_time, timestamp, _ = row
+        minute = timestamp[:16]
         
         with self.lock:
-            # Nettoyer les anciennes requêtes
-            while self.requests[key] and self.requests[key][0] < now - window_seconds:
-                self.requests[key].popleft()
+            rollup = self.rollups.get((endpoint, method, minute))
+            if rollup is None:
+                rollup = [0, 0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1)]
+                self.rollups[(endpoint, method, minute)] = rollup
+            rollup[0] += 1
+            if response_code >= 400:
+                rollup[1] += 1
+            rollup[2] += response_time
+            rollup[3] = max(rollup[3], response_time)
+            rollup[4][latency_bucket(response_time)] += 1
+            if user_id:
+                self.user_rollups[(user_id, timestamp[:10])] += 1
+            
+            dropped = 0
+            if len(self.request_rows) >= self.max_pending:
+                # Sous forte charge on perd les plus anciennes lignes plutôt que de bloquer
+                self.request_rows.popleft()
+                self.stats['requests_dropped'] += 1
+                dropped = self.stats['requests_dropped']
+            self.request_rows.append(row)
+            pending = len(self.request_rows)
+        
+        if dropped % 1000 == 1:
+            logger.warning(f"Journal des requêtes saturé ({self.max_pending} lignes en attente) : "
+                           f"{dropped} lignes perdues au total")
+        if pending >= self.batch_size:
+            self.wakeup.set()
+    
+    def flush(self):
+        """Écrit immédiatement tout ce qui est en attente"""
+        with self.flush_lock:
+            with self.lock:
+                usage = self.usage_counts
+                self.usage_counts = {}
+                rows = list(self.request_rows)
+                self.request_rows.clear()
+                rollups = self.rollups
+                self.rollups = {}
+                user_rollups = self.user_rollups
+                self.user_rollups = defaultdict(int)
+            
+            if not usage and not rows and not rollups:
+                return
             
-            return max(0, limit - len(self.requests[key]))
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    # Verrou d'écriture immédiat : plusieurs workers fusionnent les mêmes agrégats
+                    conn.execute("BEGIN IMMEDIATE")
+                    if usage:
+                        conn.executemany("""
+                            UPDATE api_keys 
+                            SET last_used = ?, usage_count = usage_count + ?
+                            WHERE key = ?
+                        """, [(last_used, count, key) for key, (count, last_used) in usage.items()])
+                    if rows:
+                        conn.executemany("""
+                            INSERT OR IGNORE INTO api_requests 
+                            (id, endpoint, method, user_id, api_key, ip_address, user_agent,
+                             parameters, response_code, response_time, timestamp, error_message)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """, rows)
+                    if rollups:
+                        self._merge_rollups(conn, rollups)
+                    if user_rollups:
+                        conn.executemany("""
+                            INSERT INTO api_user_rollups (user_id, date, request_count)
+                            VALUES (?, ?, ?)
+                            ON CONFLICT(user_id, date) DO UPDATE SET
+                                request_count = request_count + excluded.request_count
+                        """, [(user_id, date, count) for (user_id, date), count in user_rollups.items()])
+                self.stats['flushes'] += 1
+                self.stats['requests_written'] += len(rows)
+            except Exception as e:
+                logger.error(f"Erreur écriture différée API: {e}")
+                # Base verrouillée ou indisponible : tout est remis en attente
+                self._requeue(usage, rows, rollups, user_rollups)
+    
+    def _requeue(self, usage: Dict[str, List[Any]], rows: List[tuple],
+                 rollups: Dict[tuple, List[Any]], user_rollups: Dict[tuple, int]):
+        """Réintègre un lot non écrit devant les écritures arrivées entre-temps"""
+        with self.lock:
+            for key, (count, last_used) in usage.items():
+                entry = self.usage_counts.get(key)
+                if entry is None:
+                    self.usage_counts[key] = [count, last_used]
+                else:
+                    entry[0] += count
+                    entry[1] = max(entry[1], last_used)
+            
+            for key, (count, errors, total, maximum, histogram) in rollups.items():
+                rollup = self.rollups.get(key)
+                if rollup is None:
+                    self.rollups[key] = [count, errors, total, maximum, histogram]
+                else:
+                    rollup[0] += count
+                    rollup[1] += errors
+                    rollup[2] += total
+                    rollup[3] = max(rollup[3], maximum)
+                    merge_histograms(rollup[4], histogram)
+            
+            for key, count in user_rollups.items():
+                self.user_rollups[key] += count
+            
+            # Les lignes du lot sont plus anciennes : elles repassent devant,
+            # dans la limite de max_pending (les plus anciennes sont perdues)
+            room = self.max_pending - len(self.request_rows)
+            kept = rows[-room:] if room > 0 else []
+            dropped = len(rows) - len(kept)
+            self.stats['requests_dropped'] += dropped
+            self.request_rows.extendleft(reversed(kept))
+        
+        if dropped:
+            logger.warning(f"{dropped} lignes du journal des requêtes perdues : file d'attente pleine")
+    
+    def _merge_rollups(self, conn: sqlite3.Connection, rollups: Dict[tuple, List[Any]]):
+        """Fusionne les agrégats en mémoire avec ceux déjà en base"""
+        merged = []
+        for (endpoint, method, minute), (count, errors, total, maximum, histogram) in rollups.items():
+            existing = conn.execute("""
+                SELECT request_count, error_count, total_response_time, max_response_time, latency_histogram
+                FROM api_request_rollups WHERE endpoint = ? AND method = ? AND minute = ?
+            """, (endpoint, method, minute)).fetchone()
+            if existing:
+                count += existing[0]
+                errors += existing[1]
+                total += existing[2]
+                maximum = max(maximum, existing[3])
+                merge_histograms(histogram, json.loads(existing[4]))
+            merged.append((endpoint, method, minute, count, errors, total, maximum, json.dumps(histogram)))
+        
+        conn.executemany("""
+            INSERT OR REPLACE INTO api_request_rollups
+            (endpoint, method, minute, request_count, error_count, total_response_time,
+             max_response_time, latency_histogram)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, merged)
+    
+    def stop(self):
+        """Arrête le thread de fond après une dernière écriture"""
+        self.running = False
+        self.wakeup.set()
+        self.flush()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'pending_requests': len(self.request_rows),
+                'pending_usage_keys': len(self.usage_counts),
+                'pending_rollups': len(self.rollups),
+                **self.stats
+            }
+    
+    def _flush_loop(self):
+        while self.running:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            self.flush()
 
 class APIGateway:
     """Passerelle API enterprise avec fonctionnalités avancées"""
     
-    def __init__(self, db_path: str = "api_gateway.db", secret_key: str = None):
+    def __init__(self, db_path: str = "api_gateway.db", secret_key: str = None,
+                 rate_limit_db_path: Optional[str] = None):
         self.db_path = db_path
         self.secret_key = secret_key or "substans_ai_secret_key_2024"
         self.app = Flask(__name__)
@@ -141,10 +531,23 @@ class APIGateway:
         CORS(self.app, origins=["*"], methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
         
         # Composants
-        self.rate_limiter = RateLimiter()
+        # Backend partagé optionnel pour que les limites tiennent entre processus
+        rate_limit_backend = SQLiteRateLimitBackend(rate_limit_db_path) if rate_limit_db_path else None
+        self.rate_limiter = RateLimiter(rate_limit_backend)
         self.endpoints = {}
         self.middleware_stack = []
         
+        # Chemin critique en mémoire : clés validées en cache, écritures différées.
+        # Les modifications de clés faites par d'autres processus sont relues
+        # dans api_key_changes (identifiant croissant) au plus toutes les
+        # api_key_sync_interval secondes
+        self.api_key_cache = APIKeyCache()
+        self.api_key_change_id = 0
+        self.api_key_sync_interval = 1.0
+        self.api_key_synced_at = time.monotonic()
+        self.api_key_sync_lock = threading.Lock()
+        self.write_buffer = None
+        
         # Configuration par défaut
         self.default_rate_limit = 1000  # requêtes par minute
         self.default_auth_required = True
@@ -157,8 +560,11 @@ class APIGateway:
             'avg_response_time': 0.0,
             'active_connections': 0
         }
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
         
         self._init_database()
+        self.write_buffer = APIWriteBuffer(self.db_path)
+        atexit.register(self.write_buffer.stop)
         self._register_core_endpoints()
         self._setup_middleware()
         
@@ -223,14 +629,97 @@ class APIGateway:
                     unique_users INTEGER NOT NULL
                 );
                 
+                CREATE TABLE IF NOT EXISTS api_request_rollups (
+                    endpoint TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    minute TEXT NOT NULL,
+                    request_count INTEGER NOT NULL,
+                    error_count INTEGER NOT NULL,
+                    total_response_time REAL NOT NULL,
+                    max_response_time REAL NOT NULL,
+                    latency_histogram TEXT NOT NULL,
+                    PRIMARY KEY (endpoint, method, minute)
+                );
+                
+                CREATE TABLE IF NOT EXISTS api_key_changes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    changed_at TEXT NOT NULL
+                );
+                
+                CREATE TABLE IF NOT EXISTS api_user_rollups (
+                    user_id TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    request_count INTEGER NOT NULL,
+                    PRIMARY KEY (user_id, date)
+                );
+                
                 CREATE INDEX IF NOT EXISTS idx_requests_timestamp ON api_requests(timestamp);
                 CREATE INDEX IF NOT EXISTS idx_requests_endpoint ON api_requests(endpoint);
                 CREATE INDEX IF NOT EXISTS idx_analytics_date ON api_analytics(date, hour);
+                CREATE INDEX IF NOT EXISTS idx_rollups_minute ON api_request_rollups(minute);
+                CREATE INDEX IF NOT EXISTS idx_user_rollups_date ON api_user_rollups(date);
+                CREATE INDEX IF NOT EXISTS idx_key_changes_changed_at ON api_key_changes(changed_at);
             """)
+            
+            # Les modifications anciennes ont été vues par tous les workers
+            conn.execute("DELETE FROM api_key_changes WHERE changed_at < ?",
+                         ((datetime.now() - timedelta(days=1)).isoformat(),))
+            self.api_key_change_id = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM api_key_changes"
+            ).fetchone()[0]
+        
+        with sqlite3.connect(self.db_path) as conn:
+            # Verrou d'écriture : un seul worker reconstruit les agrégats
+            conn.execute("BEGIN IMMEDIATE")
+            self._backfill_rollups(conn)
         
         # Créer une clé API par défaut
         self._create_default_api_key()
     
+    def _backfill_rollups(self, conn: sqlite3.Connection):
+        """
+        Construit une fois les agrégats à partir du journal api_requests d'une
+        base antérieure aux agrégats, pour que l'historique reste visible dans
+        les analytics.
+        """
+        if (conn.execute("SELECT 1 FROM api_request_rollups LIMIT 1").fetchone()
+                or conn.execute("SELECT 1 FROM api_user_rollups LIMIT 1").fetchone()
+                or not conn.execute("SELECT 1 FROM api_requests LIMIT 1").fetchone()):
+            return
+        
+        rollups: Dict[tuple, List[Any]] = {}
+        cursor = conn.execute("""
+            SELECT endpoint, method, substr(timestamp, 1, 16), response_code, response_time
+            FROM api_requests
+        """)
+        for endpoint, method, minute, response_code, response_time in cursor:
+            rollup = rollups.get((endpoint, method, minute))
+            if rollup is None:
+                rollup = [0, 0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1)]
+                rollups[(endpoint, method, minute)] = rollup
+            rollup[0] += 1
+            if response_code >= 400:
+                rollup[1] += 1
+            rollup[2] += response_time
+            rollup[3] = max(rollup[3], response_time)
+            rollup[4][latency_bucket(response_time)] += 1
+        
+        conn.executemany("""
+            INSERT INTO api_request_rollups
+            (endpoint, method, minute, request_count, error_count, total_response_time,
+             max_response_time, latency_histogram)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(endpoint, method, minute, count, errors, total, maximum, json.dumps(histogram))
+              for (endpoint, method, minute), (count, errors, total, maximum, histogram) in rollups.items()])
+        conn.execute("""
+            INSERT INTO api_user_rollups (user_id, date, request_count)
+            SELECT user_id, substr(timestamp, 1, 10), COUNT(*) FROM api_requests
+            WHERE user_id IS NOT NULL AND user_id != ''
+            GROUP BY user_id, substr(timestamp, 1, 10)
+        """)
+        logger.info(f"Agrégats reconstruits depuis le journal des requêtes: {len(rollups)} minutes")
+    
     def _create_default_api_key(self):
         """Crée une clé API par défaut"""
         default_key = "substans_ai_master_key_2024"
@@ -266,9 +755,57 @@ class APIGateway:
                 api_key.last_used.isoformat() if api_key.last_used else None,
                 api_key.usage_count, api_key.status
             ))
+            self._record_api_key_change(conn, api_key.key)
         
+        self.api_key_cache.invalidate(api_key.key)
         logger.info(f"Clé API créée: {api_key.name}")
     
+    def update_api_key_status(self, key: str, status: str) -> bool:
+        """Change le statut d'une clé API ('active', 'suspended', 'expired', 'revoked')"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("UPDATE api_keys SET status = ? WHERE key = ?", (status, key))
+            updated = cursor.rowcount > 0
+            if updated:
+                self._record_api_key_change(conn, key)
+        
+        # Invalidation immédiate : la prochaine requête relit la base ; les
+        # autres processus invalident à leur prochaine synchronisation
+        self.api_key_cache.invalidate(key)
+        
+        if updated:
+            logger.info(f"Statut de clé API mis à jour: {status}")
+        return updated
+    
+    def revoke_api_key(self, key: str) -> bool:
+        """Révoque une clé API"""
+        return self.update_api_key_status(key, 'revoked')
+    
+    def _record_api_key_change(self, conn: sqlite3.Connection, key: str):
+        """Signale une modification de clé aux autres processus (même transaction)"""
+        conn.execute("INSERT INTO api_key_changes (key, changed_at) VALUES (?, ?)",
+                     (key, datetime.now().isoformat()))
+    
+    def _sync_api_key_changes(self):
+        """Invalide les clés modifiées par d'autres processus depuis la dernière lecture"""
+        if time.monotonic() - self.api_key_synced_at < self.api_key_sync_interval:
+            return
+        # Une seule synchronisation à la fois, les autres threads ne l'attendent pas
+        if not self.api_key_sync_lock.acquire(blocking=False):
+            return
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute("""
+                    SELECT id, key FROM api_key_changes WHERE id > ? ORDER BY id
+                """, (self.api_key_change_id,)).fetchall()
+            for change_id, key in rows:
+                self.api_key_cache.invalidate(key)
+                self.api_key_change_id = change_id
+            self.api_key_synced_at = time.monotonic()
+        except Exception as e:
+            logger.error(f"Erreur synchronisation des clés API: {e}")
+        finally:
+            self.api_key_sync_lock.release()
+    
     def get_api_key(self, key: str) -> Optional[APIKey]:
         """Récupère une clé API"""
         with sqlite3.connect(self.db_path) as conn:
@@ -379,12 +916,18 @@ class APIGateway:
         
         api_key_value = auth_header[7:]  # Enlever "Bearer "
         
-        # Vérifier la clé API
-        api_key = self.get_api_key(api_key_value)
+        # Vérifier la clé API (cache mémoire, base en cas d'absence)
+        self._sync_api_key_changes()
+        api_key = self.api_key_cache.get(api_key_value)
+        if api_key is None:
+            api_key = self.get_api_key(api_key_value)
+            if api_key and api_key.is_valid():
+                self.api_key_cache.put(api_key)
+        
         if not api_key or not api_key.is_valid():
             return {'success': False, 'error': 'Invalid or expired API key'}
         
-        # Mettre à jour l'utilisation
+        # Compter l'utilisation (écrite périodiquement par lots)
         self._update_api_key_usage(api_key_value)
         
         return {
@@ -395,12 +938,7 @@ class APIGateway:
     
     def _update_api_key_usage(self, key: str):
         """Met à jour l'utilisation d'une clé API"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                UPDATE api_keys 
-                SET last_used = ?, usage_count = usage_count + 1
-                WHERE key = ?
-            """, (datetime.now().isoformat(), key))
+        self.write_buffer.record_usage(key)
     
     def _log_request(self, request_id: str, endpoint: APIEndpoint, 
                     response_code: int, response_time: float, 
@@ -421,19 +959,13 @@ class APIGateway:
             error_message=error_message
         )
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO api_requests 
-                (id, endpoint, method, user_id, api_key, ip_address, user_agent,
-                 parameters, response_code, response_time, timestamp, error_message)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                api_request.id, api_request.endpoint, api_request.method,
-                api_request.user_id, api_request.api_key, api_request.ip_address,
-                api_request.user_agent, json.dumps(api_request.parameters),
-                api_request.response_code, api_request.response_time,
-                api_request.timestamp.isoformat(), api_request.error_message
-            ))
+        self.write_buffer.record_request((
+            api_request.id, api_request.endpoint, api_request.method,
+            api_request.user_id, api_request.api_key, api_request.ip_address,
+            api_request.user_agent, json.dumps(api_request.parameters),
+            api_request.response_code, api_request.response_time,
+            api_request.timestamp.isoformat(), api_request.error_message
+        ))
     
     def _update_stats(self, success: bool, response_time: float):
         """Met à jour les statistiques"""
@@ -448,6 +980,11 @@ class APIGateway:
         current_avg = self.stats['avg_response_time']
         total_requests = self.stats['total_requests']
         self.stats['avg_response_time'] = (current_avg * (total_requests - 1) + response_time) / total_requests
+        self.latency_histogram[latency_bucket(response_time)] += 1
+    
+    def get_latency_percentiles(self) -> Dict[str, Optional[float]]:
+        """Percentiles de latence du processus depuis son démarrage"""
+        return histogram_percentiles(self.latency_histogram)
     
     def _register_core_endpoints(self):
         """Enregistre les endpoints core de l'API"""
@@ -492,6 +1029,10 @@ class APIGateway:
         def get_stats():
             return jsonify({
                 'stats': self.stats,
+                'latency_percentiles': self.get_latency_percentiles(),
+                'rate_limiter': self.rate_limiter.get_stats(),
+                'api_key_cache': self.api_key_cache.get_stats(),
+                'write_buffer': self.write_buffer.get_stats(),
                 'timestamp': datetime.now().isoformat()
             })
         
@@ -579,51 +1120,80 @@ class APIGateway:
             return jsonify({'error': 'Internal server error'}), 500
     
     def get_analytics(self, days: int = 7) -> Dict[str, Any]:
-        """Récupère les analytics de l'API"""
+        """Récupère les analytics de l'API depuis les agrégats par minute"""
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
+        start_minute = start_date.isoformat()[:16]
+        end_minute = end_date.isoformat()[:16]
+        
+        # Inclure les requêtes encore en mémoire
+        self.write_buffer.flush()
+        
+        histogram_size = len(LATENCY_BUCKETS) + 1
+        daily = {}
+        endpoints = {}
+        overall_histogram = [0] * histogram_size
         
         with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            
-            # Requêtes par jour
             cursor = conn.execute("""
-                SELECT DATE(timestamp) as date, COUNT(*) as count,
-                       AVG(response_time) as avg_response_time,
-                       SUM(CASE WHEN response_code >= 400 THEN 1 ELSE 0 END) as error_count
-                FROM api_requests 
-                WHERE timestamp >= ? AND timestamp <= ?
-                GROUP BY DATE(timestamp)
-                ORDER BY date
-            """, (start_date.isoformat(), end_date.isoformat()))
-            
-            daily_stats = [dict(row) for row in cursor.fetchall()]
+                SELECT endpoint, method, minute, request_count, error_count,
+                       total_response_time, latency_histogram
+                FROM api_request_rollups 
+                WHERE minute >= ? AND minute <= ?
+            """, (start_minute, end_minute))
             
-            # Endpoints les plus utilisés
-            cursor = conn.execute("""
-                SELECT endpoint, method, COUNT(*) as count,
-                       AVG(response_time) as avg_response_time
-                FROM api_requests 
-                WHERE timestamp >= ? AND timestamp <= ?
-                GROUP BY endpoint, method
-                ORDER BY count DESC
-                LIMIT 10
-            """, (start_date.isoformat(), end_date.isoformat()))
-            
-            top_endpoints = [dict(row) for row in cursor.fetchall()]
+            for endpoint, method, minute, count, errors, total, histogram_json in cursor:
+                histogram = json.loads(histogram_json)
+                merge_histograms(overall_histogram, histogram)
+                
+                for aggregates, key in ((daily, minute[:10]), (endpoints, (endpoint, method))):
+                    entry = aggregates.get(key)
+                    if entry is None:
+                        entry = aggregates[key] = [0, 0, 0.0, [0] * histogram_size]
+                    entry[0] += count
+                    entry[1] += errors
+                    entry[2] += total
+                    merge_histograms(entry[3], histogram)
             
             # Utilisateurs les plus actifs
+            conn.row_factory = sqlite3.Row
             cursor = conn.execute("""
-                SELECT user_id, COUNT(*) as count
-                FROM api_requests 
-                WHERE timestamp >= ? AND timestamp <= ? AND user_id IS NOT NULL
+                SELECT user_id, SUM(request_count) as count
+                FROM api_user_rollups 
+                WHERE date >= ? AND date <= ?
                 GROUP BY user_id
                 ORDER BY count DESC
                 LIMIT 10
-            """, (start_date.isoformat(), end_date.isoformat()))
+            """, (start_date.date().isoformat(), end_date.date().isoformat()))
             
             top_users = [dict(row) for row in cursor.fetchall()]
         
+        # Requêtes par jour
+        daily_stats = [
+            {
+                'date': date,
+                'count': count,
+                'avg_response_time': total / count if count else 0.0,
+                'error_count': errors,
+                **histogram_percentiles(histogram)
+            }
+            for date, (count, errors, total, histogram) in sorted(daily.items())
+        ]
+        
+        # Endpoints les plus utilisés
+        top_endpoints = [
+            {
+                'endpoint': endpoint,
+                'method': method,
+                'count': count,
+                'error_count': errors,
+                'avg_response_time': total / count if count else 0.0,
+                **histogram_percentiles(histogram)
+            }
+            for (endpoint, method), (count, errors, total, histogram)
+            in sorted(endpoints.items(), key=lambda item: item[1][0], reverse=True)[:10]
+        ]
+        
         return {
             'period': {
                 'start': start_date.isoformat(),
@@ -633,14 +1203,46 @@ class APIGateway:
             'daily_stats': daily_stats,
             'top_endpoints': top_endpoints,
             'top_users': top_users,
+            'latency_percentiles': histogram_percentiles(overall_histogram),
             'current_stats': self.stats,
             'generated_at': datetime.now().isoformat()
         }
     
-    def run(self, host: str = "0.0.0.0", port: int = 8000, debug: bool = False):
+    def post_fork(self):
+        """
+        Réinitialise l'état propre au processus dans un worker après le fork :
+        les threads de fond ne survivent pas au fork et les connexions
+        SQLite ne doivent pas être partagées entre processus.
+        """
+        self.write_buffer = APIWriteBuffer(self.db_path)
+        atexit.register(self.write_buffer.stop)
+        self.api_key_cache = APIKeyCache()
+        self.api_key_sync_lock = threading.Lock()
+        
+        backend = self.rate_limiter.backend
+        if isinstance(backend, SQLiteRateLimitBackend):
+            backend.local = threading.local()
+        else:
+            self.rate_limiter = RateLimiter()
+    
+    def run(self, host: str = "0.0.0.0", port: int = 8000, debug: bool = False,
+            production: bool = False, server_config: Optional[ServerConfig] = None):
         """Lance le serveur API Gateway"""
         logger.info(f"Démarrage API Gateway sur {host}:{port}")
-        self.app.run(host=host, port=port, debug=debug)
+        
+        if not production:
+            self.app.run(host=host, port=port, debug=debug)
+            return
+        
+        config = server_config or ServerConfig(host=host, port=port)
+        if config.workers > 1 and not isinstance(self.rate_limiter.backend, SQLiteRateLimitBackend):
+            logger.warning("Limites de débit par worker : utiliser rate_limit_db_path pour les partager")
+        
+        # Passerelle partagée par fork (preload : un HUP remplace les workers sans
+        # recharger le code). Vider les écritures en attente avant que les
+        # workers n'héritent du tampon
+        self.write_buffer.flush()
+        serve_wsgi(app=self.app, config=config, post_worker_init=[self.post_fork])
 
 # Exemple d'utilisation
 if __name__ == "__main__":
@@ -685,5 +1287,8 @@ if __name__ == "__main__":
     print("Santé: http://localhost:8000/health")
     print("Statistiques: http://localhost:8000/stats")
     
-    gateway.run(port=8000, debug=True)
+    if is_production_mode():
+        gateway.run(port=8000, production=True)
+    else:
+        gateway.run(port=8000, debug=True)
 
@@ -12,6 +12,8 @@ import json
 import logging
 from datetime import datetime
 
+from wsgi_server import ServerConfig, serve_wsgi, is_production_mode
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -248,6 +250,11 @@ def index():
         ]
     })
 
+def create_app() -> Flask:
+    """Fabrique pour le serveur WSGI : importe le module (code sur disque) dans le worker"""
+    import app_deployment
+    return app_deployment.app
+
 if __name__ == '__main__':
     print("🚀 Substans.AI Enterprise v3.0 - Serveur de Déploiement")
     print("✅ 47 systèmes enterprise chargés")
@@ -256,10 +263,14 @@ if __name__ == '__main__':
     print("✅ Prêt pour déploiement en production")
     
     # Démarrage du serveur
-    app.run(
-        host='0.0.0.0',
-        port=5000,
-        debug=False,
-        threaded=True
-    )
+    if is_production_mode():
+        # Application sans état : importée dans chaque worker, un HUP recharge le code
+        serve_wsgi(app_factory=create_app, config=ServerConfig(host='0.0.0.0', port=5000))
+    else:
+        app.run(
+            host='0.0.0.0',
+            port=5000,
+            debug=False,
+            threaded=True
+        )
 
@@ -6,8 +6,14 @@ Intégré avec le système de génération de contenu et l'intelligence quotidie
 
 import json
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+import math
+import random
+import heapq
+import itertools
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Any, Optional, Tuple
 import hashlib
 import os
 from dataclasses import dataclass
@@ -41,6 +47,71 @@ class ScheduledContent:
     published_at: Optional[datetime] = None
     error_message: Optional[str] = None
 
+class PlatformCalendarIndex:
+    """
+    Index trié des publications programmées d'une plateforme : vérification
+    de conflit et recherche du prochain créneau libre par recherche
+    dichotomique, compteurs par jour et par mois pour les limites.
+    """
+    
+    def __init__(self):
+        self.times: List[datetime] = []
+        self.items: List[ScheduledContent] = []
+        self.type_times: Dict[str, List[datetime]] = defaultdict(list)
+        self.daily_counts: Dict[date, int] = defaultdict(int)
+        self.monthly_counts: Dict[Tuple[int, int], int] = defaultdict(int)
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def add(self, content: ScheduledContent):
+        scheduled_for = content.scheduled_for
+        position = bisect_right(self.times, scheduled_for)
+        self.times.insert(position, scheduled_for)
+        self.items.insert(position, content)
+        insort(self.type_times[content.content_type], scheduled_for)
+        self.daily_counts[scheduled_for.date()] += 1
+        self.monthly_counts[(scheduled_for.year, scheduled_for.month)] += 1
+    
+    def remove(self, content: ScheduledContent):
+        """Retire un contenu (à appeler avant toute modification de scheduled_for)"""
+        scheduled_for = content.scheduled_for
+        position = bisect_left(self.times, scheduled_for)
+        while position < len(self.items) and self.items[position] is not content:
+            position += 1
+        if position == len(self.items):
+            return
+        
+        del self.times[position]
+        del self.items[position]
+        type_times = self.type_times[content.content_type]
+        del type_times[bisect_left(type_times, scheduled_for)]
+        self.daily_counts[scheduled_for.date()] -= 1
+        self.monthly_counts[(scheduled_for.year, scheduled_for.month)] -= 1
+    
+    @staticmethod
+    def _blocked_until(times: List[datetime], candidate: datetime,
+                       interval: timedelta) -> Optional[datetime]:
+        """Fin du blocage imposé par les voisins immédiats de `candidate` (None si libre)"""
+        position = bisect_left(times, candidate)
+        blocked_until = None
+        for neighbour in times[max(position - 1, 0):position + 1]:
+            if abs(neighbour - candidate) < interval:
+                end = neighbour + interval
+                if blocked_until is None or end > blocked_until:
+                    blocked_until = end
+        return blocked_until
+    
+    def conflict_end(self, candidate: datetime, min_interval: timedelta,
+                     content_type: str, content_interval: timedelta) -> Optional[datetime]:
+        """Premier instant à partir duquel les conflits actuels de `candidate` sont levés"""
+        ends = [
+            self._blocked_until(self.times, candidate, min_interval),
+            self._blocked_until(self.type_times.get(content_type, []), candidate, content_interval)
+        ]
+        ends = [end for end in ends if end is not None]
+        return max(ends) if ends else None
+
 class ContentScheduler:
     def __init__(self):
         self.name = "Content Scheduler"
@@ -50,6 +121,11 @@ class ContentScheduler:
         self.scheduling_rules = self._initialize_scheduling_rules()
         self.platform_limits = self._initialize_platform_limits()
         
+        # Index des contenus programmés par plateforme et file des échéances
+        self.calendar_index: Dict[str, PlatformCalendarIndex] = defaultdict(PlatformCalendarIndex)
+        self.publication_heap: List[Tuple[datetime, int, ScheduledContent]] = []
+        self._heap_sequence = itertools.count()
+        
         print(f"🚀 {self.name} v{self.version} initialisé")
         print("✅ Règles de planification configurées")
         print("✅ Limites de plateformes définies")
@@ -219,6 +295,7 @@ class ContentScheduler:
         )
         
         self.scheduled_content.append(scheduled_content)
+        self._index_scheduled_content(scheduled_content)
         
         return {
             "success": True,
@@ -231,8 +308,16 @@ class ContentScheduler:
     
     def create_content_calendar(self, intelligence_data_list: List[Dict[str, Any]], 
                               days_ahead: int = 30,
-                              platforms: List[str] = None) -> Dict[str, Any]:
-        """Crée un calendrier éditorial optimisé"""
+                              platforms: List[str] = None,
+                              batch_optimize: bool = False,
+                              time_budget_seconds: float = 2.0) -> Dict[str, Any]:
+        """
+        Crée un calendrier éditorial optimisé
+        
+        Avec batch_optimize, les contenus générés sont ensuite replacés
+        conjointement par optimize_content_calendar (contraintes respectées,
+        score maximisé dans le budget de temps).
+        """
         
         if platforms is None:
             platforms = ["linkedin", "twitter", "instagram"]
@@ -255,14 +340,7 @@ class ContentScheduler:
             date_str = date.strftime("%Y-%m-%d")
             day_name = date.strftime("%A").lower()
             
-            calendar[date_str] = {
-                "date": date_str,
-                "day_of_week": day_name,
-                "is_weekend": day_name in ["saturday", "sunday"],
-                "content_planned": [],
-                "total_posts": 0,
-                "platforms_active": []
-            }
+            calendar[date_str] = self._new_calendar_day(date)
             
             # Planification pour chaque plateforme
             for platform in platforms:
@@ -302,37 +380,344 @@ class ContentScheduler:
                             "estimated_value": f"€{1500 + content_counter * 500:,}"
                         }
                         
-                        calendar[date_str]["content_planned"].append(planned_content)
-                        calendar[date_str]["total_posts"] += 1
-                        
-                        if platform not in calendar[date_str]["platforms_active"]:
-                            calendar[date_str]["platforms_active"].append(platform)
-                        
+                        self._add_to_calendar_day(calendar[date_str], planned_content)
                         content_counter += 1
         
-        # Statistiques du calendrier
+        if batch_optimize:
+            content_items = [content for day_data in calendar.values() 
+                           for content in day_data["content_planned"]]
+            return self.optimize_content_calendar(
+                content_items, days_ahead=days_ahead, platforms=platforms,
+                time_budget_seconds=time_budget_seconds
+            )
+        
+        return {
+            "calendar": calendar,
+            "summary": self._summarize_calendar(calendar, days_ahead, platforms)
+        }
+    
+    def _new_calendar_day(self, day: datetime) -> Dict[str, Any]:
+        """Entrée vide du calendrier éditorial pour un jour"""
+        
+        day_name = day.strftime("%A").lower()
+        return {
+            "date": day.strftime("%Y-%m-%d"),
+            "day_of_week": day_name,
+            "is_weekend": day_name in ["saturday", "sunday"],
+            "content_planned": [],
+            "total_posts": 0,
+            "platforms_active": []
+        }
+    
+    def _add_to_calendar_day(self, day_data: Dict[str, Any], planned_content: Dict[str, Any]):
+        day_data["content_planned"].append(planned_content)
+        day_data["total_posts"] += 1
+        
+        if planned_content["platform"] not in day_data["platforms_active"]:
+            day_data["platforms_active"].append(planned_content["platform"])
+    
+    def _summarize_calendar(self, calendar: Dict[str, Any], days_ahead: int,
+                            platforms: List[str]) -> Dict[str, Any]:
+        """Statistiques du calendrier"""
+        
         total_content = sum(day_data["total_posts"] for day_data in calendar.values())
         total_value = sum(
-            sum(int(content["estimated_value"].replace("€", "").replace(",", "")) 
+            sum(int(content.get("estimated_value", "€0").replace("€", "").replace(",", "")) 
                 for content in day_data["content_planned"])
             for day_data in calendar.values()
         )
         
-        calendar_summary = {
-            "calendar": calendar,
-            "summary": {
-                "total_days": days_ahead,
-                "total_content_pieces": total_content,
-                "avg_posts_per_day": round(total_content / days_ahead, 1),
-                "platforms_covered": platforms,
-                "estimated_total_value": f"€{total_value:,}",
-                "content_distribution": self._calculate_content_distribution(calendar),
-                "peak_days": self._identify_peak_days(calendar),
-                "optimization_score": self._calculate_optimization_score(calendar)
+        return {
+            "total_days": days_ahead,
+            "total_content_pieces": total_content,
+            "avg_posts_per_day": round(total_content / max(days_ahead, 1), 1),
+            "platforms_covered": platforms,
+            "estimated_total_value": f"€{total_value:,}",
+            "content_distribution": self._calculate_content_distribution(calendar),
+            "peak_days": self._identify_peak_days(calendar),
+            "optimization_score": self._calculate_optimization_score(calendar)
+        }
+    
+    def optimize_content_calendar(self, content_items: List[Dict[str, Any]],
+                                  days_ahead: int = 30,
+                                  platforms: Optional[List[str]] = None,
+                                  platform_constraints: Optional[Dict[str, Dict[str, Any]]] = None,
+                                  time_budget_seconds: float = 2.0,
+                                  seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Placement conjoint d'un lot de contenus (mode batch)
+        
+        Chaque contenu ({"platform", "type", ...}) reçoit un créneau optimal de
+        sa plateforme sur l'horizon. Recuit simulé : maximise d'abord le
+        nombre de contenus placés puis la somme des scores de
+        _calculate_optimization_score, sous les contraintes d'intervalle
+        minimum, d'espacement par type et de limites quotidienne / mensuelle,
+        publications déjà programmées comprises. `platform_constraints`
+        surcharge les règles par plateforme (max_posts_per_day,
+        min_interval_hours, content_spacing). Retourne la meilleure solution
+        trouvée à l'expiration du budget de temps.
+        """
+        
+        started = time.perf_counter()
+        rng = random.Random(seed)
+        now = datetime.now()
+        current_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        if platforms is None:
+            platforms = sorted({item["platform"] for item in content_items})
+        
+        # Contraintes effectives par plateforme
+        constraints = {}
+        for platform in platforms:
+            rules = dict(self.scheduling_rules[platform])
+            rules.update((platform_constraints or {}).get(platform, {}))
+            constraints[platform] = {
+                "min_interval": timedelta(hours=rules["min_interval_hours"]),
+                "spacing": {content_type: timedelta(hours=hours) 
+                           for content_type, hours in rules.get("content_spacing", {}).items()},
+                "daily_limit": min(rules["max_posts_per_day"], self.platform_limits[platform]["daily_limit"]),
+                "monthly_limit": self.platform_limits[platform]["monthly_limit"]
             }
+        
+        # Créneaux candidats : heures optimales de chaque jour de l'horizon
+        slots = {}
+        for platform in platforms:
+            platform_slots = []
+            for day in range(days_ahead):
+                day_date = current_date + timedelta(days=day)
+                day_name = day_date.strftime("%A").lower()
+                for time_str in self.scheduling_rules[platform]["optimal_times"].get(day_name, []):
+                    hour, minute = map(int, time_str.split(":"))
+                    slot_time = day_date.replace(hour=hour, minute=minute)
+                    if slot_time > now:
+                        platform_slots.append((slot_time, self._content_score(platform, slot_time)))
+            slots[platform] = platform_slots
+        
+        # Index de travail amorcés avec les publications déjà programmées
+        indexes = {}
+        for platform in platforms:
+            indexes[platform] = PlatformCalendarIndex()
+            for existing in self.calendar_index[platform].items:
+                indexes[platform].add(existing)
+        
+        items = [item for item in content_items if item["platform"] in slots]
+        placeholders = [
+            ScheduledContent(
+                id=item.get("id", f"BATCH_{position}"),
+                platform=Platform(item["platform"]),
+                content=item.get("title", ""),
+                scheduled_for=None,
+                status=PublicationStatus.DRAFT,
+                created_at=now,
+                content_type=item.get("type", "post"),
+                source_intelligence_id=item.get("intelligence_source", "unknown"),
+                estimated_metrics={}
+            ) for position, item in enumerate(items)
+        ]
+        assignment: List[Optional[int]] = [None] * len(items)
+        
+        def is_feasible(position: int, slot: int) -> bool:
+            platform = items[position]["platform"]
+            rule = constraints[platform]
+            index = indexes[platform]
+            slot_time = slots[platform][slot][0]
+            content_type = placeholders[position].content_type
+            
+            if index.daily_counts.get(slot_time.date(), 0) >= rule["daily_limit"]:
+                return False
+            if index.monthly_counts.get((slot_time.year, slot_time.month), 0) >= rule["monthly_limit"]:
+                return False
+            return index.conflict_end(
+                slot_time, rule["min_interval"], content_type,
+                rule["spacing"].get(content_type, rule["min_interval"])
+            ) is None
+        
+        def place(position: int, slot: int):
+            platform = items[position]["platform"]
+            placeholders[position].scheduled_for = slots[platform][slot][0]
+            indexes[platform].add(placeholders[position])
+            assignment[position] = slot
+        
+        def unplace(position: int):
+            indexes[items[position]["platform"]].remove(placeholders[position])
+            placeholders[position].scheduled_for = None
+            assignment[position] = None
+        
+        def slot_score(position: int, slot: Optional[int]) -> float:
+            # Un contenu placé vaut toujours plus que le meilleur gain de score
+            if slot is None:
+                return 0.0
+            return 10.0 + slots[items[position]["platform"]][slot][1]
+        
+        # Solution initiale gloutonne : contenus les plus contraints d'abord,
+        # chacun sur le meilleur créneau encore réalisable
+        def tightness(position: int) -> timedelta:
+            rule = constraints[items[position]["platform"]]
+            return rule["spacing"].get(placeholders[position].content_type, rule["min_interval"])
+        
+        ranked_slots = {
+            platform: sorted(range(len(platform_slots)), key=lambda slot: (-platform_slots[slot][1], slot))
+            for platform, platform_slots in slots.items()
         }
+        for position in sorted(range(len(items)), key=tightness, reverse=True):
+            for slot in ranked_slots[items[position]["platform"]]:
+                if is_feasible(position, slot):
+                    place(position, slot)
+                    break
         
-        return calendar_summary
+        current_value = sum(slot_score(position, slot) for position, slot in enumerate(assignment))
+        initial_placed = sum(1 for slot in assignment if slot is not None)
+        initial_score = round((current_value - 10.0 * initial_placed) / max(initial_placed, 1), 2)
+        best_value = current_value
+        best_assignment = list(assignment)
+        upper_bound = sum(
+            10.0 + max((score for _, score in slots[item["platform"]]), default=-10.0)
+            for item in items
+        )
+        
+        # Recuit simulé : déplacement d'un contenu ou échange de deux créneaux
+        start_temperature, end_temperature = 0.3, 0.005
+        iterations = 0
+        stop_reason = "time_budget"
+        
+        while True:
+            if best_value >= upper_bound - 1e-9:
+                stop_reason = "optimal"
+                break
+            
+            if iterations % 64 == 0:
+                elapsed = time.perf_counter() - started
+                if elapsed >= time_budget_seconds:
+                    break
+                progress = elapsed / time_budget_seconds if time_budget_seconds > 0 else 1.0
+                temperature = start_temperature * (end_temperature / start_temperature) ** progress
+            iterations += 1
+            
+            position = rng.randrange(len(items))
+            platform = items[position]["platform"]
+            if not slots[platform]:
+                continue
+            old_slot = assignment[position]
+            
+            if old_slot is not None and rng.random() < 0.3:
+                # Échange avec un autre contenu placé de la même plateforme
+                other = rng.randrange(len(items))
+                other_slot = assignment[other]
+                if other == position or other_slot is None or items[other]["platform"] != platform:
+                    continue
+                
+                unplace(position)
+                unplace(other)
+                if is_feasible(position, other_slot):
+                    place(position, other_slot)
+                    if is_feasible(other, old_slot):
+                        place(other, old_slot)
+                        continue
+                    unplace(position)
+                place(position, old_slot)
+                place(other, other_slot)
+                continue
+            
+            new_slot = rng.randrange(len(slots[platform]))
+            if new_slot == old_slot:
+                continue
+            
+            delta = slot_score(position, new_slot) - slot_score(position, old_slot)
+            if delta < 0 and rng.random() >= math.exp(delta / temperature):
+                continue
+            
+            if old_slot is not None:
+                unplace(position)
+            if is_feasible(position, new_slot):
+                place(position, new_slot)
+                current_value += delta
+                if current_value > best_value + 1e-9:
+                    best_value = current_value
+                    best_assignment = list(assignment)
+            elif old_slot is not None:
+                place(position, old_slot)
+        
+        # Construction du calendrier à partir de la meilleure solution
+        calendar = {}
+        for day in range(days_ahead):
+            day_date = current_date + timedelta(days=day)
+            calendar[day_date.strftime("%Y-%m-%d")] = self._new_calendar_day(day_date)
+        
+        unscheduled = []
+        for item, slot in zip(items, best_assignment):
+            if slot is None:
+                unscheduled.append(item)
+                continue
+            slot_time = slots[item["platform"]][slot][0]
+            planned_content = dict(item, scheduled_for=slot_time.isoformat())
+            self._add_to_calendar_day(calendar[slot_time.strftime("%Y-%m-%d")], planned_content)
+        
+        for day_data in calendar.values():
+            day_data["content_planned"].sort(key=lambda content: content["scheduled_for"])
+        
+        unscheduled.extend(item for item in content_items if item["platform"] not in slots)
+        
+        summary = self._summarize_calendar(calendar, days_ahead, platforms)
+        summary["batch_optimization"] = {
+            "method": "simulated_annealing",
+            "iterations": iterations,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "time_budget_seconds": time_budget_seconds,
+            "stop_reason": stop_reason,
+            "initial_placed": initial_placed,
+            "initial_optimization_score": initial_score,
+            "unscheduled_count": len(unscheduled)
+        }
+        
+        return {
+            "calendar": calendar,
+            "summary": summary,
+            "unscheduled_content": unscheduled
+        }
+    
+    def _index_scheduled_content(self, content: ScheduledContent):
+        """Ajoute un contenu programmé à l'index de sa plateforme et à la file des échéances"""
+        self.calendar_index[content.platform.value].add(content)
+        heapq.heappush(self.publication_heap, (content.scheduled_for, next(self._heap_sequence), content))
+    
+    def _effective_daily_limit(self, platform: Platform) -> int:
+        """Limite quotidienne : règle éditoriale bornée par la limite de la plateforme"""
+        return min(self.scheduling_rules[platform.value]["max_posts_per_day"],
+                   self.platform_limits[platform.value]["daily_limit"])
+    
+    def _find_nearest_free_slot(self, platform: Platform, content_type: str, start: datetime,
+                                horizon: timedelta = timedelta(days=30)) -> Optional[datetime]:
+        """
+        Premier instant >= start sans conflit d'intervalle ni dépassement des
+        limites quotidienne et mensuelle. Chaque saut coûte O(log n).
+        """
+        rules = self.scheduling_rules[platform.value]
+        limits = self.platform_limits[platform.value]
+        index = self.calendar_index[platform.value]
+        min_interval = timedelta(hours=rules["min_interval_hours"])
+        content_interval = timedelta(
+            hours=rules.get("content_spacing", {}).get(content_type, rules["min_interval_hours"])
+        )
+        daily_limit = self._effective_daily_limit(platform)
+        
+        candidate = start
+        end = start + horizon
+        while candidate <= end:
+            if index.daily_counts.get(candidate.date(), 0) >= daily_limit:
+                candidate = datetime.combine(candidate.date() + timedelta(days=1), datetime.min.time())
+                continue
+            
+            if index.monthly_counts.get((candidate.year, candidate.month), 0) >= limits["monthly_limit"]:
+                first_of_month = candidate.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+                candidate = (first_of_month + timedelta(days=32)).replace(day=1)
+                continue
+            
+            blocked_until = index.conflict_end(candidate, min_interval, content_type, content_interval)
+            if blocked_until is None:
+                return candidate
+            candidate = blocked_until
+        
+        return None
     
     def _optimize_scheduling_time(self, platform: Platform, content_type: str, 
                                 target_datetime: datetime) -> datetime:
@@ -389,7 +774,8 @@ class ContentScheduler:
                         return candidate_time
         
         # Si aucun créneau optimal trouvé, prendre le prochain disponible
-        return current_time + timedelta(hours=2)
+        fallback_time = current_time + timedelta(hours=2)
+        return self._find_nearest_free_slot(platform, content_type, fallback_time) or fallback_time
     
     def _validate_scheduling(self, platform: Platform, scheduled_time: datetime, 
                            content_type: str) -> Dict[str, Any]:
@@ -398,18 +784,24 @@ class ContentScheduler:
         rules = self.scheduling_rules[platform.value]
         limits = self.platform_limits[platform.value]
         
+        index = self.calendar_index[platform.value]
+        
         # Vérification de la limite quotidienne
-        same_day_count = len([
-            content for content in self.scheduled_content
-            if (content.platform == platform and 
-                content.scheduled_for.date() == scheduled_time.date() and
-                content.status == PublicationStatus.SCHEDULED)
-        ])
-        
-        if same_day_count >= rules["max_posts_per_day"]:
+        same_day_count = index.daily_counts.get(scheduled_time.date(), 0)
+        daily_limit = self._effective_daily_limit(platform)
+        
+        if same_day_count >= daily_limit:
+            return {
+                "valid": False,
+                "error": f"Limite quotidienne atteinte pour {platform.value} ({daily_limit} posts/jour)",
+                "suggested_times": self._suggest_alternative_times(platform, scheduled_time)
+            }
+        
+        # Vérification de la limite mensuelle de la plateforme
+        if index.monthly_counts.get((scheduled_time.year, scheduled_time.month), 0) >= limits["monthly_limit"]:
             return {
                 "valid": False,
-                "error": f"Limite quotidienne atteinte pour {platform.value} ({rules['max_posts_per_day']} posts/jour)",
+                "error": f"Limite mensuelle atteinte pour {platform.value} ({limits['monthly_limit']} posts/mois)",
                 "suggested_times": self._suggest_alternative_times(platform, scheduled_time)
             }
         
@@ -445,22 +837,9 @@ class ContentScheduler:
         content_spacing = rules.get("content_spacing", {}).get(content_type, rules["min_interval_hours"])
         content_interval = timedelta(hours=content_spacing)
         
-        for existing_content in self.scheduled_content:
-            if (existing_content.platform == platform and 
-                existing_content.status == PublicationStatus.SCHEDULED):
-                
-                time_diff = abs((existing_content.scheduled_for - scheduled_time).total_seconds())
-                
-                # Vérification de l'intervalle minimum général
-                if time_diff < min_interval.total_seconds():
-                    return True
-                
-                # Vérification de l'espacement spécifique au type de contenu
-                if (existing_content.content_type == content_type and 
-                    time_diff < content_interval.total_seconds()):
-                    return True
-        
-        return False
+        # Seuls les voisins immédiats dans l'index trié peuvent être en conflit
+        index = self.calendar_index[platform.value]
+        return index.conflict_end(scheduled_time, min_interval, content_type, content_interval) is not None
     
     def _suggest_alternative_times(self, platform: Platform, 
                                  original_time: datetime) -> List[str]:
@@ -535,35 +914,37 @@ class ContentScheduler:
         total_content = 0
         
         for day_data in calendar.values():
-            day_name = day_data["day_of_week"]
-            
             for content in day_data["content_planned"]:
-                platform = content["platform"]
                 scheduled_time = datetime.fromisoformat(content["scheduled_for"])
-                hour = scheduled_time.hour
-                
-                # Score basé sur l'heure optimale
-                rules = self.scheduling_rules.get(platform, {})
-                optimal_times = rules.get("optimal_times", {}).get(day_name, [])
-                
-                if optimal_times:
-                    optimal_hours = [int(t.split(":")[0]) for t in optimal_times]
-                    closest_optimal = min(optimal_hours, key=lambda x: abs(x - hour))
-                    hour_score = max(0, 1 - abs(hour - closest_optimal) / 12)
-                else:
-                    hour_score = 0.5
-                
-                # Score basé sur le jour optimal
-                best_days = rules.get("best_days", [])
-                day_score = 1.0 if day_name in best_days else 0.7
-                
-                # Score combiné
-                content_score = (hour_score + day_score) / 2
-                total_score += content_score
+                total_score += self._content_score(content["platform"], scheduled_time)
                 total_content += 1
         
         return round(total_score / max(total_content, 1), 2)
     
+    def _content_score(self, platform: str, scheduled_time: datetime) -> float:
+        """Score d'un créneau de publication (heure et jour optimaux)"""
+        
+        day_name = scheduled_time.strftime("%A").lower()
+        hour = scheduled_time.hour
+        
+        # Score basé sur l'heure optimale
+        rules = self.scheduling_rules.get(platform, {})
+        optimal_times = rules.get("optimal_times", {}).get(day_name, [])
+        
+        if optimal_times:
+            optimal_hours = [int(t.split(":")[0]) for t in optimal_times]
+            closest_optimal = min(optimal_hours, key=lambda x: abs(x - hour))
+            hour_score = max(0, 1 - abs(hour - closest_optimal) / 12)
+        else:
+            hour_score = 0.5
+        
+        # Score basé sur le jour optimal
+        best_days = rules.get("best_days", [])
+        day_score = 1.0 if day_name in best_days else 0.7
+        
+        # Score combiné
+        return (hour_score + day_score) / 2
+    
     def execute_scheduled_publications(self) -> Dict[str, Any]:
         """Exécute les publications programmées (simulation)"""
         
@@ -571,45 +952,52 @@ class ContentScheduler:
         executed = []
         failed = []
         
-        for content in self.scheduled_content:
-            if (content.status == PublicationStatus.SCHEDULED and 
-                content.scheduled_for <= current_time):
+        # Contenus arrivés à échéance, pris en tête de file ; les entrées
+        # périmées (contenu reprogrammé ou plus en attente) sont ignorées
+        due_content = []
+        while self.publication_heap and self.publication_heap[0][0] <= current_time:
+            scheduled_for, _, content = heapq.heappop(self.publication_heap)
+            if content.status == PublicationStatus.SCHEDULED and content.scheduled_for == scheduled_for:
+                due_content.append(content)
+        
+        for content in due_content:
+            # Simulation de publication
+            success_rate = 0.95  # 95% de succès
+            
+            if content.retry_count < 3 and (content.retry_count == 0 or 
+                                          time.time() % 10 < success_rate * 10):
+                # Publication réussie
+                self.calendar_index[content.platform.value].remove(content)
+                content.status = PublicationStatus.PUBLISHED
+                content.published_at = current_time
+                executed.append(content)
                 
-                # Simulation de publication
-                success_rate = 0.95  # 95% de succès
+                # Ajout à l'historique
+                self.publication_history.append({
+                    "content_id": content.id,
+                    "platform": content.platform.value,
+                    "published_at": current_time.isoformat(),
+                    "estimated_metrics": content.estimated_metrics
+                })
                 
-                if content.retry_count < 3 and (content.retry_count == 0 or 
-                                              time.time() % 10 < success_rate * 10):
-                    # Publication réussie
-                    content.status = PublicationStatus.PUBLISHED
-                    content.published_at = current_time
-                    executed.append(content)
-                    
-                    # Ajout à l'historique
-                    self.publication_history.append({
-                        "content_id": content.id,
-                        "platform": content.platform.value,
-                        "published_at": current_time.isoformat(),
-                        "estimated_metrics": content.estimated_metrics
-                    })
-                    
+            else:
+                # Échec de publication
+                content.retry_count += 1
+                self.calendar_index[content.platform.value].remove(content)
+                
+                if content.retry_count >= 3:
+                    content.status = PublicationStatus.FAILED
+                    content.error_message = "Échec après 3 tentatives"
+                    failed.append(content)
                 else:
-                    # Échec de publication
-                    content.retry_count += 1
-                    
-                    if content.retry_count >= 3:
-                        content.status = PublicationStatus.FAILED
-                        content.error_message = "Échec après 3 tentatives"
-                        failed.append(content)
-                    else:
-                        # Reprogrammer pour dans 1 heure
-                        content.scheduled_for = current_time + timedelta(hours=1)
+                    # Reprogrammer pour dans 1 heure
+                    content.scheduled_for = current_time + timedelta(hours=1)
+                    self._index_scheduled_content(content)
         
         return {
             "executed": len(executed),
             "failed": len(failed),
-            "pending": len([c for c in self.scheduled_content 
-                          if c.status == PublicationStatus.SCHEDULED]),
+            "pending": sum(len(index) for index in self.calendar_index.values()),
             "execution_details": {
                 "successful_publications": [
                     {
@@ -8,16 +8,27 @@ Génère des rapports d'enrichissement intégrés à la base de connaissances
 import json
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, Optional
 import hashlib
 import os
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 class DailyIntelligenceSystem:
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, storage_path: Optional[str] = None,
+                 history_size: int = 30,
+                 knowledge_base_ingest: Optional[Callable[[List[Dict[str, Any]]], Any]] = None):
         self.name = "Daily Intelligence System"
         self.version = "1.0"
-        self.intelligence_reports = []
-        self.knowledge_enrichment_log = []
+        
+        # Exécution parallèle des agents et stockage au fil de l'eau (toujours
+        # actif : seul un historique borné des cycles reste en mémoire)
+        self.max_workers = max_workers
+        self.storage_path = storage_path or '/home/ubuntu/substans_ai_megacabinet/data/daily_intelligence'
+        self.knowledge_base_ingest = knowledge_base_ingest
+        self.cycles_executed = 0
+        os.makedirs(self.storage_path, exist_ok=True)
         
         # Configuration des agents experts et leurs domaines de veille
         self.expert_agents = {
@@ -133,6 +144,10 @@ class DailyIntelligenceSystem:
                 "expertise_level": "chief_security_officer"
             }
         }
+        
+        # Historique borné (les rapports complets sont persistés sur disque)
+        self.intelligence_reports = deque(maxlen=history_size)
+        self.knowledge_enrichment_log = deque(maxlen=history_size * len(self.expert_agents))
 
     def execute_daily_intelligence_cycle(self) -> Dict[str, Any]:
         """
@@ -140,7 +155,11 @@ class DailyIntelligenceSystem:
         """
         print(f"🌅 Démarrage du cycle de veille quotidienne - {datetime.now().strftime('%Y-%m-%d %H:%M')}")
         
-        daily_reports = {}
+        cycle_start = time.monotonic()
+        cycle_id = self._generate_cycle_id()
+        completed_reports = {}
+        agent_timings = {}
+        failed_agents = {}
         enrichment_summary = {
             "date": datetime.now().strftime('%Y-%m-%d'),
             "total_agents": len(self.expert_agents),
@@ -149,39 +168,89 @@ class DailyIntelligenceSystem:
             "intelligence_score": 0.0
         }
         
-        for agent_id, agent_config in self.expert_agents.items():
-            print(f"\n🔍 {agent_config['name']} - Début de la veille...")
-            
-            # Exécution de la veille pour cet agent
-            agent_report = self._execute_agent_intelligence(agent_id, agent_config)
-            daily_reports[agent_id] = agent_report
-            
-            # Intégration à la base de connaissances
-            knowledge_integration = self._integrate_to_knowledge_base(agent_id, agent_report)
-            
-            enrichment_summary["reports_generated"] += 1
-            enrichment_summary["knowledge_items_added"] += knowledge_integration["items_added"]
+        # Veille de tous les agents en parallèle dans un pool borné
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_agent = {
+                executor.submit(self._timed_agent_intelligence, agent_id, agent_config): agent_id
+                for agent_id, agent_config in self.expert_agents.items()
+            }
             
-            print(f"✅ {agent_config['name']} - Veille terminée: {agent_report['findings_count']} découvertes")
+            for future in as_completed(future_to_agent):
+                agent_id = future_to_agent[future]
+                agent_name = self.expert_agents[agent_id]["name"]
+                
+                try:
+                    agent_report, duration = future.result()
+                except Exception as e:
+                    failed_agents[agent_id] = str(e)
+                    print(f"❌ {agent_name} - Erreur de veille: {e}")
+                    continue
+                
+                completed_reports[agent_id] = agent_report
+                agent_timings[agent_id] = round(duration, 3)
+                enrichment_summary["reports_generated"] += 1
+                
+                # Stockage du rapport dès qu'il est disponible
+                self._store_agent_report(cycle_id, agent_report)
+                
+                print(f"✅ {agent_name} - Veille terminée: {agent_report['findings_count']} découvertes ({duration:.2f}s)")
+        
+        # Ordre stable des rapports, indépendant de l'ordre de complétion
+        daily_reports = {
+            agent_id: completed_reports[agent_id]
+            for agent_id in self.expert_agents if agent_id in completed_reports
+        }
+        
+        # Intégration groupée à la base de connaissances
+        knowledge_integrations = self._integrate_batch_to_knowledge_base(daily_reports)
+        enrichment_summary["knowledge_items_added"] = sum(
+            integration["items_added"] for integration in knowledge_integrations.values()
+        )
         
         # Calcul du score d'intelligence global
         enrichment_summary["intelligence_score"] = self._calculate_intelligence_score(daily_reports)
+        enrichment_summary["cycle_duration"] = round(time.monotonic() - cycle_start, 3)
         
         # Sauvegarde du cycle quotidien
         cycle_result = {
-            "cycle_id": self._generate_cycle_id(),
+            "cycle_id": cycle_id,
             "date": datetime.now().isoformat(),
             "summary": enrichment_summary,
             "agent_reports": daily_reports,
-            "knowledge_enrichment": self.knowledge_enrichment_log[-len(self.expert_agents):]
+            "agent_timings": agent_timings,
+            "failed_agents": failed_agents,
+            "knowledge_enrichment": list(self.knowledge_enrichment_log)[-len(daily_reports):] if daily_reports else []
         }
         
         self.intelligence_reports.append(cycle_result)
+        self.cycles_executed += 1
+        self._store_cycle_summary(cycle_result)
         
         print(f"\n🎯 Cycle quotidien terminé: {enrichment_summary['reports_generated']} rapports, {enrichment_summary['knowledge_items_added']} enrichissements")
         
         return cycle_result
 
+    def _timed_agent_intelligence(self, agent_id: str, agent_config: Dict[str, Any]):
+        """Exécute la veille d'un agent et mesure sa durée"""
+        start = time.monotonic()
+        agent_report = self._execute_agent_intelligence(agent_id, agent_config)
+        duration = time.monotonic() - start
+        agent_report["processing_time"] = round(duration, 3)
+        return agent_report, duration
+
+    def _store_agent_report(self, cycle_id: str, agent_report: Dict[str, Any]):
+        """Ajoute le rapport d'un agent au fichier JSONL du cycle"""
+        cycle_file = os.path.join(self.storage_path, f"{cycle_id}_agents.jsonl")
+        with open(cycle_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(agent_report, ensure_ascii=False, default=str) + "\n")
+
+    def _store_cycle_summary(self, cycle_result: Dict[str, Any]):
+        """Sauvegarde le résumé du cycle (sans les rapports complets déjà stockés)"""
+        summary = {key: value for key, value in cycle_result.items() if key != "agent_reports"}
+        summary_file = os.path.join(self.storage_path, f"{cycle_result['cycle_id']}_summary.json")
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+
     def _execute_agent_intelligence(self, agent_id: str, agent_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Exécute la session de veille pour un agent spécifique
@@ -419,50 +488,72 @@ class DailyIntelligenceSystem:
 
     def _integrate_to_knowledge_base(self, agent_id: str, agent_report: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Intègre le rapport de veille à la base de connaissances substans.ai
+        Intègre le rapport de veille d'un seul agent à la base de connaissances substans.ai
         """
-        integration_result = {
-            "agent_id": agent_id,
-            "integration_date": datetime.now().isoformat(),
-            "items_added": 0,
-            "knowledge_categories": [],
-            "integration_success": True
-        }
-        
-        # Simulation de l'intégration (en production: vraie base de données)
-        findings = agent_report.get("intelligence_findings", [])
+        return self._integrate_batch_to_knowledge_base({agent_id: agent_report})[agent_id]
+
+    def _integrate_batch_to_knowledge_base(self, agent_reports: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Intègre les rapports de veille de plusieurs agents en une seule ingestion
+        """
+        integration_results = {}
+        knowledge_items = []
+        
+        for agent_id, agent_report in agent_reports.items():
+            integration_result = {
+                "agent_id": agent_id,
+                "integration_date": datetime.now().isoformat(),
+                "items_added": 0,
+                "knowledge_categories": [],
+                "integration_success": True
+            }
+            
+            findings = agent_report.get("intelligence_findings", [])
+            
+            for finding in findings:
+                if finding.get("relevance", 0) > 0.7:  # Seuil de qualité
+                    knowledge_item = {
+                        "id": self._generate_knowledge_id(agent_id, finding),
+                        "agent_source": agent_id,
+                        "title": finding["title"],
+                        "content": finding["summary"],
+                        "category": self._categorize_knowledge(finding),
+                        "relevance_score": finding.get("relevance", 0),
+                        "date_added": datetime.now().isoformat(),
+                        "keywords": finding.get("keywords", []),
+                        "impact_assessment": finding.get("impact", "")
+                    }
+                    knowledge_items.append(knowledge_item)
+                    
+                    integration_result["items_added"] += 1
+                    category = knowledge_item["category"]
+                    if category not in integration_result["knowledge_categories"]:
+                        integration_result["knowledge_categories"].append(category)
+            
+            integration_results[agent_id] = integration_result
         
-        for finding in findings:
-            if finding.get("relevance", 0) > 0.7:  # Seuil de qualité
-                knowledge_item = {
-                    "id": self._generate_knowledge_id(agent_id, finding),
-                    "agent_source": agent_id,
-                    "title": finding["title"],
-                    "content": finding["summary"],
-                    "category": self._categorize_knowledge(finding),
-                    "relevance_score": finding.get("relevance", 0),
-                    "date_added": datetime.now().isoformat(),
-                    "keywords": finding.get("keywords", []),
-                    "impact_assessment": finding.get("impact", "")
-                }
-                
-                integration_result["items_added"] += 1
-                category = knowledge_item["category"]
-                if category not in integration_result["knowledge_categories"]:
-                    integration_result["knowledge_categories"].append(category)
+        # Ingestion unique (en production: vraie base de données)
+        if self.knowledge_base_ingest and knowledge_items:
+            try:
+                self.knowledge_base_ingest(knowledge_items)
+            except Exception as e:
+                print(f"❌ Erreur d'ingestion base de connaissances: {e}")
+                for integration_result in integration_results.values():
+                    integration_result["integration_success"] = False
         
         # Log de l'enrichissement
-        enrichment_log = {
-            "timestamp": datetime.now().isoformat(),
-            "agent_id": agent_id,
-            "items_integrated": integration_result["items_added"],
-            "categories": integration_result["knowledge_categories"],
-            "quality_score": sum(f.get("relevance", 0) for f in findings) / len(findings) if findings else 0
-        }
-        
-        self.knowledge_enrichment_log.append(enrichment_log)
-        
-        return integration_result
+        for agent_id, agent_report in agent_reports.items():
+            findings = agent_report.get("intelligence_findings", [])
+            integration_result = integration_results[agent_id]
+            self.knowledge_enrichment_log.append({
+                "timestamp": datetime.now().isoformat(),
+                "agent_id": agent_id,
+                "items_integrated": integration_result["items_added"],
+                "categories": integration_result["knowledge_categories"],
+                "quality_score": sum(f.get("relevance", 0) for f in findings) / len(findings) if findings else 0
+            })
+        
+        return integration_results
 
     def _categorize_knowledge(self, finding: Dict[str, Any]) -> str:
         """
@@ -505,8 +596,11 @@ class DailyIntelligenceSystem:
 
     def _generate_cycle_id(self) -> str:
         """Génère un ID unique pour le cycle quotidien"""
-        date_str = datetime.now().strftime('%Y%m%d')
-        hash_input = f"{date_str}_{len(self.intelligence_reports)}"
+        # Horodatage, processus et aléa : deux exécutions le même jour (ou deux
+        # processus) n'écrivent jamais dans les fichiers d'un même cycle
+        now = datetime.now()
+        date_str = now.strftime('%Y%m%d')
+        hash_input = f"{now.isoformat()}_{os.getpid()}_{self.cycles_executed}_{uuid.uuid4().hex}"
         return f"CYCLE_{date_str}_{hashlib.md5(hash_input.encode()).hexdigest()[:8]}"
 
     def _generate_knowledge_id(self, agent_id: str, finding: Dict[str, Any]) -> str:
@@ -591,9 +685,10 @@ class DailyIntelligenceSystem:
         return {
             "system_name": self.name,
             "version": self.version,
-            "cycles_executed": len(self.intelligence_reports),
+            "cycles_executed": self.cycles_executed,
             "agents_monitored": len(self.expert_agents),
             "latest_cycle": latest_cycle["summary"],
+            "latest_agent_timings": latest_cycle.get("agent_timings", {}),
             "knowledge_enrichment_trend": self._calculate_enrichment_trend(),
             "intelligence_quality_trend": self._calculate_quality_trend()
         }
@@ -603,16 +698,17 @@ class DailyIntelligenceSystem:
         if len(self.intelligence_reports) < 2:
             return {"trend": 0.0, "acceleration": False}
         
+        cycles = list(self.intelligence_reports)
         recent_enrichments = [
             cycle["summary"]["knowledge_items_added"] 
-            for cycle in self.intelligence_reports[-5:]
+            for cycle in cycles[-5:]
         ]
         
         avg_recent = sum(recent_enrichments) / len(recent_enrichments)
         
         older_enrichments = [
             cycle["summary"]["knowledge_items_added"] 
-            for cycle in self.intelligence_reports[-10:-5]
+            for cycle in cycles[-10:-5]
         ]
         
         if older_enrichments:
@@ -634,7 +730,7 @@ class DailyIntelligenceSystem:
         
         recent_scores = [
             cycle["summary"]["intelligence_score"] 
-            for cycle in self.intelligence_reports[-5:]
+            for cycle in list(self.intelligence_reports)[-5:]
         ]
         
         avg_recent = sum(recent_scores) / len(recent_scores)
@@ -9,12 +9,16 @@ import ast
 import inspect
 import json
 import logging
+import hashlib
+import fnmatch
+import multiprocessing
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import re
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import markdown
 from jinja2 import Environment, FileSystemLoader
 
@@ -22,6 +26,23 @@ from jinja2 import Environment, FileSystemLoader
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Version de l'analyse : à incrémenter quand la structure des ModuleDoc change,
+# pour invalider le cache de scan
+ANALYZER_VERSION = 1
+
+# Dossiers et fichiers ignorés par le scan (motifs fnmatch sur chaque composant du chemin)
+DEFAULT_EXCLUDE_PATTERNS = ['.*', '__pycache__', 'node_modules', 'venv', 'env', 'backup_2025*']
+
+# Nombre de fichiers modifiés à partir duquel l'analyse est répartie sur plusieurs processus
+PARALLEL_PARSE_THRESHOLD = 8
+
+DOCSTRING_PATTERNS = {
+    'parameters': r'(?:Args?|Parameters?):\s*(.*?)(?=Returns?:|Raises?:|Examples?:|$)',
+    'returns': r'Returns?:\s*(.*?)(?=Raises?:|Examples?:|$)',
+    'examples': r'Examples?:\s*(.*?)(?=Args?|Parameters?|Returns?:|Raises?:|$)',
+    'raises': r'Raises?:\s*(.*?)(?=Args?|Parameters?|Returns?:|Examples?:|$)'
+}
+
 @dataclass
 class FunctionDoc:
     """Documentation d'une fonction"""
@@ -38,6 +59,10 @@ class FunctionDoc:
     
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FunctionDoc':
+        return cls(**data)
 
 @dataclass
 class ClassDoc:
@@ -54,6 +79,12 @@ class ClassDoc:
         data = asdict(self)
         data['methods'] = [method.to_dict() for method in self.methods]
         return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ClassDoc':
+        data = dict(data)
+        data['methods'] = [FunctionDoc.from_dict(method) for method in data['methods']]
+        return cls(**data)
 
 @dataclass
 class ModuleDoc:
@@ -73,6 +104,13 @@ class ModuleDoc:
         data['classes'] = [cls.to_dict() for cls in self.classes]
         data['functions'] = [func.to_dict() for func in self.functions]
         return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ModuleDoc':
+        data = dict(data)
+        data['classes'] = [ClassDoc.from_dict(cls_data) for cls_data in data['classes']]
+        data['functions'] = [FunctionDoc.from_dict(func) for func in data['functions']]
+        return cls(**data)
 
 @dataclass
 class APIEndpointDoc:
@@ -91,14 +129,299 @@ class APIEndpointDoc:
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
+def analyze_python_file(file_path: Path, project_root: Path) -> ModuleDoc:
+    """
+    Analyse un fichier Python. Fonction sans état : elle est exécutée telle
+    quelle dans les processus du pool d'analyse.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Parser AST
+        tree = ast.parse(content)
+        
+        # Extraire les informations
+        module_name = file_path.stem
+        module_docstring = ast.get_docstring(tree) or ""
+        
+        # Analyser les imports
+        imports = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports.append(alias.name)
+            elif isinstance(node, ast.ImportFrom):
+                module = node.module or ""
+                for alias in node.names:
+                    imports.append(f"{module}.{alias.name}")
+        
+        # Analyser les constantes
+        constants = []
+        for node in tree.body:
+            if isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name) and target.id.isupper():
+                        constants.append({
+                            'name': target.id,
+                            'type': type(ast.literal_eval(node.value) if isinstance(node.value, (ast.Constant, ast.Str, ast.Num)) else 'unknown').__name__,
+                            'value': ast.get_source_segment(content, node.value) or 'N/A',
+                            'description': 'Constante du module'
+                        })
+        
+        # Analyser les classes
+        classes = []
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                class_doc = _analyze_class(node, content)
+                classes.append(class_doc)
+        
+        # Analyser les fonctions
+        functions = []
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef):
+                func_doc = _analyze_function(node, content)
+                functions.append(func_doc)
+        
+        # Calculer la complexité
+        line_count = len(content.splitlines())
+        complexity_score = _calculate_complexity(tree)
+        
+        return ModuleDoc(
+            name=module_name,
+            path=str(file_path.relative_to(project_root)),
+            docstring=module_docstring,
+            classes=classes,
+            functions=functions,
+            imports=imports,
+            constants=constants,
+            line_count=line_count,
+            complexity_score=complexity_score
+        )
+        
+    except Exception as e:
+        logger.error(f"Erreur analyse fichier {file_path}: {e}")
+        return ModuleDoc(
+            name=file_path.stem,
+            path=str(file_path),
+            docstring=f"Erreur d'analyse: {e}",
+            classes=[],
+            functions=[],
+            imports=[],
+            constants=[],
+            line_count=0,
+            complexity_score=0.0
+        )
+
+def _analyze_class(node: ast.ClassDef, content: str) -> ClassDoc:
+    """Analyse une classe"""
+    class_name = node.name
+    docstring = ast.get_docstring(node) or ""
+    line_number = node.lineno
+    
+    # Vérifier si c'est une dataclass
+    is_dataclass = any(
+        isinstance(decorator, ast.Name) and decorator.id == 'dataclass'
+        for decorator in node.decorator_list
+    )
+    
+    # Analyser l'héritage
+    inheritance = []
+    for base in node.bases:
+        if isinstance(base, ast.Name):
+            inheritance.append(base.id)
+        elif isinstance(base, ast.Attribute):
+            inheritance.append(f"{base.value.id}.{base.attr}")
+    
+    # Analyser les attributs
+    attributes = []
+    for item in node.body:
+        if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
+            attr_name = item.target.id
+            attr_type = ast.get_source_segment(content, item.annotation) or 'Any'
+            attributes.append({
+                'name': attr_name,
+                'type': attr_type,
+                'description': 'Attribut de classe'
+            })
+    
+    # Analyser les méthodes
+    methods = []
+    for item in node.body:
+        if isinstance(item, ast.FunctionDef):
+            method_doc = _analyze_function(item, content)
+            methods.append(method_doc)
+    
+    return ClassDoc(
+        name=class_name,
+        docstring=docstring,
+        methods=methods,
+        attributes=attributes,
+        inheritance=inheritance,
+        line_number=line_number,
+        is_dataclass=is_dataclass
+    )
+
+def _analyze_function(node: ast.FunctionDef, content: str) -> FunctionDoc:
+    """Analyse une fonction"""
+    func_name = node.name
+    docstring = ast.get_docstring(node) or ""
+    line_number = node.lineno
+    
+    # Extraire la signature
+    signature = f"def {func_name}("
+    args = []
+    
+    # Arguments positionnels
+    for arg in node.args.args:
+        arg_str = arg.arg
+        if arg.annotation:
+            arg_str += f": {ast.get_source_segment(content, arg.annotation)}"
+        args.append(arg_str)
+    
+    # Arguments avec valeurs par défaut
+    defaults = node.args.defaults
+    if defaults:
+        for i, default in enumerate(defaults):
+            idx = len(args) - len(defaults) + i
+            if idx >= 0:
+                default_value = ast.get_source_segment(content, default) or 'None'
+                args[idx] += f" = {default_value}"
+    
+    signature += ", ".join(args) + ")"
+    
+    # Type de retour
+    return_type = ""
+    if node.returns:
+        return_type = ast.get_source_segment(content, node.returns) or ""
+        signature += f" -> {return_type}"
+    
+    # Parser la docstring
+    parameters, return_description, examples = _parse_docstring(docstring)
+    
+    # Analyser les décorateurs
+    decorators = []
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Name):
+            decorators.append(decorator.id)
+        elif isinstance(decorator, ast.Attribute):
+            decorators.append(f"{decorator.value.id}.{decorator.attr}")
+    
+    # Calculer la complexité
+    complexity = _calculate_function_complexity(node)
+    
+    return FunctionDoc(
+        name=func_name,
+        signature=signature,
+        docstring=docstring,
+        parameters=parameters,
+        return_type=return_type,
+        return_description=return_description,
+        examples=examples,
+        decorators=decorators,
+        line_number=line_number,
+        complexity=complexity
+    )
+
+def _parse_docstring(docstring: str) -> tuple:
+    """Parse une docstring pour extraire les informations"""
+    parameters = []
+    return_description = ""
+    examples = []
+    
+    if not docstring:
+        return parameters, return_description, examples
+    
+    # Extraire les paramètres
+    params_match = re.search(DOCSTRING_PATTERNS['parameters'], docstring, re.DOTALL | re.IGNORECASE)
+    if params_match:
+        params_text = params_match.group(1).strip()
+        for line in params_text.split('\n'):
+            line = line.strip()
+            if ':' in line:
+                parts = line.split(':', 1)
+                param_name = parts[0].strip()
+                param_desc = parts[1].strip()
+                
+                # Extraire le type s'il est présent
+                param_type = "Any"
+                if '(' in param_name and ')' in param_name:
+                    type_match = re.search(r'\(([^)]+)\)', param_name)
+                    if type_match:
+                        param_type = type_match.group(1)
+                        param_name = re.sub(r'\([^)]+\)', '', param_name).strip()
+                
+                parameters.append({
+                    'name': param_name,
+                    'type': param_type,
+                    'description': param_desc
+                })
+    
+    # Extraire la description de retour
+    returns_match = re.search(DOCSTRING_PATTERNS['returns'], docstring, re.DOTALL | re.IGNORECASE)
+    if returns_match:
+        return_description = returns_match.group(1).strip()
+    
+    # Extraire les exemples
+    examples_match = re.search(DOCSTRING_PATTERNS['examples'], docstring, re.DOTALL | re.IGNORECASE)
+    if examples_match:
+        examples_text = examples_match.group(1).strip()
+        # Diviser par blocs de code
+        code_blocks = re.findall(r'```python\n(.*?)\n```', examples_text, re.DOTALL)
+        examples.extend(code_blocks)
+    
+    return parameters, return_description, examples
+
+def _calculate_complexity(tree: ast.AST) -> float:
+    """Calcule le score de complexité d'un module"""
+    complexity = 0
+    
+    for node in ast.walk(tree):
+        # Complexité cyclomatique
+        if isinstance(node, (ast.If, ast.While, ast.For, ast.Try)):
+            complexity += 1
+        elif isinstance(node, ast.FunctionDef):
+            complexity += 1
+        elif isinstance(node, ast.ClassDef):
+            complexity += 2
+    
+    # Normaliser par rapport au nombre de lignes
+    total_nodes = len(list(ast.walk(tree)))
+    return complexity / max(total_nodes, 1) * 100
+
+def _calculate_function_complexity(node: ast.FunctionDef) -> str:
+    """Calcule la complexité d'une fonction"""
+    complexity = 0
+    
+    for child in ast.walk(node):
+        if isinstance(child, (ast.If, ast.While, ast.For, ast.Try)):
+            complexity += 1
+    
+    if complexity <= 2:
+        return "simple"
+    elif complexity <= 5:
+        return "medium"
+    else:
+        return "complex"
+
 class DocumentationGenerator:
     """Générateur de documentation automatique"""
     
-    def __init__(self, project_root: str, output_dir: str = "docs"):
+    def __init__(self, project_root: str, output_dir: str = "docs",
+                 exclude_patterns: Optional[List[str]] = None,
+                 max_workers: Optional[int] = None):
         self.project_root = Path(project_root)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         
+        # Scan incrémental : cache des ModuleDoc par fichier et empreintes des sorties
+        self.exclude_patterns = exclude_patterns if exclude_patterns is not None else list(DEFAULT_EXCLUDE_PATTERNS)
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.scan_cache_path = self.output_dir / ".scan_cache.json"
+        self.manifest_path = self.output_dir / ".docs_manifest.json"
+        self.output_fingerprints: Dict[str, str] = {}
+        self.scan_stats = {'cached': 0, 'analyzed': 0}
+        
         # Configuration des templates
         self.template_dir = self.output_dir / "templates"
         self.template_dir.mkdir(exist_ok=True)
@@ -110,12 +433,7 @@ class DocumentationGenerator:
         self.jinja_env = Environment(loader=FileSystemLoader(str(self.template_dir)))
         
         # Patterns pour l'analyse
-        self.docstring_patterns = {
-            'parameters': r'(?:Args?|Parameters?):\s*(.*?)(?=Returns?:|Raises?:|Examples?:|$)',
-            'returns': r'Returns?:\s*(.*?)(?=Raises?:|Examples?:|$)',
-            'examples': r'Examples?:\s*(.*?)(?=Args?|Parameters?|Returns?:|Raises?:|$)',
-            'raises': r'Raises?:\s*(.*?)(?=Args?|Parameters?|Returns?:|Examples?:|$)'
-        }
+        self.docstring_patterns = DOCSTRING_PATTERNS
         
         logger.info(f"Documentation Generator initialisé pour {project_root}")
     
@@ -397,275 +715,7 @@ curl -X {{ endpoint.method }} "{{ example.request.url }}" \\
     
     def analyze_python_file(self, file_path: Path) -> ModuleDoc:
         """Analyse un fichier Python"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Parser AST
-            tree = ast.parse(content)
-            
-            # Extraire les informations
-            module_name = file_path.stem
-            module_docstring = ast.get_docstring(tree) or ""
-            
-            # Analyser les imports
-            imports = []
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imports.append(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ""
-                    for alias in node.names:
-                        imports.append(f"{module}.{alias.name}")
-            
-            # Analyser les constantes
-            constants = []
-            for node in tree.body:
-                if isinstance(node, ast.Assign):
-                    for target in node.targets:
-                        if isinstance(target, ast.Name) and target.id.isupper():
-                            constants.append({
-                                'name': target.id,
-                                'type': type(ast.literal_eval(node.value) if isinstance(node.value, (ast.Constant, ast.Str, ast.Num)) else 'unknown').__name__,
-                                'value': ast.get_source_segment(content, node.value) or 'N/A',
-                                'description': 'Constante du module'
-                            })
-            
-            # Analyser les classes
-            classes = []
-            for node in tree.body:
-                if isinstance(node, ast.ClassDef):
-                    class_doc = self._analyze_class(node, content)
-                    classes.append(class_doc)
-            
-            # Analyser les fonctions
-            functions = []
-            for node in tree.body:
-                if isinstance(node, ast.FunctionDef):
-                    func_doc = self._analyze_function(node, content)
-                    functions.append(func_doc)
-            
-            # Calculer la complexité
-            line_count = len(content.splitlines())
-            complexity_score = self._calculate_complexity(tree)
-            
-            return ModuleDoc(
-                name=module_name,
-                path=str(file_path.relative_to(self.project_root)),
-                docstring=module_docstring,
-                classes=classes,
-                functions=functions,
-                imports=imports,
-                constants=constants,
-                line_count=line_count,
-                complexity_score=complexity_score
-            )
-            
-        except Exception as e:
-            logger.error(f"Erreur analyse fichier {file_path}: {e}")
-            return ModuleDoc(
-                name=file_path.stem,
-                path=str(file_path),
-                docstring=f"Erreur d'analyse: {e}",
-                classes=[],
-                functions=[],
-                imports=[],
-                constants=[],
-                line_count=0,
-                complexity_score=0.0
-            )
-    
-    def _analyze_class(self, node: ast.ClassDef, content: str) -> ClassDoc:
-        """Analyse une classe"""
-        class_name = node.name
-        docstring = ast.get_docstring(node) or ""
-        line_number = node.lineno
-        
-        # Vérifier si c'est une dataclass
-        is_dataclass = any(
-            isinstance(decorator, ast.Name) and decorator.id == 'dataclass'
-            for decorator in node.decorator_list
-        )
-        
-        # Analyser l'héritage
-        inheritance = []
-        for base in node.bases:
-            if isinstance(base, ast.Name):
-                inheritance.append(base.id)
-            elif isinstance(base, ast.Attribute):
-                inheritance.append(f"{base.value.id}.{base.attr}")
-        
-        # Analyser les attributs
-        attributes = []
-        for item in node.body:
-            if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
-                attr_name = item.target.id
-                attr_type = ast.get_source_segment(content, item.annotation) or 'Any'
-                attributes.append({
-                    'name': attr_name,
-                    'type': attr_type,
-                    'description': 'Attribut de classe'
-                })
-        
-        # Analyser les méthodes
-        methods = []
-        for item in node.body:
-            if isinstance(item, ast.FunctionDef):
-                method_doc = self._analyze_function(item, content)
-                methods.append(method_doc)
-        
-        return ClassDoc(
-            name=class_name,
-            docstring=docstring,
-            methods=methods,
-            attributes=attributes,
-            inheritance=inheritance,
-            line_number=line_number,
-            is_dataclass=is_dataclass
-        )
-    
-    def _analyze_function(self, node: ast.FunctionDef, content: str) -> FunctionDoc:
-        """Analyse une fonction"""
-        func_name = node.name
-        docstring = ast.get_docstring(node) or ""
-        line_number = node.lineno
-        
-        # Extraire la signature
-        signature = f"def {func_name}("
-        args = []
-        
-        # Arguments positionnels
-        for arg in node.args.args:
-            arg_str = arg.arg
-            if arg.annotation:
-                arg_str += f": {ast.get_source_segment(content, arg.annotation)}"
-            args.append(arg_str)
-        
-        # Arguments avec valeurs par défaut
-        defaults = node.args.defaults
-        if defaults:
-            for i, default in enumerate(defaults):
-                idx = len(args) - len(defaults) + i
-                if idx >= 0:
-                    default_value = ast.get_source_segment(content, default) or 'None'
-                    args[idx] += f" = {default_value}"
-        
-        signature += ", ".join(args) + ")"
-        
-        # Type de retour
-        return_type = ""
-        if node.returns:
-            return_type = ast.get_source_segment(content, node.returns) or ""
-            signature += f" -> {return_type}"
-        
-        # Parser la docstring
-        parameters, return_description, examples = self._parse_docstring(docstring)
-        
-        # Analyser les décorateurs
-        decorators = []
-        for decorator in node.decorator_list:
-            if isinstance(decorator, ast.Name):
-                decorators.append(decorator.id)
-            elif isinstance(decorator, ast.Attribute):
-                decorators.append(f"{decorator.value.id}.{decorator.attr}")
-        
-        # Calculer la complexité
-        complexity = self._calculate_function_complexity(node)
-        
-        return FunctionDoc(
-            name=func_name,
-            signature=signature,
-            docstring=docstring,
-            parameters=parameters,
-            return_type=return_type,
-            return_description=return_description,
-            examples=examples,
-            decorators=decorators,
-            line_number=line_number,
-            complexity=complexity
-        )
-    
-    def _parse_docstring(self, docstring: str) -> tuple:
-        """Parse une docstring pour extraire les informations"""
-        parameters = []
-        return_description = ""
-        examples = []
-        
-        if not docstring:
-            return parameters, return_description, examples
-        
-        # Extraire les paramètres
-        params_match = re.search(self.docstring_patterns['parameters'], docstring, re.DOTALL | re.IGNORECASE)
-        if params_match:
-            params_text = params_match.group(1).strip()
-            for line in params_text.split('\n'):
-                line = line.strip()
-                if ':' in line:
-                    parts = line.split(':', 1)
-                    param_name = parts[0].strip()
-                    param_desc = parts[1].strip()
-                    
-                    # Extraire le type s'il est présent
-                    param_type = "Any"
-                    if '(' in param_name and ')' in param_name:
-                        type_match = re.search(r'\(([^)]+)\)', param_name)
-                        if type_match:
-                            param_type = type_match.group(1)
-                            param_name = re.sub(r'\([^)]+\)', '', param_name).strip()
-                    
-                    parameters.append({
-                        'name': param_name,
-                        'type': param_type,
-                        'description': param_desc
-                    })
-        
-        # Extraire la description de retour
-        returns_match = re.search(self.docstring_patterns['returns'], docstring, re.DOTALL | re.IGNORECASE)
-        if returns_match:
-            return_description = returns_match.group(1).strip()
-        
-        # Extraire les exemples
-        examples_match = re.search(self.docstring_patterns['examples'], docstring, re.DOTALL | re.IGNORECASE)
-        if examples_match:
-            examples_text = examples_match.group(1).strip()
-            # Diviser par blocs de code
-            code_blocks = re.findall(r'```python\n(.*?)\n```', examples_text, re.DOTALL)
-            examples.extend(code_blocks)
-        
-        return parameters, return_description, examples
-    
-    def _calculate_complexity(self, tree: ast.AST) -> float:
-        """Calcule le score de complexité d'un module"""
-        complexity = 0
-        
-        for node in ast.walk(tree):
-            # Complexité cyclomatique
-            if isinstance(node, (ast.If, ast.While, ast.For, ast.Try)):
-                complexity += 1
-            elif isinstance(node, ast.FunctionDef):
-                complexity += 1
-            elif isinstance(node, ast.ClassDef):
-                complexity += 2
-        
-        # Normaliser par rapport au nombre de lignes
-        total_nodes = len(list(ast.walk(tree)))
-        return complexity / max(total_nodes, 1) * 100
-    
-    def _calculate_function_complexity(self, node: ast.FunctionDef) -> str:
-        """Calcule la complexité d'une fonction"""
-        complexity = 0
-        
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.Try)):
-                complexity += 1
-        
-        if complexity <= 2:
-            return "simple"
-        elif complexity <= 5:
-            return "medium"
-        else:
-            return "complex"
+        return analyze_python_file(file_path, self.project_root)
     
     def generate_module_documentation(self, modules: List[ModuleDoc]) -> Dict[str, str]:
         """Génère la documentation des modules"""
@@ -715,35 +765,162 @@ curl -X {{ endpoint.method }} "{{ example.request.url }}" \\
             generation_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         )
     
-    def scan_project(self, extensions: List[str] = None) -> List[ModuleDoc]:
-        """Scanne le projet pour analyser tous les fichiers"""
+    def scan_project(self, extensions: List[str] = None, use_cache: bool = True) -> List[ModuleDoc]:
+        """
+        Scanne le projet pour analyser tous les fichiers.
+        Les fichiers inchangés (même mtime et taille, ou même contenu) sont
+        relus depuis le cache ; seuls les fichiers modifiés sont analysés,
+        en parallèle au-delà de PARALLEL_PARSE_THRESHOLD fichiers.
+        """
         if extensions is None:
             extensions = ['.py']
         
-        modules = []
+        cache = self._load_scan_cache() if use_cache else {}
+        new_cache = {}
+        modules_by_path: Dict[str, ModuleDoc] = {}
+        to_analyze = []
         
-        for ext in extensions:
-            for file_path in self.project_root.rglob(f"*{ext}"):
-                # Ignorer certains dossiers
-                if any(part.startswith('.') or part in ['__pycache__', 'node_modules', 'venv', 'env'] 
-                      for part in file_path.parts):
-                    continue
-                
-                if ext == '.py':
-                    module_doc = self.analyze_python_file(file_path)
-                    modules.append(module_doc)
+        for file_path in self._iter_source_files(extensions):
+            if file_path.suffix != '.py':
+                continue
+            
+            relative_path = str(file_path.relative_to(self.project_root))
+            stat = file_path.stat()
+            entry = cache.get(relative_path)
+            
+            if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                new_cache[relative_path] = entry
+                continue
+            
+            with open(file_path, 'rb') as f:
+                content_hash = hashlib.sha256(f.read()).hexdigest()
+            
+            if entry and entry['sha256'] == content_hash:
+                # Fichier touché mais contenu identique
+                entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                new_cache[relative_path] = entry
+                continue
+            
+            new_cache[relative_path] = {
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': content_hash,
+                'module': None
+            }
+            to_analyze.append((relative_path, file_path))
+        
+        for (relative_path, _), module_data in zip(to_analyze, self._analyze_files([p for _, p in to_analyze])):
+            new_cache[relative_path]['module'] = module_data
+        
+        self.scan_stats = {'cached': len(new_cache) - len(to_analyze), 'analyzed': len(to_analyze)}
+        logger.info(f"Scan du projet: {self.scan_stats['analyzed']} fichiers analysés, "
+                    f"{self.scan_stats['cached']} depuis le cache")
         
-        return modules
+        if use_cache:
+            self._save_scan_cache(new_cache)
+        
+        return [ModuleDoc.from_dict(entry['module']) for entry in new_cache.values()]
+    
+    def _iter_source_files(self, extensions: List[str]):
+        """Parcourt le projet en élaguant les dossiers exclus"""
+        for root, dirs, files in os.walk(self.project_root):
+            dirs[:] = sorted(d for d in dirs if not self._is_excluded(d))
+            for name in sorted(files):
+                if os.path.splitext(name)[1] in extensions and not self._is_excluded(name):
+                    yield Path(root) / name
+    
+    def _is_excluded(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude_patterns)
     
-    def generate_full_documentation(self, include_api: bool = False) -> Dict[str, str]:
-        """Génère la documentation complète du projet"""
+    def _analyze_files(self, file_paths: List[Path]) -> List[Dict[str, Any]]:
+        """Analyse les fichiers modifiés (pool de processus pour les gros lots)"""
+        if len(file_paths) >= PARALLEL_PARSE_THRESHOLD and self.max_workers > 1:
+            try:
+                # forkserver (ou spawn) : les workers ne copient pas l'état du processus
+                # appelant (threads, verrous, connexions ouvertes)
+                start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                with ProcessPoolExecutor(max_workers=self.max_workers,
+                                         mp_context=multiprocessing.get_context(start_method)) as executor:
+                    return [module.to_dict() for module in executor.map(
+                        analyze_python_file,
+                        file_paths,
+                        [self.project_root] * len(file_paths),
+                        chunksize=8
+                    )]
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Analyse parallèle indisponible, repli séquentiel: {e}")
+        
+        return [self.analyze_python_file(path).to_dict() for path in file_paths]
+    
+    def _load_scan_cache(self) -> Dict[str, Any]:
+        if not self.scan_cache_path.exists():
+            return {}
+        try:
+            with open(self.scan_cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache de scan illisible, reconstruction: {e}")
+            return {}
+        
+        if data.get('analyzer_version') != ANALYZER_VERSION or data.get('project_root') != str(self.project_root):
+            return {}
+        return data.get('files', {})
+    
+    def _save_scan_cache(self, files: Dict[str, Any]):
+        tmp_path = self.scan_cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'analyzer_version': ANALYZER_VERSION,
+                'project_root': str(self.project_root),
+                'files': files
+            }, f)
+        os.replace(tmp_path, self.scan_cache_path)
+    
+    def _module_fingerprint(self, module: ModuleDoc, template_hash: str) -> str:
+        """Empreinte des entrées d'une page de module (analyse + template)"""
+        payload = json.dumps(module.to_dict(), sort_keys=True, default=str) + template_hash
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _load_manifest(self) -> Dict[str, str]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def generate_full_documentation(self, include_api: bool = False,
+                                    incremental: bool = True) -> Dict[str, str]:
+        """
+        Génère la documentation complète du projet.
+        En mode incrémental, seules les pages de modules dont les entrées ont
+        changé (ou dont le fichier de sortie manque) sont rendues ; l'index et
+        l'API sont toujours régénérés.
+        """
         logger.info("Début de la génération de documentation")
         
         # Scanner le projet
         modules = self.scan_project()
         
+        # Sélectionner les modules dont la page doit être régénérée
+        with open(self.template_dir / "module.md", 'rb') as f:
+            template_hash = hashlib.sha256(f.read()).hexdigest()
+        manifest = self._load_manifest() if incremental else {}
+        
+        # Une page par nom de module : comme au rendu, le dernier module du même nom l'emporte
+        modules_by_output = {f"{module.name.replace('.', '_')}.md": module for module in modules}
+        
+        self.output_fingerprints = {}
+        changed_modules = []
+        for filename, module in modules_by_output.items():
+            fingerprint = self._module_fingerprint(module, template_hash)
+            self.output_fingerprints[filename] = fingerprint
+            if manifest.get(filename) != fingerprint or not (self.output_dir / filename).exists():
+                changed_modules.append(module)
+        
         # Générer la documentation des modules
-        module_docs = self.generate_module_documentation(modules)
+        module_docs = self.generate_module_documentation(changed_modules)
         
         # Générer l'index
         api_endpoints = []
@@ -762,7 +939,8 @@ curl -X {{ endpoint.method }} "{{ example.request.url }}" \\
             api_doc = self.generate_api_documentation(api_endpoints)
             all_docs['api.md'] = api_doc
         
-        logger.info(f"Documentation générée: {len(all_docs)} fichiers")
+        logger.info(f"Documentation générée: {len(all_docs)} fichiers "
+                    f"({len(modules_by_output) - len(changed_modules)} pages de modules inchangées)")
         return all_docs
     
     def _extract_api_endpoints(self) -> List[APIEndpointDoc]:
@@ -828,6 +1006,15 @@ curl -X {{ endpoint.method }} "{{ example.request.url }}" \\
         
         with open(self.output_dir / 'metadata.json', 'w', encoding='utf-8') as f:
             json.dump(metadata, f, indent=2)
+        
+        # Empreintes des pages écrites, pour la prochaine génération incrémentale
+        manifest = self._load_manifest()
+        manifest.update({
+            filename: self.output_fingerprints[filename]
+            for filename in docs if filename in self.output_fingerprints
+        })
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
 
 # Exemple d'utilisation
 if __name__ == "__main__":
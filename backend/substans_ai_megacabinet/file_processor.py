@@ -3,12 +3,20 @@ Système de traitement de fichiers pour substans.ai
 Analyse et traite tous types de documents joints aux missions
 """
 
+import io
 import os
+import csv
 import json
+import math
+import multiprocessing
+import sqlite3
+import threading
+import zlib
 import mimetypes
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import hashlib
+from concurrent.futures import ProcessPoolExecutor, wait, as_completed, FIRST_COMPLETED
 
 # Imports pour le traitement de fichiers
 try:
@@ -17,19 +25,377 @@ try:
     from pptx import Presentation
     import PyPDF2
     import markdown
+    import openpyxl
 except ImportError as e:
     print(f"Attention: Certaines dépendances manquent pour le traitement de fichiers: {e}")
 
+# Taille de lecture pour le hachage (les lectures de 4 Ko multipliaient les appels système)
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Formats dont l'extraction est coûteuse en CPU : traités dans le pool de processus
+CPU_HEAVY_TYPES = {'pdf', 'office'}
+
+# Version de chaque extracteur : à incrémenter quand sa sortie change, pour que
+# les fichiers déjà traités soient réextraits au prochain dépôt
+EXTRACTOR_VERSIONS = {
+    'text': 1,
+    'pdf': 3,
+    'word': 2,
+    'excel': 2,
+    'powerpoint': 2,
+    'csv': 3,
+    'unsupported': 1
+}
+
+# Extraction paresseuse des gros documents : un aperçu borné est extrait tout
+# de suite, le reste est différé et traité par blocs (voir continue_deferred_extractions)
+LAZY_PDF_PAGE_THRESHOLD = 50
+PREVIEW_PAGES = 10
+PDF_CHUNK_PAGES = 50
+LAZY_CSV_SIZE_THRESHOLD = 20 * 1024 * 1024
+PREVIEW_ROWS = 1000
+CSV_CHUNK_ROWS = 50000
+DEFERRED_BATCH_CHUNKS = 10  # blocs traités entre deux réveils du thread d'arrière-plan
+
+def extract_text_file(file_path: str) -> Dict[str, Any]:
+    """Traite un fichier texte"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Traitement spécial pour Markdown
+        if file_path.lower().endswith(('.md', '.markdown')):
+            try:
+                html_content = markdown.markdown(content)
+                return {
+                    'type': 'markdown',
+                    'content': content,
+                    'html_content': html_content,
+                    'word_count': len(content.split()),
+                    'line_count': len(content.split('\n'))
+                }
+            except:
+                pass
+        
+        return {
+            'type': 'text',
+            'content': content,
+            'word_count': len(content.split()),
+            'line_count': len(content.split('\n'))
+        }
+        
+    except Exception as e:
+        return {'error': f"Erreur lecture fichier texte: {str(e)}"}
+
+def extract_pdf_file(file_path: str) -> Dict[str, Any]:
+    """Traite un fichier PDF (aperçu seulement au-delà de LAZY_PDF_PAGE_THRESHOLD pages)"""
+    try:
+        with open(file_path, 'rb') as f:
+            pdf_reader = PyPDF2.PdfReader(f)
+            page_count = len(pdf_reader.pages)
+            lazy = page_count > LAZY_PDF_PAGE_THRESHOLD
+            extracted_pages = PREVIEW_PAGES if lazy else page_count
+            
+            content, word_count = _extract_pdf_pages(pdf_reader, 0, extracted_pages)
+            metadata = pdf_reader.metadata if hasattr(pdf_reader, 'metadata') else None
+            
+            result = {
+                'type': 'pdf',
+                'content': content,
+                'page_count': page_count,
+                'word_count': word_count,
+                'metadata': {str(k): str(v) for k, v in (metadata or {}).items()},
+                'extracted_pages': extracted_pages,
+                'extraction_status': 'partial' if lazy else 'complete'
+            }
+            
+            if lazy:
+                result['deferred_extraction'] = {
+                    'next_offset': extracted_pages,
+                    'total': page_count,
+                    'state': {'word_count': word_count}
+                }
+            
+            return result
+            
+    except Exception as e:
+        return {'error': f"Erreur lecture PDF: {str(e)}"}
+
+def _extract_pdf_pages(pdf_reader, start: int, end: int) -> tuple:
+    """Extrait le texte des pages [start, end), assemblé en une seule fois"""
+    parts = []
+    word_count = 0
+    for page_number in range(start, min(end, len(pdf_reader.pages))):
+        page_text = pdf_reader.pages[page_number].extract_text() or ""
+        word_count += len(page_text.split())
+        parts.append(page_text)
+        parts.append("\n")
+    return "".join(parts), word_count
+
+def extract_word_file(file_path: str) -> Dict[str, Any]:
+    """Traite un fichier Word"""
+    try:
+        doc = docx.Document(file_path)
+        
+        content = "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
+        
+        # Extraction des tableaux
+        tables_content = []
+        for table in doc.tables:
+            table_data = []
+            for row in table.rows:
+                row_data = [cell.text for cell in row.cells]
+                table_data.append(row_data)
+            tables_content.append(table_data)
+        
+        return {
+            'type': 'word',
+            'content': content,
+            'word_count': len(content.split()),
+            'paragraph_count': len(doc.paragraphs),
+            'tables': tables_content,
+            'table_count': len(tables_content)
+        }
+        
+    except Exception as e:
+        return {'error': f"Erreur lecture Word: {str(e)}"}
+
+def extract_excel_file(file_path: str) -> Dict[str, Any]:
+    """Traite un fichier Excel en lecture seule et en flux, feuille par feuille"""
+    if file_path.lower().endswith('.xls'):
+        return _extract_legacy_excel_file(file_path)
+    
+    try:
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        
+        try:
+            sheets_info = {}
+            total_rows = 0
+            total_cols = 0
+            
+            for worksheet in workbook.worksheets:
+                rows = worksheet.iter_rows(values_only=True)
+                header = next(rows, None) or ()
+                column_names = [
+                    str(value) if value is not None else f"Unnamed: {i}"
+                    for i, value in enumerate(header)
+                ]
+                
+                sample_data = []
+                for row in rows:
+                    if len(sample_data) >= 3:
+                        break
+                    sample_data.append(dict(zip(column_names, row)))
+                
+                # Dimensions déclarées par le classeur : sinon comptage en flux
+                if worksheet.max_row is not None:
+                    row_count = max(worksheet.max_row - 1, 0)
+                else:
+                    row_count = len(sample_data) + sum(1 for _ in rows)
+                
+                sheets_info[worksheet.title] = {
+                    'rows': row_count,
+                    'columns': len(column_names),
+                    'column_names': column_names,
+                    'sample_data': sample_data
+                }
+                total_rows += row_count
+                total_cols = max(total_cols, len(column_names))
+        finally:
+            workbook.close()
+        
+        return {
+            'type': 'excel',
+            'sheets': sheets_info,
+            'sheet_count': len(sheets_info),
+            'total_rows': total_rows,
+            'max_columns': total_cols
+        }
+        
+    except Exception as e:
+        return {'error': f"Erreur lecture Excel: {str(e)}"}
+
+def _extract_legacy_excel_file(file_path: str) -> Dict[str, Any]:
+    """Traite un ancien classeur .xls (pandas, chargement complet)"""
+    try:
+        # Lire toutes les feuilles
+        excel_data = pd.read_excel(file_path, sheet_name=None)
+        
+        sheets_info = {}
+        total_rows = 0
+        total_cols = 0
+        
+        for sheet_name, df in excel_data.items():
+            sheets_info[sheet_name] = {
+                'rows': len(df),
+                'columns': len(df.columns),
+                'column_names': list(df.columns),
+                'sample_data': df.head(3).to_dict('records') if len(df) > 0 else []
+            }
+            total_rows += len(df)
+            total_cols = max(total_cols, len(df.columns))
+        
+        return {
+            'type': 'excel',
+            'sheets': sheets_info,
+            'sheet_count': len(excel_data),
+            'total_rows': total_rows,
+            'max_columns': total_cols
+        }
+        
+    except Exception as e:
+        return {'error': f"Erreur lecture Excel: {str(e)}"}
+
+def extract_powerpoint_file(file_path: str) -> Dict[str, Any]:
+    """Traite un fichier PowerPoint"""
+    try:
+        prs = Presentation(file_path)
+        
+        slides_content = []
+        text_parts = []
+        
+        for i, slide in enumerate(prs.slides):
+            slide_text = "".join(
+                shape.text + "\n" for shape in slide.shapes if hasattr(shape, "text")
+            )
+            
+            slides_content.append({
+                'slide_number': i + 1,
+                'text': slide_text,
+                'shape_count': len(slide.shapes)
+            })
+            text_parts.append(slide_text)
+        
+        total_text = "".join(text_parts)
+        
+        return {
+            'type': 'powerpoint',
+            'content': total_text,
+            'slides': slides_content,
+            'slide_count': len(prs.slides),
+            'word_count': len(total_text.split())
+        }
+        
+    except Exception as e:
+        return {'error': f"Erreur lecture PowerPoint: {str(e)}"}
+
+def extract_csv_file(file_path: str) -> Dict[str, Any]:
+    """Traite un fichier CSV (aperçu seulement au-delà de LAZY_CSV_SIZE_THRESHOLD)"""
+    try:
+        file_size = os.path.getsize(file_path)
+        lazy = file_size > LAZY_CSV_SIZE_THRESHOLD
+        df = pd.read_csv(file_path, nrows=PREVIEW_ROWS if lazy else None)
+        
+        result = {
+            'type': 'csv',
+            'rows': len(df),
+            'columns': len(df.columns),
+            'column_names': list(df.columns),
+            'data_types': {str(k): str(v) for k, v in df.dtypes.items()},
+            'sample_data': df.head(5).to_dict('records'),
+            'summary_stats': df.describe().to_dict() if df.select_dtypes(include=['number']).shape[1] > 0 else {},
+            'extraction_status': 'partial' if lazy else 'complete'
+        }
+        
+        if lazy:
+            # Position du reste du fichier : en-tête + enregistrements de l'aperçu
+            with open(file_path, 'rb') as f:
+                _skip_csv_records(f, len(df) + 1)
+                next_offset = f.tell()
+            
+            state = {'rows': 0, 'column_names': [str(c) for c in df.columns], 'stats': {}}
+            _accumulate_csv_stats(state, df)
+            result['deferred_extraction'] = {
+                'next_offset': next_offset,
+                'total': file_size,
+                'state': state
+            }
+        
+        return result
+        
+    except Exception as e:
+        return {'error': f"Erreur lecture CSV: {str(e)}"}
+
+def _skip_csv_records(f, record_count: int) -> int:
+    """
+    Avance un fichier CSV ouvert en binaire de `record_count` enregistrements
+    non vides, comme pandas les compte (champs entre guillemets sur plusieurs
+    lignes compris, lignes vides ignorées). f.tell() est ensuite sur une
+    frontière d'enregistrement. Retourne le nombre d'enregistrements lus.
+    """
+    def lines():
+        while True:
+            line = f.readline()
+            if not line:
+                return
+            yield line.decode('utf-8', errors='replace')
+    
+    # Le lecteur csv ne consomme que les lignes de l'enregistrement en cours
+    reader = csv.reader(lines())
+    count = 0
+    for record in reader:
+        if record:
+            count += 1
+            if count >= record_count:
+                break
+    return count
+
+def _accumulate_csv_stats(state: Dict[str, Any], df):
+    """Cumule nombre de lignes et statistiques des colonnes numériques d'un bloc"""
+    state['rows'] += len(df)
+    for column in df.select_dtypes(include=['number']).columns:
+        values = df[column].dropna()
+        if values.empty:
+            continue
+        stats = state['stats'].setdefault(str(column), {
+            'count': 0, 'sum': 0.0, 'sum_sq': 0.0, 'min': None, 'max': None
+        })
+        stats['count'] += int(values.count())
+        stats['sum'] += float(values.sum())
+        stats['sum_sq'] += float((values.astype(float) ** 2).sum())
+        low, high = float(values.min()), float(values.max())
+        stats['min'] = low if stats['min'] is None else min(stats['min'], low)
+        stats['max'] = high if stats['max'] is None else max(stats['max'], high)
+
+def extract_file_content(file_path: str, file_type: str) -> Dict[str, Any]:
+    """
+    Extrait le contenu d'un fichier selon son type. Fonction sans état : elle
+    est exécutée telle quelle dans les processus du pool d'extraction.
+    """
+    if file_type == 'text':
+        return extract_text_file(file_path)
+    elif file_type == 'pdf':
+        return extract_pdf_file(file_path)
+    elif file_type == 'office':
+        ext = os.path.splitext(file_path.lower())[1]
+        if ext in ['.docx', '.doc']:
+            return extract_word_file(file_path)
+        elif ext in ['.xlsx', '.xls']:
+            return extract_excel_file(file_path)
+        elif ext in ['.pptx', '.ppt']:
+            return extract_powerpoint_file(file_path)
+        else:
+            return {'error': 'Type Office non supporté'}
+    elif file_type == 'data':
+        if file_path.lower().endswith('.csv'):
+            return extract_csv_file(file_path)
+        else:
+            return {'error': 'Type de données non supporté'}
+    else:
+        return {'error': 'Type de fichier non supporté'}
+
 class FileProcessor:
     """
     Processeur de fichiers pour substans.ai
     Traite tous types de documents et les intègre à la base de connaissances
     """
     
-    def __init__(self, knowledge_base_path="/home/ubuntu/substans_ai_megacabinet/knowledge_base"):
+    def __init__(self, knowledge_base_path="/home/ubuntu/substans_ai_megacabinet/knowledge_base",
+                 max_workers: Optional[int] = None, background_extraction: bool = True):
         self.knowledge_base_path = knowledge_base_path
         self.processed_files_path = os.path.join(knowledge_base_path, "processed_files")
         self.file_metadata_path = os.path.join(knowledge_base_path, "file_metadata.json")
+        self.db_path = os.path.join(knowledge_base_path, "file_metadata.db")
         
         # Créer les répertoires nécessaires
         os.makedirs(self.processed_files_path, exist_ok=True)
@@ -42,26 +408,194 @@ class FileProcessor:
             'data': ['.csv', '.json', '.xml']
         }
         
-        # Métadonnées des fichiers traités
-        self.file_metadata = self.load_file_metadata()
+        # Taille du pool d'extraction pour les traitements par lot
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        
+        # Métadonnées des fichiers traités (SQLite indexé, contenu compressé à part)
+        self.fts_enabled = True
+        self.init_metadata_store()
+        self.migrate_json_metadata()
+        
+        # Extractions différées terminées en arrière-plan (reprises au démarrage)
+        self.background_extraction = background_extraction
+        self.deferred_lock = threading.Lock()
+        self.deferred_wakeup = threading.Event()
+        self.deferred_worker: Optional[threading.Thread] = None
+        if background_extraction and self._has_deferred_extractions():
+            self.start_deferred_extraction_worker()
+        
+    def init_metadata_store(self):
+        """Initialise la base des métadonnées"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS processed_files (
+                    file_hash TEXT PRIMARY KEY,
+                    file_name TEXT NOT NULL,
+                    file_type TEXT,
+                    mission_id TEXT,
+                    file_size INTEGER,
+                    processed_at TEXT,
+                    metadata TEXT NOT NULL
+                );
+                
+                CREATE TABLE IF NOT EXISTS file_contents (
+                    file_hash TEXT PRIMARY KEY,
+                    content BLOB NOT NULL
+                );
+                
+                CREATE TABLE IF NOT EXISTS deferred_extractions (
+                    file_hash TEXT PRIMARY KEY,
+                    file_path TEXT NOT NULL,
+                    extractor TEXT NOT NULL,
+                    next_offset INTEGER NOT NULL,
+                    total INTEGER NOT NULL,
+                    state TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                
+                CREATE TABLE IF NOT EXISTS content_chunks (
+                    file_hash TEXT NOT NULL,
+                    chunk_offset INTEGER NOT NULL,
+                    content BLOB NOT NULL,
+                    PRIMARY KEY (file_hash, chunk_offset)
+                );
+                
+                CREATE TABLE IF NOT EXISTS file_missions (
+                    file_hash TEXT NOT NULL,
+                    mission_id TEXT NOT NULL,
+                    linked_at TEXT NOT NULL,
+                    PRIMARY KEY (file_hash, mission_id)
+                );
+                
+                CREATE INDEX IF NOT EXISTS idx_processed_files_mission ON processed_files(mission_id);
+                CREATE INDEX IF NOT EXISTS idx_file_missions_mission ON file_missions(mission_id);
+                
+                INSERT OR IGNORE INTO file_missions (file_hash, mission_id, linked_at)
+                SELECT file_hash, mission_id, processed_at FROM processed_files 
+                WHERE mission_id IS NOT NULL;
+            """)
+            
+            try:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS file_contents_fts
+                    USING fts5(file_hash UNINDEXED, content, tokenize='unicode61 remove_diacritics 2')
+                """)
+            except sqlite3.OperationalError:
+                # SQLite compilé sans FTS5 : recherche par parcours des contenus
+                self.fts_enabled = False
+    
+    def migrate_json_metadata(self):
+        """Importe l'ancien fichier JSON de métadonnées dans la base"""
+        if not os.path.exists(self.file_metadata_path):
+            return
+        
+        with open(self.file_metadata_path, 'r', encoding='utf-8') as f:
+            legacy_metadata = json.load(f)
         
-    def load_file_metadata(self) -> Dict[str, Any]:
-        """Charge les métadonnées des fichiers traités"""
-        if os.path.exists(self.file_metadata_path):
-            with open(self.file_metadata_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        self.save_file_metadata(list(legacy_metadata.values()))
+        os.replace(self.file_metadata_path, self.file_metadata_path + ".migrated")
+        print(f"Métadonnées migrées vers {self.db_path}: {len(legacy_metadata)} fichiers")
+    
+    def save_file_metadata(self, records: List[Dict[str, Any]]):
+        """Enregistre un lot de fichiers traités en une transaction"""
+        metadata_rows = []
+        deferred_rows = []
+        now = datetime.now().isoformat()
+        
+        for record in records:
+            metadata = {k: v for k, v in record.items() if k not in ('content', 'deferred_extraction')}
+            metadata_rows.append((
+                record['file_hash'], record.get('file_name', ''), record.get('file_type'),
+                record.get('mission_id'), record.get('file_size'), record.get('processed_at'),
+                json.dumps(metadata, ensure_ascii=False, default=str)
+            ))
+            
+            deferred = record.get('deferred_extraction')
+            if deferred:
+                deferred_rows.append((
+                    record['file_hash'], record['file_path'], record['extractor'],
+                    deferred['next_offset'], deferred['total'],
+                    json.dumps(deferred['state'], default=str), now
+                ))
+        
+        file_hashes = [(record['file_hash'],) for record in records]
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO processed_files 
+                (file_hash, file_name, file_type, mission_id, file_size, processed_at, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, metadata_rows)
+            
+            for record in records:
+                if record.get('content'):
+                    self._write_content(conn, record['file_hash'], record['content'])
+            
+            # Une réextraction remplace toute extraction différée en cours
+            conn.executemany("DELETE FROM deferred_extractions WHERE file_hash = ?", file_hashes)
+            conn.executemany("DELETE FROM content_chunks WHERE file_hash = ?", file_hashes)
+            conn.executemany("""
+                INSERT INTO deferred_extractions 
+                (file_hash, file_path, extractor, next_offset, total, state, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, deferred_rows)
+    
+    def _write_content(self, conn: sqlite3.Connection, file_hash: str, content: str):
+        """Écrit le contenu compressé d'un fichier et met à jour l'index plein texte"""
+        conn.execute(
+            "INSERT OR REPLACE INTO file_contents (file_hash, content) VALUES (?, ?)",
+            (file_hash, zlib.compress(content.encode('utf-8')))
+        )
+        if self.fts_enabled:
+            conn.execute("DELETE FROM file_contents_fts WHERE file_hash = ?", (file_hash,))
+            conn.execute(
+                "INSERT INTO file_contents_fts (file_hash, content) VALUES (?, ?)",
+                (file_hash, content)
+            )
+    
+    def _load_records(self, where: str, params: tuple,
+                      include_content: bool = True) -> List[Dict[str, Any]]:
+        """Reconstruit les enregistrements de fichiers traités"""
+        query = "SELECT p.metadata"
+        if include_content:
+            query += ", c.content FROM processed_files p LEFT JOIN file_contents c ON c.file_hash = p.file_hash"
+        else:
+            query += " FROM processed_files p"
+        query += f" WHERE {where}"
+        
+        records = []
+        with sqlite3.connect(self.db_path) as conn:
+            for row in conn.execute(query, params):
+                record = json.loads(row[0])
+                if include_content and row[1] is not None:
+                    record['content'] = zlib.decompress(row[1]).decode('utf-8')
+                records.append(record)
+        return records
+    
+    def get_file_record(self, file_hash: str, include_content: bool = True) -> Optional[Dict[str, Any]]:
+        """Récupère un fichier traité par son hash"""
+        records = self._load_records("p.file_hash = ?", (file_hash,), include_content)
+        return records[0] if records else None
     
-    def save_file_metadata(self):
-        """Sauvegarde les métadonnées des fichiers"""
-        with open(self.file_metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(self.file_metadata, f, indent=2, ensure_ascii=False)
+    def link_files_to_mission(self, file_hashes: List[str], mission_id: str):
+        """Rattache des fichiers déjà traités à une mission"""
+        linked_at = datetime.now().isoformat()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO file_missions (file_hash, mission_id, linked_at) VALUES (?, ?, ?)",
+                [(file_hash, mission_id, linked_at) for file_hash in file_hashes]
+            )
+    
+    def count_processed_files(self) -> int:
+        """Nombre de fichiers traités"""
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM processed_files").fetchone()[0]
     
     def get_file_hash(self, file_path: str) -> str:
         """Calcule le hash d'un fichier pour détecter les doublons"""
         hash_md5 = hashlib.md5()
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
                 hash_md5.update(chunk)
         return hash_md5.hexdigest()
     
@@ -77,227 +611,388 @@ class FileProcessor:
     
     def process_text_file(self, file_path: str) -> Dict[str, Any]:
         """Traite un fichier texte"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Traitement spécial pour Markdown
-            if file_path.lower().endswith(('.md', '.markdown')):
-                try:
-                    html_content = markdown.markdown(content)
-                    return {
-                        'type': 'markdown',
-                        'content': content,
-                        'html_content': html_content,
-                        'word_count': len(content.split()),
-                        'line_count': len(content.split('\n'))
-                    }
-                except:
-                    pass
-            
-            return {
-                'type': 'text',
-                'content': content,
-                'word_count': len(content.split()),
-                'line_count': len(content.split('\n'))
-            }
-            
-        except Exception as e:
-            return {'error': f"Erreur lecture fichier texte: {str(e)}"}
+        return extract_text_file(file_path)
     
     def process_pdf_file(self, file_path: str) -> Dict[str, Any]:
-        """Traite un fichier PDF"""
-        try:
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                
-                content = ""
-                for page in pdf_reader.pages:
-                    content += page.extract_text() + "\n"
-                
-                return {
-                    'type': 'pdf',
-                    'content': content,
-                    'page_count': len(pdf_reader.pages),
-                    'word_count': len(content.split()),
-                    'metadata': pdf_reader.metadata if hasattr(pdf_reader, 'metadata') else {}
-                }
-                
-        except Exception as e:
-            return {'error': f"Erreur lecture PDF: {str(e)}"}
+        """Traite un fichier PDF (aperçu seulement au-delà de LAZY_PDF_PAGE_THRESHOLD pages)"""
+        return extract_pdf_file(file_path)
     
     def process_word_file(self, file_path: str) -> Dict[str, Any]:
         """Traite un fichier Word"""
-        try:
-            doc = docx.Document(file_path)
-            
-            content = ""
-            for paragraph in doc.paragraphs:
-                content += paragraph.text + "\n"
-            
-            # Extraction des tableaux
-            tables_content = []
-            for table in doc.tables:
-                table_data = []
-                for row in table.rows:
-                    row_data = [cell.text for cell in row.cells]
-                    table_data.append(row_data)
-                tables_content.append(table_data)
-            
-            return {
-                'type': 'word',
-                'content': content,
-                'word_count': len(content.split()),
-                'paragraph_count': len(doc.paragraphs),
-                'tables': tables_content,
-                'table_count': len(tables_content)
-            }
-            
-        except Exception as e:
-            return {'error': f"Erreur lecture Word: {str(e)}"}
+        return extract_word_file(file_path)
     
     def process_excel_file(self, file_path: str) -> Dict[str, Any]:
-        """Traite un fichier Excel"""
-        try:
-            # Lire toutes les feuilles
-            excel_data = pd.read_excel(file_path, sheet_name=None)
-            
-            sheets_info = {}
-            total_rows = 0
-            total_cols = 0
-            
-            for sheet_name, df in excel_data.items():
-                sheets_info[sheet_name] = {
-                    'rows': len(df),
-                    'columns': len(df.columns),
-                    'column_names': list(df.columns),
-                    'sample_data': df.head(3).to_dict('records') if len(df) > 0 else []
-                }
-                total_rows += len(df)
-                total_cols = max(total_cols, len(df.columns))
-            
-            return {
-                'type': 'excel',
-                'sheets': sheets_info,
-                'sheet_count': len(excel_data),
-                'total_rows': total_rows,
-                'max_columns': total_cols
-            }
-            
-        except Exception as e:
-            return {'error': f"Erreur lecture Excel: {str(e)}"}
+        """Traite un fichier Excel en lecture seule et en flux, feuille par feuille"""
+        return extract_excel_file(file_path)
     
     def process_powerpoint_file(self, file_path: str) -> Dict[str, Any]:
         """Traite un fichier PowerPoint"""
-        try:
-            prs = Presentation(file_path)
+        return extract_powerpoint_file(file_path)
+    
+    def process_csv_file(self, file_path: str) -> Dict[str, Any]:
+        """Traite un fichier CSV (aperçu seulement au-delà de LAZY_CSV_SIZE_THRESHOLD)"""
+        return extract_csv_file(file_path)
+    
+    def continue_deferred_extractions(self, max_chunks: int = 10) -> int:
+        """
+        Poursuit les extractions différées, un bloc à la fois. Chaque bloc est
+        validé avec sa position : après un arrêt, l'extraction reprend au bloc
+        suivant. Retourne le nombre de blocs traités.
+        """
+        processed = 0
+        
+        while processed < max_chunks:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute("""
+                    SELECT file_hash, file_path, extractor, next_offset, total, state 
+                    FROM deferred_extractions ORDER BY updated_at LIMIT 1
+                """).fetchone()
+            if row is None:
+                break
             
-            slides_content = []
-            total_text = ""
+            file_hash, file_path, extractor, offset, total, state = row
+            state = json.loads(state)
             
-            for i, slide in enumerate(prs.slides):
-                slide_text = ""
-                for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        slide_text += shape.text + "\n"
-                
-                slides_content.append({
-                    'slide_number': i + 1,
-                    'text': slide_text,
-                    'shape_count': len(slide.shapes)
-                })
-                total_text += slide_text
+            try:
+                if extractor == 'pdf':
+                    chunk_text, next_offset = self._extract_pdf_chunk(file_path, offset, state)
+                elif extractor == 'csv':
+                    chunk_text, next_offset = self._extract_csv_chunk(file_path, offset, state)
+                else:
+                    raise ValueError(f"Extracteur sans extraction différée: {extractor}")
+            except Exception as e:
+                print(f"Erreur extraction différée {file_path}: {str(e)}")
+                self._finish_deferred_extraction(file_hash, extractor, state, error=str(e))
+                processed += 1
+                continue
             
-            return {
-                'type': 'powerpoint',
-                'content': total_text,
-                'slides': slides_content,
-                'slide_count': len(prs.slides),
-                'word_count': len(total_text.split())
-            }
+            with sqlite3.connect(self.db_path) as conn:
+                if chunk_text:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO content_chunks (file_hash, chunk_offset, content) VALUES (?, ?, ?)",
+                        (file_hash, offset, zlib.compress(chunk_text.encode('utf-8')))
+                    )
+                conn.execute("""
+                    UPDATE deferred_extractions SET next_offset = ?, state = ?, updated_at = ?
+                    WHERE file_hash = ?
+                """, (next_offset, json.dumps(state), datetime.now().isoformat(), file_hash))
             
-        except Exception as e:
-            return {'error': f"Erreur lecture PowerPoint: {str(e)}"}
+            processed += 1
+            if next_offset >= total:
+                self._finish_deferred_extraction(file_hash, extractor, state)
+        
+        return processed
     
-    def process_csv_file(self, file_path: str) -> Dict[str, Any]:
-        """Traite un fichier CSV"""
-        try:
-            df = pd.read_csv(file_path)
+    def _has_deferred_extractions(self) -> bool:
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT 1 FROM deferred_extractions LIMIT 1").fetchone() is not None
+    
+    def start_deferred_extraction_worker(self):
+        """Réveille (ou lance) le thread qui termine les extractions différées"""
+        with self.deferred_lock:
+            self.deferred_wakeup.set()
+            if self.deferred_worker is None:
+                self.deferred_worker = threading.Thread(
+                    target=self._deferred_extraction_loop, name="deferred_extraction", daemon=True
+                )
+                self.deferred_worker.start()
+    
+    def _deferred_extraction_loop(self):
+        while True:
+            self.deferred_wakeup.clear()
+            try:
+                processed = self.continue_deferred_extractions(max_chunks=DEFERRED_BATCH_CHUNKS)
+            except Exception as e:
+                print(f"Erreur extraction différée: {str(e)}")
+                processed = 0
             
-            return {
-                'type': 'csv',
-                'rows': len(df),
-                'columns': len(df.columns),
-                'column_names': list(df.columns),
-                'data_types': df.dtypes.to_dict(),
-                'sample_data': df.head(5).to_dict('records'),
-                'summary_stats': df.describe().to_dict() if df.select_dtypes(include=['number']).shape[1] > 0 else {}
-            }
+            if processed == 0:
+                # Arrêt uniquement si aucun nouveau travail n'a été signalé entre-temps
+                with self.deferred_lock:
+                    if not self.deferred_wakeup.is_set():
+                        self.deferred_worker = None
+                        return
+    
+    def _extract_pdf_chunk(self, file_path: str, offset: int, state: Dict[str, Any]) -> tuple:
+        """Extrait le bloc de pages suivant d'un PDF"""
+        with open(file_path, 'rb') as f:
+            pdf_reader = PyPDF2.PdfReader(f)
+            end = min(offset + PDF_CHUNK_PAGES, len(pdf_reader.pages))
+            text, word_count = _extract_pdf_pages(pdf_reader, offset, end)
+        
+        state['word_count'] += word_count
+        state['extracted_pages'] = end
+        return text, end
+    
+    def _extract_csv_chunk(self, file_path: str, offset: int, state: Dict[str, Any]) -> tuple:
+        """
+        Lit le bloc d'enregistrements suivant d'un CSV à partir de sa position
+        en octets ; le bloc se termine toujours sur une frontière d'enregistrement.
+        """
+        with open(file_path, 'rb') as f:
+            f.seek(offset)
+            record_count = _skip_csv_records(f, CSV_CHUNK_ROWS)
+            end = f.tell()
+            f.seek(offset)
+            data = f.read(end - offset)
+        
+        if not record_count:
+            return None, os.path.getsize(file_path)
+        
+        df = pd.read_csv(io.BytesIO(data), names=state['column_names'], header=None)
+        _accumulate_csv_stats(state, df)
+        return None, end
+    
+    def _finish_deferred_extraction(self, file_hash: str, extractor: str,
+                                    state: Dict[str, Any], error: Optional[str] = None):
+        """Consolide une extraction différée terminée (ou abandonnée) dans l'enregistrement"""
+        record = self.get_file_record(file_hash)
+        if record is None:
+            return
+        
+        with sqlite3.connect(self.db_path) as conn:
+            if error is not None:
+                record['extraction_status'] = 'failed'
+                record['extraction_error'] = error
+            elif extractor == 'pdf':
+                chunks = [
+                    zlib.decompress(chunk).decode('utf-8') for (chunk,) in conn.execute(
+                        "SELECT content FROM content_chunks WHERE file_hash = ? ORDER BY chunk_offset",
+                        (file_hash,)
+                    )
+                ]
+                record['content'] = record.get('content', '') + "".join(chunks)
+                record['word_count'] = state['word_count']
+                record['extracted_pages'] = state.get('extracted_pages', record.get('page_count'))
+                record['extraction_status'] = 'complete'
+                record['keywords'] = self.extract_keywords(record)
+                self._write_content(conn, file_hash, record['content'])
+            elif extractor == 'csv':
+                summary_stats = {}
+                for column, stats in state['stats'].items():
+                    count = stats['count']
+                    variance = (stats['sum_sq'] - stats['sum'] ** 2 / count) / (count - 1) if count > 1 else 0.0
+                    summary_stats[column] = {
+                        'count': count,
+                        'mean': stats['sum'] / count,
+                        'std': math.sqrt(max(variance, 0.0)),
+                        'min': stats['min'],
+                        'max': stats['max']
+                    }
+                record['rows'] = state['rows']
+                record['summary_stats'] = summary_stats
+                record['extraction_status'] = 'complete'
             
-        except Exception as e:
-            return {'error': f"Erreur lecture CSV: {str(e)}"}
+            metadata = {k: v for k, v in record.items() if k != 'content'}
+            conn.execute(
+                "UPDATE processed_files SET metadata = ? WHERE file_hash = ?",
+                (json.dumps(metadata, ensure_ascii=False, default=str), file_hash)
+            )
+            conn.execute("DELETE FROM deferred_extractions WHERE file_hash = ?", (file_hash,))
+            conn.execute("DELETE FROM content_chunks WHERE file_hash = ?", (file_hash,))
+        
+        if error is None and extractor == 'pdf':
+            self.add_to_knowledge_base(record)
+    
+    def _is_reusable_record(self, record: Optional[Dict[str, Any]], extractor_version: int) -> bool:
+        """
+        Un enregistrement n'est réutilisé que s'il est sain et à jour : ni erreur, ni
+        extraction différée abandonnée ('failed'), ni extraction partielle dont la
+        reprise a disparu (elle ne serait jamais complétée)
+        """
+        if record is None or 'error' in record or record.get('extractor_version') != extractor_version:
+            return False
+        status = record.get('extraction_status', 'complete')
+        if status == 'failed':
+            return False
+        if status == 'partial':
+            with sqlite3.connect(self.db_path) as conn:
+                return conn.execute(
+                    "SELECT 1 FROM deferred_extractions WHERE file_hash = ?", (record['file_hash'],)
+                ).fetchone() is not None
+        return True
+    
+    def get_extraction_status(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """État d'extraction d'un fichier (complète, partielle avec progression, échouée)"""
+        record = self.get_file_record(file_hash, include_content=False)
+        if record is None:
+            return None
+        
+        status = {
+            'file_hash': file_hash,
+            'extraction_status': record.get('extraction_status', 'complete')
+        }
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT next_offset, total FROM deferred_extractions WHERE file_hash = ?",
+                (file_hash,)
+            ).fetchone()
+        if row is not None:
+            status['progress'] = round(row[0] / row[1], 3) if row[1] else 0.0
+        return status
+    
+    def get_extractor_name(self, file_path: str, file_type: str) -> str:
+        """Nom de l'extracteur utilisé pour un fichier (clé de EXTRACTOR_VERSIONS)"""
+        ext = os.path.splitext(file_path.lower())[1]
+        if file_type == 'text':
+            return 'text'
+        if file_type == 'pdf':
+            return 'pdf'
+        if ext in ['.docx', '.doc']:
+            return 'word'
+        if ext in ['.xlsx', '.xls']:
+            return 'excel'
+        if ext in ['.pptx', '.ppt']:
+            return 'powerpoint'
+        if ext == '.csv':
+            return 'csv'
+        return 'unsupported'
+    
+    def extract_content(self, file_path: str, file_type: str) -> Dict[str, Any]:
+        """Extrait le contenu d'un fichier selon son type"""
+        return extract_file_content(file_path, file_type)
     
     def process_file(self, file_path: str, mission_id: str = None) -> Dict[str, Any]:
         """Traite un fichier selon son type"""
+        return self.process_files([file_path], mission_id=mission_id, parallel=False)[0]
+    
+    def process_files(self, file_paths: List[str], mission_id: str = None,
+                      parallel: bool = True) -> List[Dict[str, Any]]:
+        """
+        Traite un lot de fichiers en pipeline : hachage dans le processus courant,
+        extraction des formats lourds (PDF, Office) dans un pool de processus borné,
+        puis une seule écriture des métadonnées pour tout le lot.
+        Un fichier déjà traité par la version courante de son extracteur est
+        réutilisé tel quel (quelle que soit la mission d'origine) et simplement
+        rattaché à la mission.
+        Les résultats sont renvoyés dans l'ordre de `file_paths`.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(file_paths)
+        first_index_by_hash: Dict[str, int] = {}
+        duplicates = []
+        reused_hashes = []
+        pending = {}
         
-        if not os.path.exists(file_path):
-            return {'error': 'Fichier non trouvé'}
-        
-        # Informations de base
-        file_info = {
-            'file_path': file_path,
-            'file_name': os.path.basename(file_path),
-            'file_size': os.path.getsize(file_path),
-            'file_hash': self.get_file_hash(file_path),
-            'processed_at': datetime.now().isoformat(),
-            'mission_id': mission_id
-        }
+        executor = None
+        heavy_count = sum(1 for path in file_paths if self.detect_file_type(path) in CPU_HEAVY_TYPES)
+        if parallel and self.max_workers > 1 and heavy_count > 1:
+            try:
+                # Pas de fork : le processus parent porte des threads (écriture différée,
+                # extraction en arrière-plan) dont les verrous seraient copiés tels quels
+                start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                executor = ProcessPoolExecutor(max_workers=min(self.max_workers, heavy_count),
+                                               mp_context=multiprocessing.get_context(start_method))
+            except (OSError, NotImplementedError) as e:
+                print(f"Pool d'extraction indisponible, traitement séquentiel: {str(e)}")
         
-        # Vérifier si déjà traité
-        if file_info['file_hash'] in self.file_metadata:
-            print(f"Fichier déjà traité: {file_info['file_name']}")
-            return self.file_metadata[file_info['file_hash']]
+        try:
+            for index, file_path in enumerate(file_paths):
+                file_info = {'file_path': file_path, 'file_name': os.path.basename(file_path)}
+                try:
+                    if not os.path.exists(file_path):
+                        results[index] = {'error': 'Fichier non trouvé'}
+                        continue
+                    
+                    # Informations de base
+                    file_info.update({
+                        'file_size': os.path.getsize(file_path),
+                        'file_hash': self.get_file_hash(file_path),
+                        'processed_at': datetime.now().isoformat(),
+                        'mission_id': mission_id
+                    })
+                    file_hash = file_info['file_hash']
+                    
+                    # Détecter le type et l'extracteur
+                    file_type = self.detect_file_type(file_path)
+                    extractor = self.get_extractor_name(file_path, file_type)
+                    file_info['file_type'] = file_type
+                    file_info['extractor'] = extractor
+                    file_info['extractor_version'] = EXTRACTOR_VERSIONS[extractor]
+                    
+                    # Vérifier si déjà traité (y compris plus haut dans le lot)
+                    if file_hash in first_index_by_hash:
+                        duplicates.append((index, first_index_by_hash[file_hash]))
+                        continue
+                    existing = self.get_file_record(file_hash)
+                    if self._is_reusable_record(existing, file_info['extractor_version']):
+                        print(f"Fichier déjà traité: {file_info['file_name']}")
+                        results[index] = {**existing, 'mission_id': mission_id}
+                        reused_hashes.append(file_hash)
+                        continue
+                    first_index_by_hash[file_hash] = index
+                    
+                    print(f"Traitement du fichier: {file_info['file_name']} (type: {file_type})")
+                    
+                    if executor is not None and file_type in CPU_HEAVY_TYPES:
+                        # Fenêtre bornée : le hachage des fichiers suivants avance
+                        # pendant l'extraction sans accumuler tout le lot en mémoire
+                        if len(pending) >= self.max_workers * 2:
+                            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                            for future in done:
+                                self._collect_extraction(future, pending, results)
+                    
+                        future = executor.submit(extract_file_content, file_path, file_type)
+                        pending[future] = (index, file_info)
+                    else:
+                        results[index] = {**file_info, **self.extract_content(file_path, file_type)}
+                except Exception as e:
+                    # Un fichier illisible ne doit pas interrompre le lot
+                    results[index] = {**file_info, 'error': f"Erreur lors du traitement: {str(e)}"}
+            
+            for future in as_completed(list(pending)):
+                self._collect_extraction(future, pending, results)
+        finally:
+            if executor is not None:
+                executor.shutdown()
         
-        # Détecter le type et traiter
-        file_type = self.detect_file_type(file_path)
-        file_info['file_type'] = file_type
+        for index, first_index in duplicates:
+            results[index] = results[first_index]
         
-        print(f"Traitement du fichier: {file_info['file_name']} (type: {file_type})")
+        # Résumé et mots-clés calculés une fois, conservés avec l'enregistrement
+        new_results = [results[index] for index in first_index_by_hash.values()]
+        for result in new_results:
+            if 'error' not in result:
+                try:
+                    result['content_summary'] = self.generate_content_summary(result)
+                    result['keywords'] = self.extract_keywords(result)
+                except Exception as e:
+                    result['error'] = f"Erreur lors de l'analyse: {str(e)}"
         
-        # Traitement selon le type
-        if file_type == 'text':
-            processing_result = self.process_text_file(file_path)
-        elif file_type == 'pdf':
-            processing_result = self.process_pdf_file(file_path)
-        elif file_type == 'office':
-            ext = os.path.splitext(file_path.lower())[1]
-            if ext in ['.docx', '.doc']:
-                processing_result = self.process_word_file(file_path)
-            elif ext in ['.xlsx', '.xls']:
-                processing_result = self.process_excel_file(file_path)
-            elif ext in ['.pptx', '.ppt']:
-                processing_result = self.process_powerpoint_file(file_path)
-            else:
-                processing_result = {'error': 'Type Office non supporté'}
-        elif file_type == 'data':
-            if file_path.lower().endswith('.csv'):
-                processing_result = self.process_csv_file(file_path)
-            else:
-                processing_result = {'error': 'Type de données non supporté'}
-        else:
-            processing_result = {'error': 'Type de fichier non supporté'}
+        # Sauvegarder dans les métadonnées (une seule transaction pour le lot)
+        if new_results:
+            self.save_file_metadata(new_results)
+        if mission_id is not None:
+            self.link_files_to_mission(
+                [result['file_hash'] for result in new_results] + reused_hashes, mission_id
+            )
         
-        # Combiner les informations
-        result = {**file_info, **processing_result}
+        # Ajouter à la base de connaissances (les entrées existantes sont liées, pas dupliquées)
+        for result in new_results:
+            try:
+                self.add_to_knowledge_base(result)
+            except Exception as e:
+                print(f"Erreur ajout base de connaissances {result.get('file_name')}: {str(e)}")
+        if mission_id is not None:
+            for file_hash in reused_hashes:
+                self.link_knowledge_base_entry(file_hash, mission_id)
         
-        # Sauvegarder dans les métadonnées
-        self.file_metadata[file_info['file_hash']] = result
-        self.save_file_metadata()
+        # Les gros documents ne sont extraits qu'en aperçu : la suite en arrière-plan
+        if self.background_extraction and any('deferred_extraction' in result for result in new_results):
+            self.start_deferred_extraction_worker()
         
-        # Ajouter à la base de connaissances
-        self.add_to_knowledge_base(result)
+        return results
+    
+    def _collect_extraction(self, future, pending: Dict[Any, Any],
+                            results: List[Optional[Dict[str, Any]]]):
+        """Récupère le résultat d'une extraction exécutée dans le pool"""
+        index, file_info = pending.pop(future)
+        try:
+            processing_result = future.result()
+        except Exception as e:
+            processing_result = {'error': f"Erreur extraction: {str(e)}"}
         
-        return result
+        # Combiner les informations
+        results[index] = {**file_info, **processing_result}
     
     def add_to_knowledge_base(self, file_result: Dict[str, Any]):
         """Ajoute le fichier traité à la base de connaissances"""
@@ -311,14 +1006,24 @@ class FileProcessor:
             f"{file_result['file_hash']}_summary.json"
         )
         
-        # Préparer le résumé pour la base de connaissances
+        # Préparer le résumé pour la base de connaissances (en conservant les
+        # missions déjà liées si l'entrée est régénérée par un nouvel extracteur)
+        mission_id = file_result.get('mission_id')
+        missions = []
+        if os.path.exists(kb_file_path):
+            with open(kb_file_path, 'r', encoding='utf-8') as f:
+                missions = json.load(f).get('missions', [])
+        if mission_id and mission_id not in missions:
+            missions.append(mission_id)
+        
         kb_entry = {
             'file_name': file_result['file_name'],
             'file_type': file_result['file_type'],
             'processed_at': file_result['processed_at'],
-            'mission_id': file_result.get('mission_id'),
-            'content_summary': self.generate_content_summary(file_result),
-            'keywords': self.extract_keywords(file_result),
+            'mission_id': mission_id,
+            'missions': missions,
+            'content_summary': file_result.get('content_summary') or self.generate_content_summary(file_result),
+            'keywords': file_result.get('keywords') or self.extract_keywords(file_result),
             'metadata': {
                 'file_size': file_result['file_size'],
                 'word_count': file_result.get('word_count', 0)
@@ -331,6 +1036,23 @@ class FileProcessor:
         
         print(f"Fichier ajouté à la base de connaissances: {kb_file_path}")
     
+    def link_knowledge_base_entry(self, file_hash: str, mission_id: str):
+        """Rattache une entrée existante de la base de connaissances à une mission"""
+        kb_file_path = os.path.join(self.processed_files_path, f"{file_hash}_summary.json")
+        if not os.path.exists(kb_file_path):
+            return
+        
+        with open(kb_file_path, 'r', encoding='utf-8') as f:
+            kb_entry = json.load(f)
+        
+        missions = kb_entry.setdefault('missions', [m for m in [kb_entry.get('mission_id')] if m])
+        if mission_id in missions:
+            return
+        missions.append(mission_id)
+        
+        with open(kb_file_path, 'w', encoding='utf-8') as f:
+            json.dump(kb_entry, f, indent=2, ensure_ascii=False)
+    
     def generate_content_summary(self, file_result: Dict[str, Any]) -> str:
         """Génère un résumé du contenu du fichier"""
         
@@ -368,34 +1090,50 @@ class FileProcessor:
     
     def get_processed_files_for_mission(self, mission_id: str) -> List[Dict[str, Any]]:
         """Récupère tous les fichiers traités pour une mission"""
-        
-        mission_files = []
-        for file_hash, file_data in self.file_metadata.items():
-            if file_data.get('mission_id') == mission_id:
-                mission_files.append(file_data)
-        
-        return mission_files
+        records = self._load_records(
+            "p.file_hash IN (SELECT file_hash FROM file_missions WHERE mission_id = ?)",
+            (mission_id,)
+        )
+        for record in records:
+            record['mission_id'] = mission_id
+        return records
     
-    def search_in_processed_files(self, query: str) -> List[Dict[str, Any]]:
+    def search_in_processed_files(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Recherche dans les fichiers traités"""
         
-        results = []
         query_lower = query.lower()
+        if not query_lower.strip():
+            return []
+        
+        if self.fts_enabled:
+            # Index plein texte : phrase exacte, dernier mot en préfixe
+            fts_query = '"' + query.replace('"', '""') + '" *'
+            with sqlite3.connect(self.db_path) as conn:
+                hashes = [row[0] for row in conn.execute("""
+                    SELECT file_hash FROM file_contents_fts 
+                    WHERE file_contents_fts MATCH ? 
+                    ORDER BY rank LIMIT ?
+                """, (fts_query, limit))]
+            placeholders = ",".join("?" * len(hashes))
+            candidates = self._load_records(f"p.file_hash IN ({placeholders})", tuple(hashes)) if hashes else []
+        else:
+            candidates = self._load_records("1=1", ())
         
-        for file_hash, file_data in self.file_metadata.items():
-            # Recherche dans le contenu
+        results = []
+        for file_data in candidates:
             content = file_data.get('content', '').lower()
-            if query_lower in content:
+            relevance = content.count(query_lower)
+            if relevance or self.fts_enabled:
                 results.append({
                     'file_name': file_data['file_name'],
                     'file_type': file_data['file_type'],
-                    'relevance': content.count(query_lower),
+                    'relevance': relevance,
                     'file_data': file_data
                 })
         
         # Trier par pertinence
         results.sort(key=lambda x: x['relevance'], reverse=True)
-        return results
+        return results[:limit]
 
 # Test du processeur de fichiers
 if __name__ == '__main__':
@@ -414,5 +1152,5 @@ if __name__ == '__main__':
         if 'word_count' in result:
             print(f"Mots: {result['word_count']}")
     
-    print(f"\nFichiers traités: {len(processor.file_metadata)}")
+    print(f"\nFichiers traités: {processor.count_processed_files()}")
 
@@ -11,6 +11,7 @@ import datetime
 import asyncio
 import aiohttp
 import hashlib
+import math
 from typing import Dict, List, Optional, Any, Union, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -19,7 +20,8 @@ from pathlib import Path
 import logging
 import time
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
 import schedule
 
 # Configuration logging
@@ -98,6 +100,207 @@ class DailyIntelligenceReport:
     recommendations: List[str]
     generated_at: datetime.datetime
 
+class ScalableBloomFilter:
+    """Filtre de Bloom extensible (chaîne de filtres à capacité croissante)"""
+
+    def __init__(self, initial_capacity: int = 10000, error_rate: float = 0.001,
+                 growth_factor: int = 2, tightening_ratio: float = 0.9):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth_factor = growth_factor
+        self.tightening_ratio = tightening_ratio
+        self.filters: List[Dict[str, Any]] = []
+        self._add_filter()
+
+    def _add_filter(self):
+        """Ajoute un filtre plus grand et plus strict à la chaîne"""
+        depth = len(self.filters)
+        capacity = self.initial_capacity * (self.growth_factor ** depth)
+        error_rate = self.error_rate * (1 - self.tightening_ratio) * (self.tightening_ratio ** depth)
+        size_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        hash_count = max(1, int(round(size_bits / capacity * math.log(2))))
+
+        self.filters.append({
+            "bits": bytearray((size_bits + 7) // 8),
+            "size_bits": size_bits,
+            "hash_count": hash_count,
+            "capacity": capacity,
+            "count": 0
+        })
+
+    @staticmethod
+    def _positions(key: str, size_bits: int, hash_count: int):
+        """Positions des bits par double hachage"""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(hash_count):
+            yield (h1 + i * h2) % size_bits
+
+    def __contains__(self, key: str) -> bool:
+        for bloom in self.filters:
+            if all(bloom["bits"][pos >> 3] & (1 << (pos & 7))
+                   for pos in self._positions(key, bloom["size_bits"], bloom["hash_count"])):
+                return True
+        return False
+
+    def add(self, key: str):
+        """Ajoute une clé (les clés déjà présentes ne sont pas recomptées)"""
+        if key in self:
+            return
+
+        bloom = self.filters[-1]
+        if bloom["count"] >= bloom["capacity"]:
+            self._add_filter()
+            bloom = self.filters[-1]
+
+        for pos in self._positions(key, bloom["size_bits"], bloom["hash_count"]):
+            bloom["bits"][pos >> 3] |= 1 << (pos & 7)
+        bloom["count"] += 1
+
+    def __len__(self) -> int:
+        return sum(bloom["count"] for bloom in self.filters)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(bloom["bits"]) for bloom in self.filters)
+
+class ContentDedupIndex:
+    """
+    Index de déduplication persistant : table SQLite des empreintes de contenu
+    devant un filtre de Bloom extensible, avec expiration par ancienneté.
+    """
+
+    def __init__(self, db_path: Path, retention_days: int = 30, initial_capacity: int = 10000):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.initial_capacity = initial_capacity
+        self.lock = threading.Lock()
+
+        # Empreintes réservées pendant la collecte en cours, pas encore persistées
+        self.pending: Dict[str, datetime.datetime] = {}
+
+        self.stats = {
+            "checked": 0,
+            "new": 0,
+            "duplicates": 0,
+            "bloom_false_positives": 0
+        }
+
+        self._init_table()
+        self._rebuild_bloom()
+
+    def _init_table(self):
+        """Crée la table d'index et la peuple depuis les items existants"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS content_hash_index (
+                    content_hash TEXT PRIMARY KEY,
+                    first_seen TIMESTAMP NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_content_hash_first_seen ON content_hash_index(first_seen)")
+
+            # Reprise des empreintes déjà collectées (première mise en service)
+            if conn.execute("SELECT 1 FROM content_hash_index LIMIT 1").fetchone() is None:
+                conn.execute("""
+                    INSERT OR IGNORE INTO content_hash_index (content_hash, first_seen)
+                    SELECT content_hash, collected_at FROM intelligence_items
+                    WHERE content_hash IS NOT NULL AND collected_at >= ?
+                """, (self._cutoff().isoformat(),))
+            conn.commit()
+
+    def _cutoff(self) -> datetime.datetime:
+        return datetime.datetime.now() - datetime.timedelta(days=self.retention_days)
+
+    def _rebuild_bloom(self):
+        """Reconstruit le filtre de Bloom à partir des empreintes non expirées"""
+        bloom = ScalableBloomFilter(initial_capacity=self.initial_capacity)
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                "SELECT content_hash FROM content_hash_index WHERE first_seen >= ?",
+                (self._cutoff().isoformat(),)
+            )
+            for (content_hash,) in cursor:
+                bloom.add(content_hash)
+
+        with self.lock:
+            for content_hash in self.pending:
+                bloom.add(content_hash)
+            self.bloom = bloom
+
+    def reserve(self, content_hash: str) -> bool:
+        """
+        Réserve une empreinte si elle est nouvelle.
+        Retourne False si le contenu a déjà été collecté pendant la période de rétention.
+        """
+        with self.lock:
+            self.stats["checked"] += 1
+
+            if content_hash in self.pending:
+                self.stats["duplicates"] += 1
+                return False
+
+            if content_hash in self.bloom:
+                # Confirmation en base : le filtre peut donner des faux positifs
+                with sqlite3.connect(self.db_path) as conn:
+                    row = conn.execute(
+                        "SELECT 1 FROM content_hash_index WHERE content_hash = ? AND first_seen >= ?",
+                        (content_hash, self._cutoff().isoformat())
+                    ).fetchone()
+                if row:
+                    self.stats["duplicates"] += 1
+                    return False
+                self.stats["bloom_false_positives"] += 1
+
+            self.bloom.add(content_hash)
+            self.pending[content_hash] = datetime.datetime.now()
+            self.stats["new"] += 1
+            return True
+
+    def release(self, content_hashes: List[str]):
+        """Retire des réservations (après écriture en base ou échec)"""
+        with self.lock:
+            for content_hash in content_hashes:
+                self.pending.pop(content_hash, None)
+
+    def persist(self, conn: sqlite3.Connection, content_hashes: List[str]):
+        """Écrit les empreintes réservées dans la transaction de l'appelant"""
+        with self.lock:
+            rows = [
+                (content_hash, self.pending[content_hash].isoformat())
+                for content_hash in content_hashes if content_hash in self.pending
+            ]
+        conn.executemany(
+            "INSERT OR REPLACE INTO content_hash_index (content_hash, first_seen) VALUES (?, ?)",
+            rows
+        )
+
+    def purge_expired(self) -> int:
+        """Supprime les empreintes expirées et reconstruit le filtre"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                "DELETE FROM content_hash_index WHERE first_seen < ?",
+                (self._cutoff().isoformat(),)
+            )
+            conn.commit()
+            purged = cursor.rowcount
+
+        if purged:
+            self._rebuild_bloom()
+        return purged
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                **self.stats,
+                "pending": len(self.pending),
+                "bloom_entries": len(self.bloom),
+                "bloom_filters": len(self.bloom.filters),
+                "bloom_size_bytes": self.bloom.size_bytes,
+                "retention_days": self.retention_days
+            }
+
 class AdvancedIntelligenceCollector:
     """Collecteur d'intelligence quotidienne avancé"""
     
@@ -117,11 +320,22 @@ class AdvancedIntelligenceCollector:
         # Configuration
         self.max_workers = 10
         self.collection_timeout = 30
+        self.max_requests_per_host = 2
         self.running = False
         self.scheduler_thread = None
         
-        # Cache pour éviter les doublons
-        self.content_hashes = set()
+        # Ordonnancement adaptatif (latence et rendement mesurés par source)
+        self.metrics_smoothing = 0.3
+        self.low_yield_threshold = 0.5  # nouveaux items par collecte
+        self.max_interval_multiplier = 8.0
+        self.host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self.host_semaphores_lock = threading.Lock()
+        self.source_metrics: Dict[str, Dict[str, Any]] = {}
+        self._load_source_metrics()
+        
+        # Index persistant pour éviter les doublons
+        self.dedup_retention_days = 30
+        self.dedup_index = ContentDedupIndex(self.db_path, retention_days=self.dedup_retention_days)
         
         # Statistiques
         self.stats = {
@@ -192,6 +406,18 @@ class AdvancedIntelligenceCollector:
                 )
             """)
             
+            # Table des mesures de collecte par source (ordonnancement adaptatif)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS source_collection_metrics (
+                    source_id TEXT PRIMARY KEY,
+                    avg_latency REAL NOT NULL,
+                    avg_yield REAL NOT NULL,
+                    fetch_count INTEGER NOT NULL,
+                    interval_multiplier REAL NOT NULL,
+                    last_fetch TIMESTAMP
+                )
+            """)
+            
             # Index pour les performances
             conn.execute("CREATE INDEX IF NOT EXISTS idx_items_agent_date ON intelligence_items(agent_id, collected_at)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_items_type ON intelligence_items(intelligence_type)")
@@ -327,8 +553,9 @@ class AdvancedIntelligenceCollector:
             )
         ]
         
+        # Ne pas écraser l'état de collecte persisté (last_collected, success_rate...)
         for source in default_sources:
-            self._save_source(source)
+            self._save_source(source, replace=False)
     
     def start_collection_service(self):
         """Démarre le service de collecte automatique"""
@@ -344,6 +571,7 @@ class AdvancedIntelligenceCollector:
         schedule.every(6).hours.do(self._scheduled_collection_medium_priority)
         schedule.every(12).hours.do(self._scheduled_collection_low_priority)
         schedule.every().day.at("08:00").do(self._generate_daily_reports)
+        schedule.every().day.at("03:00").do(self._purge_dedup_index)
         
         # Thread pour le scheduler
         self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
@@ -391,35 +619,7 @@ class AdvancedIntelligenceCollector:
             "start_time": datetime.datetime.now()
         }
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_source = {
-                executor.submit(self._collect_source, source): source 
-                for source in sources
-            }
-            
-            for future in as_completed(future_to_source):
-                source = future_to_source[future]
-                try:
-                    items = future.result(timeout=self.collection_timeout)
-                    results["collected_items"] += len(items)
-                    results["sources_processed"].append({
-                        "source_id": source.id,
-                        "source_name": source.name,
-                        "items_collected": len(items),
-                        "status": "success"
-                    })
-                    logger.info(f"✅ {source.name}: {len(items)} items collectés")
-                    
-                except Exception as e:
-                    results["errors"] += 1
-                    results["sources_processed"].append({
-                        "source_id": source.id,
-                        "source_name": source.name,
-                        "items_collected": 0,
-                        "status": "error",
-                        "error": str(e)
-                    })
-                    logger.error(f"❌ Erreur {source.name}: {e}")
+        self._collect_sources_concurrently(sources, results)
         
         results["end_time"] = datetime.datetime.now()
         results["duration"] = (results["end_time"] - results["start_time"]).total_seconds()
@@ -431,33 +631,196 @@ class AdvancedIntelligenceCollector:
         return results
     
     def collect_sources_by_priority(self, *priorities: Priority) -> Dict[str, Any]:
-        """Collecte les sources selon leur priorité"""
+        """Collecte les sources dues selon leur priorité et leur intervalle adaptatif"""
         sources = self._get_sources_by_priority(priorities)
-        logger.info(f"🔍 Collecte {len(sources)} sources priorité {[p.name for p in priorities]}")
-        
-        results = {"collected_items": 0, "errors": 0, "sources_processed": []}
-        
-        for source in sources:
-            try:
-                items = self._collect_source(source)
-                results["collected_items"] += len(items)
-                results["sources_processed"].append({
-                    "source_id": source.id,
-                    "items_collected": len(items),
-                    "status": "success"
-                })
-            except Exception as e:
-                results["errors"] += 1
-                results["sources_processed"].append({
-                    "source_id": source.id,
-                    "status": "error",
-                    "error": str(e)
-                })
+        due_sources = [source for source in sources if self._is_source_due(source)]
+        logger.info(f"🔍 Collecte {len(due_sources)}/{len(sources)} sources priorité {[p.name for p in priorities]}")
+        
+        results = {
+            "collected_items": 0,
+            "errors": 0,
+            "sources_processed": [],
+            "sources_skipped": [source.id for source in sources if source not in due_sources]
+        }
+        
+        self._collect_sources_concurrently(due_sources, results)
         
         return results
     
+    def _collect_sources_concurrently(self, sources: List[IntelligenceSource], results: Dict[str, Any]):
+        """
+        Collecte un ensemble de sources en parallèle (pool borné, limite par hôte,
+        délai maximum par source) puis sauvegarde les nouveaux items en une écriture.
+        """
+        if not sources:
+            return
+        
+        # Les sources les plus lentes démarrent en premier pour raccourcir la durée totale
+        ordered_sources = sorted(
+            sources,
+            key=lambda src: self.source_metrics.get(src.id, {}).get("avg_latency", 0.0),
+            reverse=True
+        )
+        
+        started_at: Dict[str, float] = {}
+        new_items = []
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        
+        try:
+            future_to_source = {
+                executor.submit(self._collect_source_timed, source, started_at): source
+                for source in ordered_sources
+            }
+            pending = set(future_to_source)
+            
+            while pending:
+                done, pending = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    source = future_to_source[future]
+                    try:
+                        items, latency = future.result()
+                        new_items.extend(items)
+                        self._record_source_fetch(source, latency, len(items))
+                        self._record_source_result(results, source, len(items), latency=latency)
+                        logger.info(f"✅ {source.name}: {len(items)} items collectés ({latency:.2f}s)")
+                    except Exception as e:
+                        self._record_source_result(results, source, 0, error=str(e))
+                        logger.error(f"❌ Erreur {source.name}: {e}")
+                
+                # Délai par source, compté à partir du début effectif de la collecte
+                now = time.monotonic()
+                for future in list(pending):
+                    source = future_to_source[future]
+                    source_start = started_at.get(source.id)
+                    if source_start is not None and now - source_start > self.collection_timeout:
+                        pending.discard(future)
+                        future.add_done_callback(self._discard_late_collection)
+                        self._record_source_fetch(source, now - source_start, 0)
+                        self._record_source_result(
+                            results, source, 0,
+                            error=f"Délai dépassé ({self.collection_timeout}s)"
+                        )
+                        logger.warning(f"⏱️ {source.name}: délai de collecte dépassé")
+        finally:
+            # Ne pas attendre les collectes bloquées : leurs résultats tardifs sont ignorés
+            executor.shutdown(wait=False)
+        
+        # Une seule écriture groupée pour toute la collecte
+        self._save_intelligence_items(new_items)
+        self._save_source_metrics([source.id for source in sources])
+    
+    def _collect_source_timed(self, source: IntelligenceSource,
+                              started_at: Dict[str, float]) -> Tuple[List[Tuple[IntelligenceItem, str]], float]:
+        """Collecte une source sous la limite de concurrence de son hôte et mesure la latence"""
+        host_semaphore = self._get_host_semaphore(source.url)
+        if not host_semaphore.acquire(timeout=self.collection_timeout):
+            raise TimeoutError(f"Hôte saturé: {urlparse(source.url).netloc}")
+        
+        try:
+            start = time.monotonic()
+            started_at[source.id] = start
+            items = self._collect_source_items(source)
+            return items, time.monotonic() - start
+        finally:
+            host_semaphore.release()
+    
+    def _get_host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """Sémaphore limitant les collectes simultanées vers un même hôte"""
+        host = urlparse(url).netloc.lower() or url
+        with self.host_semaphores_lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.BoundedSemaphore(self.max_requests_per_host)
+            return self.host_semaphores[host]
+    
+    def _discard_late_collection(self, future):
+        """Libère les empreintes réservées par une collecte terminée après son délai"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        items, _ = future.result()
+        self.dedup_index.release([content_hash for _, content_hash in items])
+    
+    def _record_source_result(self, results: Dict[str, Any], source: IntelligenceSource,
+                              items_count: int, latency: float = None, error: str = None):
+        """Ajoute le résultat d'une source au bilan de collecte"""
+        entry = {
+            "source_id": source.id,
+            "source_name": source.name,
+            "items_collected": items_count,
+            "status": "error" if error else "success"
+        }
+        if latency is not None:
+            entry["latency"] = round(latency, 3)
+        if error:
+            entry["error"] = error
+            results["errors"] += 1
+        
+        results["collected_items"] += items_count
+        results["sources_processed"].append(entry)
+    
+    def _record_source_fetch(self, source: IntelligenceSource, latency: float, new_items: int):
+        """Met à jour la latence et le rendement lissés d'une source et son intervalle"""
+        alpha = self.metrics_smoothing
+        metrics = self.source_metrics.get(source.id)
+        
+        if metrics is None:
+            metrics = {
+                "avg_latency": latency,
+                "avg_yield": float(new_items),
+                "fetch_count": 0,
+                "interval_multiplier": 1.0
+            }
+            self.source_metrics[source.id] = metrics
+        else:
+            metrics["avg_latency"] = alpha * latency + (1 - alpha) * metrics["avg_latency"]
+            metrics["avg_yield"] = alpha * new_items + (1 - alpha) * metrics["avg_yield"]
+        
+        metrics["fetch_count"] += 1
+        metrics["last_fetch"] = datetime.datetime.now()
+        
+        # Les sources peu productives sont interrogées moins souvent
+        if metrics["avg_yield"] < self.low_yield_threshold:
+            metrics["interval_multiplier"] = min(self.max_interval_multiplier, metrics["interval_multiplier"] * 2)
+        else:
+            metrics["interval_multiplier"] = max(1.0, metrics["interval_multiplier"] / 2)
+    
+    def _is_source_due(self, source: IntelligenceSource) -> bool:
+        """Indique si une source doit être collectée selon son intervalle adaptatif"""
+        if source.last_collected is None:
+            return True
+        
+        multiplier = self.source_metrics.get(source.id, {}).get("interval_multiplier", 1.0)
+        interval = datetime.timedelta(hours=source.frequency_hours * multiplier)
+        
+        # Tolérance de 10% pour ne pas manquer un créneau du scheduler
+        return datetime.datetime.now() - source.last_collected >= interval * 0.9
+    
+    def get_source_schedule(self) -> List[Dict[str, Any]]:
+        """Retourne les mesures et l'intervalle effectif de chaque source active"""
+        schedule_info = []
+        for source in self._get_active_sources():
+            metrics = self.source_metrics.get(source.id, {})
+            multiplier = metrics.get("interval_multiplier", 1.0)
+            schedule_info.append({
+                "source_id": source.id,
+                "source_name": source.name,
+                "base_frequency_hours": source.frequency_hours,
+                "effective_frequency_hours": source.frequency_hours * multiplier,
+                "avg_latency": round(metrics.get("avg_latency", 0.0), 3),
+                "avg_yield": round(metrics.get("avg_yield", 0.0), 3),
+                "fetch_count": metrics.get("fetch_count", 0),
+                "due": self._is_source_due(source)
+            })
+        return schedule_info
+    
     def _collect_source(self, source: IntelligenceSource) -> List[IntelligenceItem]:
-        """Collecte une source spécifique"""
+        """Collecte une source spécifique et sauvegarde immédiatement ses items"""
+        new_items = self._collect_source_items(source)
+        self._save_intelligence_items(new_items)
+        return [item for item, _ in new_items]
+    
+    def _collect_source_items(self, source: IntelligenceSource) -> List[Tuple[IntelligenceItem, str]]:
+        """Collecte une source et retourne les nouveaux items avec leur empreinte, sans les sauvegarder"""
         items = []
         
         try:
@@ -465,9 +828,9 @@ class AdvancedIntelligenceCollector:
             simulated_items = self._simulate_source_collection(source)
             
             for item_data in simulated_items:
-                # Vérifier les doublons
+                # Vérifier les doublons (index persistant, réservation atomique)
                 content_hash = hashlib.md5(item_data["content"].encode()).hexdigest()
-                if content_hash in self.content_hashes:
+                if not self.dedup_index.reserve(content_hash):
                     continue
                 
                 # Créer l'item d'intelligence
@@ -486,20 +849,18 @@ class AdvancedIntelligenceCollector:
                     collected_at=datetime.datetime.now()
                 )
                 
-                # Sauvegarder l'item
-                self._save_intelligence_item(item, content_hash)
-                items.append(item)
-                self.content_hashes.add(content_hash)
+                items.append((item, content_hash))
             
             # Mettre à jour la source
             source.last_collected = datetime.datetime.now()
             source.success_rate = min(100.0, source.success_rate + 1.0)
             if items:
-                source.avg_relevance = sum(item.relevance_score for item in items) / len(items)
+                source.avg_relevance = sum(item.relevance_score for item, _ in items) / len(items)
             self._update_source(source)
             
         except Exception as e:
-            # Diminuer le taux de succès en cas d'erreur
+            # Libérer les empreintes réservées et diminuer le taux de succès
+            self.dedup_index.release([content_hash for _, content_hash in items])
             source.success_rate = max(0.0, source.success_rate - 5.0)
             self._update_source(source)
             raise e
@@ -580,20 +941,38 @@ class AdvancedIntelligenceCollector:
         agent_data = sample_data.get(source.agent_id, sample_data["general"])
         return random.sample(agent_data, min(len(agent_data), random.randint(1, 3)))
     
-    def _generate_daily_reports(self):
-        """Génère les rapports quotidiens pour tous les agents"""
+    def _generate_daily_reports(self) -> Dict[str, Any]:
+        """Génère en parallèle les rapports quotidiens de tous les agents"""
         logger.info("📋 Génération des rapports quotidiens d'intelligence")
         
         agents = self._get_agents_with_intelligence()
         today = datetime.date.today()
+        results = {"reports_generated": 0, "errors": 0, "agent_timings": {}}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_agent = {
+                executor.submit(self._generate_and_save_daily_report, agent_id, today): agent_id
+                for agent_id in agents
+            }
+            
+            # Chaque rapport est sauvegardé dès qu'il est prêt, dans son propre thread
+            for future, agent_id in future_to_agent.items():
+                try:
+                    results["agent_timings"][agent_id] = round(future.result(), 3)
+                    results["reports_generated"] += 1
+                    logger.info(f"✅ Rapport quotidien généré pour {agent_id}")
+                except Exception as e:
+                    results["errors"] += 1
+                    logger.error(f"❌ Erreur génération rapport {agent_id}: {e}")
         
-        for agent_id in agents:
-            try:
-                report = self._generate_agent_daily_report(agent_id, today)
-                self._save_daily_report(report)
-                logger.info(f"✅ Rapport quotidien généré pour {agent_id}")
-            except Exception as e:
-                logger.error(f"❌ Erreur génération rapport {agent_id}: {e}")
+        return results
+    
+    def _generate_and_save_daily_report(self, agent_id: str, date: datetime.date) -> float:
+        """Génère et sauvegarde le rapport d'un agent, retourne la durée en secondes"""
+        start = time.monotonic()
+        report = self._generate_agent_daily_report(agent_id, date)
+        self._save_daily_report(report)
+        return time.monotonic() - start
     
     def _generate_agent_daily_report(self, agent_id: str, date: datetime.date) -> DailyIntelligenceReport:
         """Génère le rapport quotidien pour un agent"""
@@ -820,6 +1199,7 @@ class AdvancedIntelligenceCollector:
                 "last_collection": last_collection,
                 "agent_stats": agent_stats,
                 "type_stats": type_stats,
+                "dedup_index": self.dedup_index.get_stats(),
                 "collection_status": "running" if self.running else "stopped"
             }
     
@@ -919,11 +1299,12 @@ class AdvancedIntelligenceCollector:
             
             return items
     
-    def _save_source(self, source: IntelligenceSource):
+    def _save_source(self, source: IntelligenceSource, replace: bool = True):
         """Sauvegarde une source d'intelligence"""
+        conflict_clause = "OR REPLACE" if replace else "OR IGNORE"
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO intelligence_sources
+            conn.execute(f"""
+                INSERT {conflict_clause} INTO intelligence_sources
                 (id, name, url, type, intelligence_types, agent_id, priority, frequency_hours, 
                  active, last_collected, success_rate, avg_relevance)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -948,20 +1329,77 @@ class AdvancedIntelligenceCollector:
                 source.success_rate, source.avg_relevance, source.id
             ))
     
-    def _save_intelligence_item(self, item: IntelligenceItem, content_hash: str):
-        """Sauvegarde un item d'intelligence"""
+    def _load_source_metrics(self):
+        """Charge les mesures de collecte persistées"""
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR IGNORE INTO intelligence_items
-                (id, source_id, agent_id, title, content, url, intelligence_type, priority,
-                 relevance_score, sentiment, keywords, collected_at, processed, summary, content_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                item.id, item.source_id, item.agent_id, item.title, item.content, item.url,
-                item.intelligence_type.value, item.priority.value, item.relevance_score,
-                item.sentiment, json.dumps(item.keywords), item.collected_at.isoformat(),
-                item.processed, item.summary, content_hash
+            conn.row_factory = sqlite3.Row
+            for row in conn.execute("SELECT * FROM source_collection_metrics"):
+                self.source_metrics[row['source_id']] = {
+                    "avg_latency": row['avg_latency'],
+                    "avg_yield": row['avg_yield'],
+                    "fetch_count": row['fetch_count'],
+                    "interval_multiplier": row['interval_multiplier'],
+                    "last_fetch": datetime.datetime.fromisoformat(row['last_fetch']) if row['last_fetch'] else None
+                }
+    
+    def _save_source_metrics(self, source_ids: List[str]):
+        """Persiste en une transaction les mesures des sources collectées"""
+        rows = []
+        for source_id in source_ids:
+            metrics = self.source_metrics.get(source_id)
+            if metrics is None:
+                continue
+            last_fetch = metrics.get("last_fetch")
+            rows.append((
+                source_id, metrics["avg_latency"], metrics["avg_yield"], metrics["fetch_count"],
+                metrics["interval_multiplier"], last_fetch.isoformat() if last_fetch else None
             ))
+        
+        if not rows:
+            return
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO source_collection_metrics
+                (source_id, avg_latency, avg_yield, fetch_count, interval_multiplier, last_fetch)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+    
+    def _save_intelligence_items(self, items: List[Tuple[IntelligenceItem, str]]) -> bool:
+        """Sauvegarde un lot d'items et leurs empreintes dans une seule transaction"""
+        if not items:
+            return True
+        
+        content_hashes = [content_hash for _, content_hash in items]
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany("""
+                    INSERT OR IGNORE INTO intelligence_items
+                    (id, source_id, agent_id, title, content, url, intelligence_type, priority,
+                     relevance_score, sentiment, keywords, collected_at, processed, summary, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        item.id, item.source_id, item.agent_id, item.title, item.content, item.url,
+                        item.intelligence_type.value, item.priority.value, item.relevance_score,
+                        item.sentiment, json.dumps(item.keywords), item.collected_at.isoformat(),
+                        item.processed, item.summary, content_hash
+                    )
+                    for item, content_hash in items
+                ])
+                self.dedup_index.persist(conn, content_hashes)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Erreur sauvegarde de {len(items)} items d'intelligence: {e}")
+            return False
+        finally:
+            self.dedup_index.release(content_hashes)
+    
+    def _purge_dedup_index(self):
+        """Purge planifiée des empreintes expirées"""
+        purged = self.dedup_index.purge_expired()
+        if purged:
+            logger.info(f"🧹 {purged} empreintes expirées retirées de l'index de déduplication")
     
     def _save_daily_report(self, report: DailyIntelligenceReport):
         """Sauvegarde un rapport quotidien"""
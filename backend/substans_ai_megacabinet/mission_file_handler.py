@@ -83,33 +83,30 @@ class MissionFileHandler:
             'errors': []
         }
         
-        for file_info in files_info:
-            try:
-                # Traiter le fichier
-                result = self.file_processor.process_file(
-                    file_info['file_path'], 
-                    mission_id=mission_id
-                )
+        # Traitement par lot : extraction parallèle et une seule écriture des métadonnées
+        try:
+            results = self.file_processor.process_files(
+                [file_info['file_path'] for file_info in files_info],
+                mission_id=mission_id
+            )
+        except Exception as e:
+            results = [{'error': str(e)}] * len(files_info)
+        
+        for file_info, result in zip(files_info, results):
+            if 'error' not in result:
+                processing_results['processed_files'].append(result)
                 
-                if 'error' not in result:
-                    processing_results['processed_files'].append(result)
-                    
-                    # Ajouter à la base de connaissances
-                    processing_results['knowledge_base_entries'].append({
-                        'file_name': result['file_name'],
-                        'file_type': result['file_type'],
-                        'content_summary': self.file_processor.generate_content_summary(result)
-                    })
-                else:
-                    processing_results['errors'].append({
-                        'file_name': file_info['original_name'],
-                        'error': result['error']
-                    })
-                    
-            except Exception as e:
+                # Ajouter à la base de connaissances
+                processing_results['knowledge_base_entries'].append({
+                    'file_name': result['file_name'],
+                    'file_type': result['file_type'],
+                    'content_summary': result.get('content_summary') or
+                                       self.file_processor.generate_content_summary(result)
+                })
+            else:
                 processing_results['errors'].append({
                     'file_name': file_info['original_name'],
-                    'error': str(e)
+                    'error': result['error']
                 })
         
         # Générer un résumé d'analyse
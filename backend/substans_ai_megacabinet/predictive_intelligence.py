@@ -10,13 +10,15 @@ import pandas as pd
 import os
 import time
 import uuid
+import hashlib
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
 import sqlite3
 import threading
-from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingClassifier
 from sklearn.linear_model import LinearRegression, LogisticRegression
 from sklearn.preprocessing import StandardScaler, LabelEncoder
@@ -116,6 +118,112 @@ class TrendAnalysis:
     recommendations: List[str]
     detected_at: datetime
 
+class PredictionCache:
+    """
+    Cache de prédictions borné (LRU + TTL) avec déduplication des calculs
+    concurrents : les demandes identiques en vol partagent un seul calcul.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: int = 1800):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, Tuple[float, PredictionResult]]' = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+
+    def get(self, key: str) -> Optional[PredictionResult]:
+        """Retourne le résultat en cache s'il est encore valide"""
+        with self._lock:
+            return self._get_locked(key)
+
+    def acquire(self, key: str) -> Tuple[Optional[PredictionResult], Optional[Future], bool]:
+        """
+        Résout une clé en une seule opération atomique.
+        Retourne (résultat en cache, future à attendre, appelant responsable du calcul).
+        """
+        with self._lock:
+            cached = self._get_locked(key)
+            if cached is not None:
+                return cached, None, False
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return None, future, False
+
+            future = Future()
+            self._inflight[key] = future
+            return None, future, True
+
+    def complete(self, key: str, result: PredictionResult, cacheable: bool = True):
+        """Publie le résultat du calcul aux appelants en attente"""
+        with self._lock:
+            if cacheable:
+                self._entries[key] = (time.time(), result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.stats['evictions'] += 1
+            future = self._inflight.pop(key, None)
+
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def purge_expired(self) -> int:
+        """Supprime les entrées expirées et retourne leur nombre"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired_keys = [key for key, (stored_at, _) in self._entries.items() if stored_at < cutoff]
+            for key in expired_keys:
+                del self._entries[key]
+            self.stats['expirations'] += len(expired_keys)
+        return len(expired_keys)
+
+    def clear(self):
+        """Vide le cache (les calculs en vol ne sont pas interrompus)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Statistiques de hit/miss du cache"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'inflight': len(self._inflight),
+                'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+                **self.stats
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get_locked(self, key: str) -> Optional[PredictionResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+
+        stored_at, result = entry
+        if time.time() - stored_at >= self.ttl:
+            del self._entries[key]
+            self.stats['expirations'] += 1
+            self.stats['misses'] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return result
+
 class PredictiveIntelligence:
     """
     Système d'Intelligence Prédictive avec ML Avancé
@@ -141,13 +249,16 @@ class PredictiveIntelligence:
         self.encoders = {}
         self.model_metrics = {}
         
-        # Données d'entraînement
+        # Données d'entraînement (matrices X, y par type de prédiction)
         self.training_data = {}
         self.feature_definitions = {}
+        self.training_seed = 42
+        self.training_samples_per_type = 1000
         
-        # Cache de prédictions
-        self.prediction_cache = {}
+        # Cache de prédictions (borné, TTL, calculs concurrents dédupliqués)
         self.cache_ttl = 1800  # 30 minutes
+        self.cache_max_size = 1000
+        self.prediction_cache = PredictionCache(max_size=self.cache_max_size, ttl=self.cache_ttl)
         
         # Historique et tendances
         self.prediction_history = []
@@ -310,101 +421,107 @@ class PredictiveIntelligence:
             ]
         }
         
-        # Génération de données d'entraînement synthétiques
-        np.random.seed(42)
+        # Génération vectorisée de données d'entraînement synthétiques
+        rng = np.random.default_rng(self.training_seed)
         
         for prediction_type, features in self.feature_definitions.items():
-            training_samples = []
-            
-            for _ in range(1000):  # 1000 échantillons par type
-                # Génération de features aléatoires
-                feature_values = {}
-                
-                for feature in features:
-                    if 'count' in feature or 'size' in feature:
-                        feature_values[feature] = np.random.randint(1, 20)
-                    elif 'score' in feature or 'level' in feature:
-                        feature_values[feature] = np.random.uniform(0, 1)
-                    elif 'amount' in feature or 'cost' in feature:
-                        feature_values[feature] = np.random.uniform(10000, 500000)
-                    elif 'days' in feature or 'duration' in feature:
-                        feature_values[feature] = np.random.randint(10, 365)
-                    else:
-                        feature_values[feature] = np.random.uniform(0, 1)
-                
-                # Génération de target basée sur les features (logique simplifiée)
-                if prediction_type == PredictionType.PROJECT_SUCCESS:
-                    success_prob = (
-                        feature_values['team_experience'] * 0.3 +
-                        feature_values['client_engagement'] * 0.3 +
-                        (1 - feature_values['complexity_score']) * 0.2 +
-                        feature_values['methodology_maturity'] * 0.2
-                    )
-                    target = 1 if success_prob > 0.6 else 0
-                
-                elif prediction_type == PredictionType.DURATION_ESTIMATE:
-                    base_duration = feature_values['methodology_steps'] * 5
-                    complexity_factor = 1 + feature_values['scope_complexity']
-                    team_factor = max(0.5, 1 - (feature_values['team_size'] - 5) * 0.1)
-                    target = base_duration * complexity_factor * team_factor
-                
-                elif prediction_type == PredictionType.BUDGET_ESTIMATE:
-                    base_cost = feature_values['duration_estimate'] * 1000
-                    team_cost = feature_values['team_composition'] * 50000
-                    complexity_multiplier = 1 + feature_values['complexity_level']
-                    target = (base_cost + team_cost) * complexity_multiplier
-                
-                elif prediction_type == PredictionType.RISK_ASSESSMENT:
-                    risk_score = (
-                        feature_values['project_complexity'] * 0.25 +
-                        feature_values['market_volatility'] * 0.25 +
-                        feature_values['timeline_pressure'] * 0.25 +
-                        (1 - feature_values['stakeholder_alignment']) * 0.25
-                    )
-                    target = min(1.0, risk_score)
-                
-                training_samples.append({
-                    'features': feature_values,
-                    'target': target,
-                    'metadata': {'synthetic': True, 'generated_at': datetime.now().isoformat()}
-                })
+            columns = self._generate_feature_columns(features, self.training_samples_per_type, rng)
+            target = self._compute_synthetic_target(prediction_type, columns)
             
-            self.training_data[prediction_type] = training_samples
+            self.training_data[prediction_type] = (
+                np.column_stack([columns[feature] for feature in features]),
+                target
+            )
         
         self.logger.info(f"Données d'entraînement initialisées pour {len(self.feature_definitions)} types de prédiction")
 
+    def _generate_feature_columns(self, features: List[str], n_samples: int,
+                                  rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """Génère chaque feature comme une colonne complète en un seul tirage"""
+        
+        columns = {}
+        
+        for feature in features:
+            if 'count' in feature or 'size' in feature:
+                columns[feature] = rng.integers(1, 20, n_samples)
+            elif 'score' in feature or 'level' in feature:
+                columns[feature] = rng.uniform(0, 1, n_samples)
+            elif 'amount' in feature or 'cost' in feature:
+                columns[feature] = rng.uniform(10000, 500000, n_samples)
+            elif 'days' in feature or 'duration' in feature:
+                columns[feature] = rng.integers(10, 365, n_samples)
+            else:
+                columns[feature] = rng.uniform(0, 1, n_samples)
+        
+        return columns
+
+    def _compute_synthetic_target(self, prediction_type: PredictionType,
+                                  columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Calcule la cible synthétique à partir des colonnes (logique simplifiée)"""
+        
+        if prediction_type == PredictionType.PROJECT_SUCCESS:
+            success_prob = (
+                columns['team_experience'] * 0.3 +
+                columns['client_engagement'] * 0.3 +
+                (1 - columns['complexity_score']) * 0.2 +
+                columns['methodology_maturity'] * 0.2
+            )
+            return (success_prob > 0.6).astype(int)
+        
+        if prediction_type == PredictionType.DURATION_ESTIMATE:
+            base_duration = columns['methodology_steps'] * 5
+            complexity_factor = 1 + columns['scope_complexity']
+            team_factor = np.maximum(0.5, 1 - (columns['team_size'] - 5) * 0.1)
+            return base_duration * complexity_factor * team_factor
+        
+        if prediction_type == PredictionType.BUDGET_ESTIMATE:
+            base_cost = columns['duration_estimate'] * 1000
+            team_cost = columns['team_composition'] * 50000
+            complexity_multiplier = 1 + columns['complexity_level']
+            return (base_cost + team_cost) * complexity_multiplier
+        
+        if prediction_type == PredictionType.RISK_ASSESSMENT:
+            risk_score = (
+                columns['project_complexity'] * 0.25 +
+                columns['market_volatility'] * 0.25 +
+                columns['timeline_pressure'] * 0.25 +
+                (1 - columns['stakeholder_alignment']) * 0.25
+            )
+            return np.minimum(1.0, risk_score)
+        
+        raise ValueError(f"Pas de générateur synthétique pour {prediction_type}")
+
+    def _samples_to_arrays(self, prediction_type: PredictionType,
+                           samples: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Convertit des échantillons {'features', 'target'} en matrices X, y"""
+        
+        feature_names = self.feature_definitions[prediction_type]
+        X = np.array([
+            [sample['features'].get(feature_name, 0) for feature_name in feature_names]
+            for sample in samples
+        ], dtype=float).reshape(len(samples), len(feature_names))
+        y = np.array([sample['target'] for sample in samples])
+        
+        return X, y
+
     def _train_initial_models(self):
         """Entraîne les modèles initiaux"""
         
-        for prediction_type, samples in self.training_data.items():
+        for prediction_type, (X, y) in self.training_data.items():
             try:
-                self._train_model_for_type(prediction_type, samples)
+                self._train_model_for_type(prediction_type, X, y)
             except Exception as e:
                 self.logger.error(f"Erreur entraînement modèle {prediction_type}: {e}")
         
         self.logger.info(f"{len(self.models)} modèles entraînés")
 
-    def _train_model_for_type(self, prediction_type: PredictionType, samples: List[Dict]):
+    def _train_model_for_type(self, prediction_type: PredictionType, X: np.ndarray, y: np.ndarray):
         """Entraîne un modèle pour un type de prédiction spécifique"""
         
-        if len(samples) < 10:
+        if len(y) < 10:
             self.logger.warning(f"Pas assez de données pour {prediction_type}")
             return
         
-        # Préparation des données
-        features_list = []
-        targets = []
-        
-        for sample in samples:
-            feature_vector = []
-            for feature_name in self.feature_definitions[prediction_type]:
-                feature_vector.append(sample['features'].get(feature_name, 0))
-            features_list.append(feature_vector)
-            targets.append(sample['target'])
-        
-        X = np.array(features_list)
-        y = np.array(targets)
-        
         # Normalisation des features
         scaler = StandardScaler()
         X_scaled = scaler.fit_transform(X)
@@ -445,7 +562,7 @@ class PredictiveIntelligence:
                 mse=0.0,
                 r2_score=0.0,
                 cross_val_score=cv_scores.mean(),
-                training_samples=len(samples),
+                training_samples=len(y),
                 last_trained=datetime.now(),
                 feature_count=len(self.feature_definitions[prediction_type])
             )
@@ -467,7 +584,7 @@ class PredictiveIntelligence:
                 mse=mse,
                 r2_score=r2,
                 cross_val_score=cv_scores.mean(),
-                training_samples=len(samples),
+                training_samples=len(y),
                 last_trained=datetime.now(),
                 feature_count=len(self.feature_definitions[prediction_type])
             )
@@ -507,27 +624,26 @@ class PredictiveIntelligence:
             priority=1
         )
         
-        # Vérification du cache
+        # Vérification du cache (une seule prédiction en vol par clé)
         cache_key = self._generate_prediction_cache_key(prediction_type, input_data)
+        cached_result, pending, is_leader = self.prediction_cache.acquire(cache_key)
+        
+        if cached_result is not None:
+            return cached_result
         
-        if cache_key in self.prediction_cache:
-            cache_entry = self.prediction_cache[cache_key]
-            if time.time() - cache_entry['timestamp'] < self.cache_ttl:
-                return cache_entry['result']
+        if not is_leader:
+            # Demande identique déjà en cours : on partage son résultat
+            return pending.result()
         
         # Prédiction
         try:
             result = self._execute_prediction(request)
             
-            # Cache du résultat
-            self.prediction_cache[cache_key] = {
-                'result': result,
-                'timestamp': time.time()
-            }
+            # Cache du résultat et réveil des demandes en attente
+            self.prediction_cache.complete(cache_key, result)
             
-            # Sauvegarde
-            self._save_prediction_request(request)
-            self._save_prediction_result(result)
+            # Sauvegarde groupée demande + résultat
+            self._save_prediction(request, result)
             
             # Mise à jour des statistiques
             self.system_stats['total_predictions'] += 1
@@ -547,8 +663,8 @@ class PredictiveIntelligence:
         except Exception as e:
             self.logger.error(f"Erreur prédiction {prediction_type}: {e}")
             
-            # Résultat d'erreur
-            return PredictionResult(
+            # Résultat d'erreur (partagé avec les demandes en attente, jamais mis en cache)
+            error_result = PredictionResult(
                 prediction_id=str(uuid.uuid4()),
                 request_id=request_id,
                 prediction_type=prediction_type,
@@ -562,6 +678,9 @@ class PredictiveIntelligence:
                 created_at=datetime.now(),
                 expires_at=datetime.now() + timedelta(hours=1)
             )
+            self.prediction_cache.complete(cache_key, error_result, cacheable=False)
+            
+            return error_result
 
     def _execute_prediction(self, request: PredictionRequest) -> PredictionResult:
         """Exécute une prédiction"""
@@ -852,14 +971,18 @@ class PredictiveIntelligence:
         
         if new_data:
             # Ajout des nouvelles données
-            if prediction_type not in self.training_data:
-                self.training_data[prediction_type] = []
+            new_X, new_y = self._samples_to_arrays(prediction_type, new_data)
             
-            self.training_data[prediction_type].extend(new_data)
+            if prediction_type in self.training_data:
+                X, y = self.training_data[prediction_type]
+                new_X = np.vstack([X, new_X])
+                new_y = np.concatenate([y, new_y])
+            
+            self.training_data[prediction_type] = (new_X, new_y)
         
         # Re-entraînement
         if prediction_type in self.training_data:
-            self._train_model_for_type(prediction_type, self.training_data[prediction_type])
+            self._train_model_for_type(prediction_type, *self.training_data[prediction_type])
             self.logger.info(f"Modèle {prediction_type.value} re-entraîné")
 
     def _generate_prediction_cache_key(self, prediction_type: PredictionType, 
@@ -871,11 +994,11 @@ class PredictiveIntelligence:
             'data': input_data
         }
         
-        key_str = json.dumps(key_data, sort_keys=True)
-        return str(hash(key_str))
+        key_str = json.dumps(key_data, sort_keys=True, default=str)
+        return hashlib.sha256(key_str.encode()).hexdigest()
 
-    def _save_prediction_request(self, request: PredictionRequest):
-        """Sauvegarde une demande de prédiction"""
+    def _save_prediction(self, request: PredictionRequest, result: PredictionResult):
+        """Sauvegarde une demande et son résultat dans une seule transaction"""
         
         try:
             with sqlite3.connect(self.db_path) as conn:
@@ -890,16 +1013,6 @@ class PredictiveIntelligence:
                     json.dumps(request.input_data), json.dumps(request.context),
                     request.requested_at, request.requester_id, request.priority
                 ))
-                conn.commit()
-        except Exception as e:
-            self.logger.error(f"Erreur sauvegarde demande: {e}")
-
-    def _save_prediction_result(self, result: PredictionResult):
-        """Sauvegarde un résultat de prédiction"""
-        
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO prediction_results 
                     (prediction_id, request_id, prediction_type, predicted_value,
@@ -908,7 +1021,7 @@ class PredictiveIntelligence:
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     result.prediction_id, result.request_id, result.prediction_type.value,
-                    json.dumps(result.predicted_value), result.confidence_score,
+                    json.dumps(result.predicted_value, default=str), result.confidence_score,
                     result.confidence_level.value, result.model_used,
                     json.dumps(result.feature_importance),
                     json.dumps(result.prediction_interval),
@@ -916,7 +1029,7 @@ class PredictiveIntelligence:
                 ))
                 conn.commit()
         except Exception as e:
-            self.logger.error(f"Erreur sauvegarde résultat: {e}")
+            self.logger.error(f"Erreur sauvegarde prédiction: {e}")
 
     def _save_model_metrics(self, metrics: ModelMetrics):
         """Sauvegarde les métriques de modèle"""
@@ -1002,8 +1115,8 @@ class PredictiveIntelligence:
         while True:
             try:
                 # Re-entraînement quotidien
-                for prediction_type in self.training_data.keys():
-                    if len(self.training_data[prediction_type]) > 100:
+                for prediction_type, (_, y) in list(self.training_data.items()):
+                    if len(y) > 100:
                         self.retrain_model(prediction_type)
                 
                 time.sleep(86400)  # 24 heures
@@ -1030,17 +1143,10 @@ class PredictiveIntelligence:
         
         while True:
             try:
-                current_time = time.time()
-                expired_keys = [
-                    key for key, entry in self.prediction_cache.items()
-                    if current_time - entry['timestamp'] > self.cache_ttl
-                ]
-                
-                for key in expired_keys:
-                    del self.prediction_cache[key]
+                expired_count = self.prediction_cache.purge_expired()
                 
-                if expired_keys:
-                    self.logger.info(f"{len(expired_keys)} prédictions expirées supprimées du cache")
+                if expired_count:
+                    self.logger.info(f"{expired_count} prédictions expirées supprimées du cache")
                 
                 time.sleep(1800)  # Nettoyage toutes les 30 minutes
                 
@@ -1048,6 +1154,11 @@ class PredictiveIntelligence:
                 self.logger.error(f"Erreur service nettoyage cache: {e}")
                 time.sleep(1800)
 
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Retourne les statistiques du cache de prédictions"""
+        
+        return self.prediction_cache.get_statistics()
+
     def get_system_statistics(self) -> Dict[str, Any]:
         """Retourne les statistiques du système"""
         
@@ -1066,7 +1177,10 @@ class PredictiveIntelligence:
                 'training_samples': metrics.training_samples
             }
         
-        return self.system_stats.copy()
+        stats = self.system_stats.copy()
+        stats['prediction_cache'] = self.get_cache_statistics()
+        
+        return stats
 
 # Instance globale
 _predictive_intelligence = None
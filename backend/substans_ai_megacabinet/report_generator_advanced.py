@@ -5,16 +5,23 @@ Correction et amélioration du système de génération de rapports
 """
 
 import os
+import csv
 import json
 import sqlite3
 import datetime
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Tuple, Iterable, Iterator, Sequence
 from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
+import time
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
 from pathlib import Path
 import base64
 from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, wait
 
 # Imports pour génération documents
 try:
@@ -29,6 +36,7 @@ except ImportError:
 
 try:
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
     from openpyxl.chart import BarChart, Reference, LineChart, PieChart
 except ImportError:
@@ -42,6 +50,19 @@ try:
 except ImportError:
     print("⚠️ python-docx non installé - Génération Word limitée")
 
+# Version des moteurs de rendu : à incrémenter quand la mise en forme d'un format
+# change, pour que les artefacts déjà produits ne soient plus réutilisés
+RENDERER_VERSION = 1
+
+# Nombre d'instantanés de données conservés en mémoire
+SNAPSHOT_CACHE_SIZE = 32
+
+# Exports de grands tableaux en flux : lignes lues par lots depuis le curseur,
+# tableaux PDF découpés en blocs, feuilles Excel en écriture seule
+CURSOR_BATCH_SIZE = 1000
+PDF_TABLE_CHUNK_ROWS = 500
+EXCEL_MAX_ROWS_PER_SHEET = 1048575  # limite Excel, en-tête compris
+
 class ReportType(Enum):
     PERFORMANCE = "performance"
     SECURITY = "security"
@@ -95,6 +116,11 @@ class ReportRequest:
     file_path: Optional[str] = None
     generated_at: Optional[datetime.datetime] = None
     error_message: Optional[str] = None
+    job_id: Optional[str] = None
+    started_at: Optional[datetime.datetime] = None
+    queue_time: Optional[float] = None  # secondes entre la demande et le début du rendu
+    render_time: Optional[float] = None  # secondes de rendu (0 si artefact réutilisé)
+    content_key: Optional[str] = None  # empreinte template + format + paramètres + version des données
 
 @dataclass
 class ReportSchedule:
@@ -109,10 +135,484 @@ class ReportSchedule:
     last_execution: Optional[datetime.datetime] = None
     active: bool = True
 
+# Intervalle entre deux exécutions planifiées (ON_DEMAND : jamais automatique)
+FREQUENCY_INTERVALS = {
+    ReportFrequency.DAILY: datetime.timedelta(days=1),
+    ReportFrequency.WEEKLY: datetime.timedelta(weeks=1),
+    ReportFrequency.MONTHLY: datetime.timedelta(days=30),
+    ReportFrequency.QUARTERLY: datetime.timedelta(days=91),
+    ReportFrequency.YEARLY: datetime.timedelta(days=365)
+}
+
+class StreamingFlowables(list):
+    """
+    Liste de flowables alimentée à la demande par un itérateur. reportlab
+    consomme la tête de liste (et y réinsère les morceaux d'un tableau coupé
+    en fin de page) : seuls quelques blocs sont construits à un instant donné.
+    """
+    
+    def __init__(self, source: Iterable, lookahead: int = 2):
+        super().__init__()
+        self._source = iter(source)
+        self._lookahead = lookahead
+    
+    def _refill(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                list.append(self, next(self._source))
+            except StopIteration:
+                self._source = None
+    
+    def __len__(self):
+        self._refill()
+        return list.__len__(self)
+    
+    def __getitem__(self, index):
+        self._refill()
+        return list.__getitem__(self, index)
+
+def _generate_pdf_report(reports_path: Path, data: Dict[str, Any], template: ReportTemplate,
+                         request: ReportRequest) -> str:
+    """Génère un rapport PDF"""
+    filename = f"{request.name}.pdf"
+    file_path = reports_path / filename
+    
+    # Créer le document PDF
+    doc = SimpleDocTemplate(str(file_path), pagesize=A4)
+    styles = getSampleStyleSheet()
+    story = []
+    
+    # Style personnalisé pour le titre
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.darkblue
+    )
+    
+    # Titre du rapport
+    story.append(Paragraph(template.name, title_style))
+    story.append(Spacer(1, 20))
+    
+    # Date de génération
+    date_style = ParagraphStyle('DateStyle', parent=styles['Normal'], alignment=TA_CENTER)
+    story.append(Paragraph(f"Généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M')}", date_style))
+    story.append(Spacer(1, 30))
+    
+    # Contenu selon le type de rapport
+    if template.type == ReportType.PERFORMANCE:
+        story.extend(_generate_performance_content(data, styles))
+    elif template.type == ReportType.SECURITY:
+        story.extend(_generate_security_content(data, styles))
+    elif template.type == ReportType.MISSIONS:
+        story.extend(_generate_missions_content(data, styles))
+    elif template.type == ReportType.INTELLIGENCE:
+        story.extend(_generate_intelligence_content(data, styles))
+    elif template.type == ReportType.FINANCIAL:
+        story.extend(_generate_financial_content(data, styles))
+    
+    # Construire le PDF
+    doc.build(story)
+    return str(file_path)
+
+def _generate_performance_content(data: Dict[str, Any], styles) -> List:
+    """Génère le contenu du rapport de performance"""
+    content = []
+    
+    # Résumé exécutif
+    content.append(Paragraph("Résumé Exécutif", styles['Heading2']))
+    content.append(Paragraph(
+        f"La plateforme Substans.AI affiche d'excellentes performances avec un score global de "
+        f"{data['system_metrics']['performance_score']}% et un uptime de {data['system_metrics']['uptime']}%. "
+        f"Les {data['system_metrics']['active_agents']} agents ont traité {data['system_metrics']['total_missions']} "
+        f"missions avec un taux de succès de {data['system_metrics']['success_rate']}%.",
+        styles['Normal']
+    ))
+    content.append(Spacer(1, 20))
+    
+    # Métriques système
+    content.append(Paragraph("Métriques Système", styles['Heading2']))
+    metrics_data = [
+        ['Métrique', 'Valeur', 'Statut'],
+        ['Performance Globale', f"{data['system_metrics']['performance_score']}%", 'Excellent'],
+        ['Sécurité', f"{data['system_metrics']['security_score']}%", 'Excellent'],
+        ['Conformité', f"{data['system_metrics']['compliance_score']}%", 'Excellent'],
+        ['Uptime', f"{data['system_metrics']['uptime']}%", 'Optimal']
+    ]
+    
+    metrics_table = Table(metrics_data)
+    metrics_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    content.append(metrics_table)
+    content.append(Spacer(1, 20))
+    
+    # Performance des agents
+    content.append(Paragraph("Performance des Agents", styles['Heading2']))
+    agent_data = [['Agent', 'Performance', 'Missions', 'Satisfaction']]
+    for agent in data['agent_performance']:
+        agent_data.append([
+            agent['name'],
+            f"{agent['performance']}%",
+            str(agent['missions']),
+            f"{agent['satisfaction']}/10"
+        ])
+    
+    agent_table = Table(agent_data)
+    agent_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    content.append(agent_table)
+    
+    return content
+
+def _generate_security_content(data: Dict[str, Any], styles) -> List:
+    """Génère le contenu du rapport de sécurité"""
+    content = []
+    
+    content.append(Paragraph("Vue d'ensemble Sécurité", styles['Heading2']))
+    content.append(Paragraph(
+        f"Score de sécurité global : {data['system_metrics']['security_score']}%. "
+        f"Conformité GDPR/SOX : {data['system_metrics']['compliance_score']}%. "
+        f"{len(data['security_incidents'])} incidents traités ce mois.",
+        styles['Normal']
+    ))
+    content.append(Spacer(1, 20))
+    
+    # Incidents de sécurité
+    content.append(Paragraph("Incidents de Sécurité", styles['Heading2']))
+    incident_data = [['Date', 'Type', 'Sévérité', 'Statut']]
+    for incident in data['security_incidents']:
+        incident_data.append([
+            incident['date'],
+            incident['type'],
+            incident['severity'],
+            'Résolu' if incident['resolved'] else 'En cours'
+        ])
+    
+    incident_table = Table(incident_data)
+    incident_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.red),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    content.append(incident_table)
+    
+    return content
+
+def _generate_missions_content(data: Dict[str, Any], styles) -> List:
+    """Génère le contenu du rapport missions"""
+    content = []
+    missions = data['mission_stats']
+    
+    content.append(Paragraph("Statistiques Missions", styles['Heading2']))
+    content.append(Paragraph(
+        f"Total missions : {missions['total']} | Terminées : {missions['completed']} | "
+        f"Actives : {missions['active']} | Taux succès : {missions['success_rate']}%",
+        styles['Normal']
+    ))
+    
+    return content
+
+def _generate_intelligence_content(data: Dict[str, Any], styles) -> List:
+    """Génère le contenu du rapport intelligence"""
+    content = []
+    
+    content.append(Paragraph("Synthèse Intelligence", styles['Heading2']))
+    content.append(Paragraph(
+        f"Analyse de {len(data['intelligence_insights'])} sources d'intelligence avec "
+        f"relevance moyenne de 9.2/10.",
+        styles['Normal']
+    ))
+    
+    return content
+
+def _generate_financial_content(data: Dict[str, Any], styles) -> List:
+    """Génère le contenu du rapport financier"""
+    content = []
+    finance = data['financial_data']
+    
+    content.append(Paragraph("Analyse Financière", styles['Heading2']))
+    content.append(Paragraph(
+        f"Revenus : €{finance['revenue']:,} | Coûts : €{finance['costs']:,} | "
+        f"Profit : €{finance['profit']:,} | ROI : {finance['roi']}%",
+        styles['Normal']
+    ))
+    
+    return content
+
+def _generate_excel_report(reports_path: Path, data: Dict[str, Any], template: ReportTemplate,
+                           request: ReportRequest) -> str:
+    """Génère un rapport Excel"""
+    filename = f"{request.name}.xlsx"
+    file_path = reports_path / filename
+    
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Rapport"
+    
+    # Style pour les en-têtes
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    
+    # Titre
+    ws['A1'] = template.name
+    ws['A1'].font = Font(size=16, bold=True)
+    ws.merge_cells('A1:D1')
+    
+    # Date
+    ws['A2'] = f"Généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M')}"
+    ws.merge_cells('A2:D2')
+    
+    # Données selon le type
+    if template.type == ReportType.PERFORMANCE:
+        _add_performance_excel_data(data, ws, header_font, header_fill)
+    elif template.type == ReportType.MISSIONS:
+        _add_missions_excel_data(data, ws, header_font, header_fill)
+    elif template.type == ReportType.FINANCIAL:
+        _add_financial_excel_data(data, ws, header_font, header_fill)
+    
+    wb.save(str(file_path))
+    return str(file_path)
+
+def _add_performance_excel_data(data: Dict[str, Any], ws, header_font, header_fill):
+    """Ajoute les données de performance à Excel"""
+    # Métriques système
+    ws['A4'] = "Métriques Système"
+    ws['A4'].font = Font(size=14, bold=True)
+    
+    headers = ['Métrique', 'Valeur', 'Statut']
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=5, column=col, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+    
+    metrics = [
+        ['Performance', f"{data['system_metrics']['performance_score']}%", 'Excellent'],
+        ['Sécurité', f"{data['system_metrics']['security_score']}%", 'Excellent'],
+        ['Uptime', f"{data['system_metrics']['uptime']}%", 'Optimal']
+    ]
+    
+    for row, metric in enumerate(metrics, 6):
+        for col, value in enumerate(metric, 1):
+            ws.cell(row=row, column=col, value=value)
+
+def _add_missions_excel_data(data: Dict[str, Any], ws, header_font, header_fill):
+    """Ajoute les données de missions à Excel"""
+    missions = data['mission_stats']
+    
+    ws['A4'] = "Statistiques Missions"
+    ws['A4'].font = Font(size=14, bold=True)
+    
+    stats = [
+        ['Total Missions', missions['total']],
+        ['Missions Terminées', missions['completed']],
+        ['Missions Actives', missions['active']],
+        ['Taux de Succès', f"{missions['success_rate']}%"],
+        ['Durée Moyenne', f"{missions['avg_duration']} jours"],
+        ['Satisfaction Client', f"{missions['client_satisfaction']}/10"]
+    ]
+    
+    for row, (label, value) in enumerate(stats, 5):
+        ws.cell(row=row, column=1, value=label).font = Font(bold=True)
+        ws.cell(row=row, column=2, value=value)
+
+def _add_financial_excel_data(data: Dict[str, Any], ws, header_font, header_fill):
+    """Ajoute les données financières à Excel"""
+    finance = data['financial_data']
+    
+    ws['A4'] = "Analyse Financière"
+    ws['A4'].font = Font(size=14, bold=True)
+    
+    financials = [
+        ['Revenus', f"€{finance['revenue']:,}"],
+        ['Coûts', f"€{finance['costs']:,}"],
+        ['Profit', f"€{finance['profit']:,}"],
+        ['ROI', f"{finance['roi']}%"],
+        ['Croissance', f"{finance['growth_rate']}%"]
+    ]
+    
+    for row, (label, value) in enumerate(financials, 5):
+        ws.cell(row=row, column=1, value=label).font = Font(bold=True)
+        ws.cell(row=row, column=2, value=value)
+
+def _generate_word_report(reports_path: Path, data: Dict[str, Any], template: ReportTemplate,
+                          request: ReportRequest) -> str:
+    """Génère un rapport Word"""
+    filename = f"{request.name}.docx"
+    file_path = reports_path / filename
+    
+    doc = Document()
+    
+    # Titre
+    title = doc.add_heading(template.name, 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Date
+    date_para = doc.add_paragraph(f"Généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M')}")
+    date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Contenu selon le type
+    if template.type == ReportType.INTELLIGENCE:
+        _add_intelligence_word_content(data, doc)
+    elif template.type == ReportType.PERFORMANCE:
+        _add_performance_word_content(data, doc)
+    
+    doc.save(str(file_path))
+    return str(file_path)
+
+def _add_intelligence_word_content(data: Dict[str, Any], doc):
+    """Ajoute le contenu intelligence au document Word"""
+    doc.add_heading('Synthèse Intelligence Quotidienne', level=1)
+    
+    doc.add_paragraph(
+        f"Cette synthèse présente l'analyse de {len(data['intelligence_insights'])} sources "
+        f"d'intelligence avec une relevance moyenne de 9.2/10."
+    )
+    
+    doc.add_heading('Insights Clés', level=2)
+    for insight in data['intelligence_insights']:
+        doc.add_paragraph(
+            f"• {insight['source']}: {insight['topic']} (Relevance: {insight['relevance']}/10)",
+            style='List Bullet'
+        )
+
+def _add_performance_word_content(data: Dict[str, Any], doc):
+    """Ajoute le contenu performance au document Word"""
+    doc.add_heading('Rapport de Performance', level=1)
+    
+    doc.add_paragraph(
+        f"Score global de performance: {data['system_metrics']['performance_score']}% "
+        f"avec {data['system_metrics']['active_agents']} agents actifs."
+    )
+
+def _generate_html_report(reports_path: Path, data: Dict[str, Any], template: ReportTemplate,
+                          request: ReportRequest) -> str:
+    """Génère un rapport HTML"""
+    filename = f"{request.name}.html"
+    file_path = reports_path / filename
+    
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>{template.name}</title>
+        <style>
+            body {{ font-family: Arial, sans-serif; margin: 40px; }}
+            h1 {{ color: #366092; text-align: center; }}
+            h2 {{ color: #4a90e2; border-bottom: 2px solid #4a90e2; }}
+            table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
+            th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
+            th {{ background-color: #366092; color: white; }}
+            .metric {{ background-color: #f9f9f9; }}
+        </style>
+    </head>
+    <body>
+        <h1>{template.name}</h1>
+        <p style="text-align: center;">Généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M')}</p>
+        
+        <h2>Métriques Principales</h2>
+        <table>
+            <tr><th>Métrique</th><th>Valeur</th></tr>
+            <tr class="metric"><td>Performance</td><td>{data['system_metrics']['performance_score']}%</td></tr>
+            <tr class="metric"><td>Sécurité</td><td>{data['system_metrics']['security_score']}%</td></tr>
+            <tr class="metric"><td>Uptime</td><td>{data['system_metrics']['uptime']}%</td></tr>
+        </table>
+    </body>
+    </html>
+    """
+    
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    
+    return str(file_path)
+
+def _generate_json_report(reports_path: Path, data: Dict[str, Any], template: ReportTemplate,
+                          request: ReportRequest) -> str:
+    """Génère un rapport JSON"""
+    filename = f"{request.name}.json"
+    file_path = reports_path / filename
+    
+    report_data = {
+        "template": {
+            "id": template.id,
+            "name": template.name,
+            "type": template.type.value
+        },
+        "generated_at": datetime.datetime.now().isoformat(),
+        "data": data
+    }
+    
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(report_data, f, indent=2, ensure_ascii=False)
+    
+    return str(file_path)
+
+def render_report(reports_path: Path, data: Dict[str, Any], template: ReportTemplate,
+                  request: ReportRequest) -> str:
+    """
+    Produit le fichier d'un rapport dans le format de la demande, à partir d'un
+    instantané de données. Fonction sans état : elle est exécutée telle quelle
+    dans les processus du pool de rendu.
+    """
+    format = request.format
+    if format == ReportFormat.PDF:
+        return _generate_pdf_report(reports_path, data, template, request)
+    elif format == ReportFormat.EXCEL:
+        return _generate_excel_report(reports_path, data, template, request)
+    elif format == ReportFormat.WORD:
+        return _generate_word_report(reports_path, data, template, request)
+    elif format == ReportFormat.HTML:
+        return _generate_html_report(reports_path, data, template, request)
+    elif format == ReportFormat.JSON:
+        return _generate_json_report(reports_path, data, template, request)
+    else:
+        raise ValueError(f"Format {format.value} non supporté")
+
+def _render_report_in_worker(base_path: str, template: ReportTemplate, request: ReportRequest,
+                             data_snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Point d'entrée des processus de rendu : un format d'un job, sur l'instantané de données du job"""
+    base_path = Path(base_path)
+    
+    started_at = datetime.datetime.now()
+    with sqlite3.connect(base_path / "data" / "reports.db") as conn:
+        conn.execute(
+            "UPDATE report_requests SET status = 'running', started_at = ? WHERE id = ? AND status = 'pending'",
+            (started_at.isoformat(), request.id)
+        )
+    
+    start = time.perf_counter()
+    file_path = render_report(base_path / "reports", data_snapshot, template, request)
+    
+    return {
+        'file_path': file_path,
+        'started_at': started_at,
+        'render_time': time.perf_counter() - start
+    }
+
 class AdvancedReportGenerator:
     """Générateur de rapports avancé avec templates et export multi-format"""
     
-    def __init__(self, base_path: str = "/home/ubuntu/substans_ai_megacabinet"):
+    def __init__(self, base_path: str = "/home/ubuntu/substans_ai_megacabinet",
+                 max_workers: Optional[int] = None):
         self.base_path = Path(base_path)
         self.reports_path = self.base_path / "reports"
         self.templates_path = self.base_path / "report_templates"
@@ -127,6 +627,18 @@ class AdvancedReportGenerator:
         
         # Données simulées pour les rapports
         self.sample_data = self._generate_sample_data()
+        self.data_version = self._compute_data_version()
+        
+        # Instantanés de données par (template, paramètres, version des données)
+        self.snapshot_cache: OrderedDict = OrderedDict()
+        self.snapshot_lock = threading.Lock()
+        self.snapshot_stats = {'hits': 0, 'misses': 0}
+        
+        # Jobs de génération asynchrones (pool de processus créé à la première demande)
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.jobs: Dict[str, Dict[str, Any]] = {}  # job_id -> futures et formats restants
+        self.jobs_lock = threading.RLock()
     
     def _init_database(self):
         """Initialise la base de données des rapports"""
@@ -157,7 +669,33 @@ class AdvancedReportGenerator:
                     status TEXT DEFAULT 'pending',
                     file_path TEXT,
                     generated_at TIMESTAMP,
-                    error_message TEXT
+                    error_message TEXT,
+                    job_id TEXT,
+                    started_at TIMESTAMP,
+                    queue_time REAL,
+                    render_time REAL
+                )
+            """)
+            
+            # Bases existantes : colonnes de suivi des jobs
+            existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(report_requests)")}
+            for column, column_type in [('job_id', 'TEXT'), ('started_at', 'TIMESTAMP'),
+                                        ('queue_time', 'REAL'), ('render_time', 'REAL'),
+                                        ('content_key', 'TEXT')]:
+                if column not in existing_columns:
+                    conn.execute(f"ALTER TABLE report_requests ADD COLUMN {column} {column_type}")
+            
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_report_requests_job ON report_requests(job_id)")
+            
+            # Artefacts rendus, adressés par le contenu de leurs entrées
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS report_artifacts (
+                    content_key TEXT PRIMARY KEY,
+                    format TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    created_at TIMESTAMP,
+                    last_used_at TIMESTAMP,
+                    hits INTEGER DEFAULT 0
                 )
             """)
             
@@ -290,32 +828,36 @@ class AdvancedReportGenerator:
         if not template:
             raise ValueError(f"Template {template_id} non trouvé")
         
+        parameters = parameters or template.parameters
+        data_snapshot, data_version = self._get_data_snapshot(template, parameters)
+        content_key = self._artifact_key(template, format, parameters, data_version)
+        
         # Créer la demande de rapport
         request_id = f"report_{uuid.uuid4().hex[:8]}"
         request = ReportRequest(
             id=request_id,
             template_id=template_id,
-            name=f"{template.name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            name=f"{template.name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{content_key[:8]}",
             format=format,
-            parameters=parameters or template.parameters,
+            parameters=parameters,
             requested_by="system",
-            requested_at=datetime.datetime.now()
+            requested_at=datetime.datetime.now(),
+            content_key=content_key
         )
         
         try:
-            # Générer le rapport selon le format
-            if format == ReportFormat.PDF:
-                file_path = self._generate_pdf_report(template, request)
-            elif format == ReportFormat.EXCEL:
-                file_path = self._generate_excel_report(template, request)
-            elif format == ReportFormat.WORD:
-                file_path = self._generate_word_report(template, request)
-            elif format == ReportFormat.HTML:
-                file_path = self._generate_html_report(template, request)
-            elif format == ReportFormat.JSON:
-                file_path = self._generate_json_report(template, request)
+            # Générer le rapport selon le format (synchrone : pas d'attente en file),
+            # sauf si un rendu identique existe déjà
+            request.started_at = datetime.datetime.now()
+            request.queue_time = 0.0
+            file_path = self._find_artifact(content_key)
+            if file_path is None:
+                start = time.perf_counter()
+                file_path = render_report(self.reports_path, data_snapshot, template, request)
+                request.render_time = time.perf_counter() - start
+                self._register_artifact(content_key, format, file_path)
             else:
-                raise ValueError(f"Format {format.value} non supporté")
+                request.render_time = 0.0
             
             # Mettre à jour la demande
             request.status = "completed"
@@ -330,404 +872,460 @@ class AdvancedReportGenerator:
         self._save_request(request)
         return file_path
     
-    def _generate_pdf_report(self, template: ReportTemplate, request: ReportRequest) -> str:
-        """Génère un rapport PDF"""
-        filename = f"{request.name}.pdf"
-        file_path = self.reports_path / filename
+    def submit_report_job(self, template_id: str, formats: Union[ReportFormat, List[ReportFormat]],
+                          parameters: Dict[str, Any] = None, requested_by: str = "system") -> str:
+        """
+        Met en file la génération d'un rapport et retourne immédiatement l'ID du job.
+        Chaque format devient une demande rendue dans le pool de processus, en
+        parallèle des autres formats, à partir du même instantané de données.
+        Suivi : get_job_status(job_id) ou get_report_history().
+        """
+        template = self._get_template(template_id)
+        if not template:
+            raise ValueError(f"Template {template_id} non trouvé")
         
-        # Créer le document PDF
-        doc = SimpleDocTemplate(str(file_path), pagesize=A4)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Style personnalisé pour le titre
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.darkblue
-        )
+        if isinstance(formats, ReportFormat):
+            formats = [formats]
         
-        # Titre du rapport
-        story.append(Paragraph(template.name, title_style))
-        story.append(Spacer(1, 20))
-        
-        # Date de génération
-        date_style = ParagraphStyle('DateStyle', parent=styles['Normal'], alignment=TA_CENTER)
-        story.append(Paragraph(f"Généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M')}", date_style))
-        story.append(Spacer(1, 30))
-        
-        # Contenu selon le type de rapport
-        if template.type == ReportType.PERFORMANCE:
-            story.extend(self._generate_performance_content(styles))
-        elif template.type == ReportType.SECURITY:
-            story.extend(self._generate_security_content(styles))
-        elif template.type == ReportType.MISSIONS:
-            story.extend(self._generate_missions_content(styles))
-        elif template.type == ReportType.INTELLIGENCE:
-            story.extend(self._generate_intelligence_content(styles))
-        elif template.type == ReportType.FINANCIAL:
-            story.extend(self._generate_financial_content(styles))
-        
-        # Construire le PDF
-        doc.build(story)
-        return str(file_path)
-    
-    def _generate_performance_content(self, styles) -> List:
-        """Génère le contenu du rapport de performance"""
-        content = []
-        data = self.sample_data
-        
-        # Résumé exécutif
-        content.append(Paragraph("Résumé Exécutif", styles['Heading2']))
-        content.append(Paragraph(
-            f"La plateforme Substans.AI affiche d'excellentes performances avec un score global de "
-            f"{data['system_metrics']['performance_score']}% et un uptime de {data['system_metrics']['uptime']}%. "
-            f"Les {data['system_metrics']['active_agents']} agents ont traité {data['system_metrics']['total_missions']} "
-            f"missions avec un taux de succès de {data['system_metrics']['success_rate']}%.",
-            styles['Normal']
-        ))
-        content.append(Spacer(1, 20))
-        
-        # Métriques système
-        content.append(Paragraph("Métriques Système", styles['Heading2']))
-        metrics_data = [
-            ['Métrique', 'Valeur', 'Statut'],
-            ['Performance Globale', f"{data['system_metrics']['performance_score']}%", 'Excellent'],
-            ['Sécurité', f"{data['system_metrics']['security_score']}%", 'Excellent'],
-            ['Conformité', f"{data['system_metrics']['compliance_score']}%", 'Excellent'],
-            ['Uptime', f"{data['system_metrics']['uptime']}%", 'Optimal']
-        ]
+        job_id = f"job_{uuid.uuid4().hex[:12]}"
+        requested_at = datetime.datetime.now()
+        parameters = parameters or template.parameters
         
-        metrics_table = Table(metrics_data)
-        metrics_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        content.append(metrics_table)
-        content.append(Spacer(1, 20))
-        
-        # Performance des agents
-        content.append(Paragraph("Performance des Agents", styles['Heading2']))
-        agent_data = [['Agent', 'Performance', 'Missions', 'Satisfaction']]
-        for agent in data['agent_performance']:
-            agent_data.append([
-                agent['name'],
-                f"{agent['performance']}%",
-                str(agent['missions']),
-                f"{agent['satisfaction']}/10"
-            ])
-        
-        agent_table = Table(agent_data)
-        agent_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        content.append(agent_table)
-        
-        return content
-    
-    def _generate_security_content(self, styles) -> List:
-        """Génère le contenu du rapport de sécurité"""
-        content = []
-        data = self.sample_data
-        
-        content.append(Paragraph("Vue d'ensemble Sécurité", styles['Heading2']))
-        content.append(Paragraph(
-            f"Score de sécurité global : {data['system_metrics']['security_score']}%. "
-            f"Conformité GDPR/SOX : {data['system_metrics']['compliance_score']}%. "
-            f"{len(data['security_incidents'])} incidents traités ce mois.",
-            styles['Normal']
-        ))
-        content.append(Spacer(1, 20))
-        
-        # Incidents de sécurité
-        content.append(Paragraph("Incidents de Sécurité", styles['Heading2']))
-        incident_data = [['Date', 'Type', 'Sévérité', 'Statut']]
-        for incident in data['security_incidents']:
-            incident_data.append([
-                incident['date'],
-                incident['type'],
-                incident['severity'],
-                'Résolu' if incident['resolved'] else 'En cours'
-            ])
-        
-        incident_table = Table(incident_data)
-        incident_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.red),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        content.append(incident_table)
-        
-        return content
-    
-    def _generate_missions_content(self, styles) -> List:
-        """Génère le contenu du rapport missions"""
-        content = []
-        data = self.sample_data['mission_stats']
-        
-        content.append(Paragraph("Statistiques Missions", styles['Heading2']))
-        content.append(Paragraph(
-            f"Total missions : {data['total']} | Terminées : {data['completed']} | "
-            f"Actives : {data['active']} | Taux succès : {data['success_rate']}%",
-            styles['Normal']
-        ))
-        
-        return content
-    
-    def _generate_intelligence_content(self, styles) -> List:
-        """Génère le contenu du rapport intelligence"""
-        content = []
-        data = self.sample_data
-        
-        content.append(Paragraph("Synthèse Intelligence", styles['Heading2']))
-        content.append(Paragraph(
-            f"Analyse de {len(data['intelligence_insights'])} sources d'intelligence avec "
-            f"relevance moyenne de 9.2/10.",
-            styles['Normal']
-        ))
-        
-        return content
-    
-    def _generate_financial_content(self, styles) -> List:
-        """Génère le contenu du rapport financier"""
-        content = []
-        data = self.sample_data['financial_data']
-        
-        content.append(Paragraph("Analyse Financière", styles['Heading2']))
-        content.append(Paragraph(
-            f"Revenus : €{data['revenue']:,} | Coûts : €{data['costs']:,} | "
-            f"Profit : €{data['profit']:,} | ROI : {data['roi']}%",
-            styles['Normal']
-        ))
-        
-        return content
-    
-    def _generate_excel_report(self, template: ReportTemplate, request: ReportRequest) -> str:
-        """Génère un rapport Excel"""
-        filename = f"{request.name}.xlsx"
-        file_path = self.reports_path / filename
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Rapport"
-        
-        # Style pour les en-têtes
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        # Instantané figé des données : tous les formats du job rendent les mêmes valeurs
+        data_snapshot, data_version = self._get_data_snapshot(template, parameters)
         
-        # Titre
-        ws['A1'] = template.name
-        ws['A1'].font = Font(size=16, bold=True)
-        ws.merge_cells('A1:D1')
+        requests = []
+        for report_format in dict.fromkeys(formats):
+            content_key = self._artifact_key(template, report_format, parameters, data_version)
+            request = ReportRequest(
+                id=f"report_{uuid.uuid4().hex[:8]}",
+                template_id=template_id,
+                name=f"{template.name}_{requested_at.strftime('%Y%m%d_%H%M%S')}_{content_key[:8]}",
+                format=report_format,
+                parameters=parameters,
+                requested_by=requested_by,
+                requested_at=requested_at,
+                job_id=job_id,
+                content_key=content_key
+            )
+            
+            # Rendu identique déjà disponible : la demande est satisfaite immédiatement
+            existing_path = self._find_artifact(content_key)
+            if existing_path is not None:
+                request.status = "completed"
+                request.file_path = existing_path
+                request.started_at = requested_at
+                request.generated_at = requested_at
+                request.queue_time = 0.0
+                request.render_time = 0.0
+                self._save_request(request)
+            else:
+                self._save_request(request)
+                requests.append(request)
         
-        # Date
-        ws['A2'] = f"Généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M')}"
-        ws.merge_cells('A2:D2')
+        if not requests:
+            return job_id
         
-        # Données selon le type
-        if template.type == ReportType.PERFORMANCE:
-            self._add_performance_excel_data(ws, header_font, header_fill)
-        elif template.type == ReportType.MISSIONS:
-            self._add_missions_excel_data(ws, header_font, header_fill)
-        elif template.type == ReportType.FINANCIAL:
-            self._add_financial_excel_data(ws, header_font, header_fill)
+        executor = self._get_executor()
+        with self.jobs_lock:
+            # Job enregistré avant les soumissions : un rendu très court peut se
+            # terminer (et appeler son callback) avant la fin de la boucle
+            job = self.jobs[job_id] = {'futures': [], 'remaining': len(requests)}
+            for request in requests:
+                future = executor.submit(
+                    _render_report_in_worker, str(self.base_path), template, request, data_snapshot
+                )
+                job['futures'].append(future)
+                future.add_done_callback(
+                    lambda done, request=request: self._complete_job_request(job_id, request, done)
+                )
         
-        wb.save(str(file_path))
-        return str(file_path)
+        return job_id
     
-    def _add_performance_excel_data(self, ws, header_font, header_fill):
-        """Ajoute les données de performance à Excel"""
-        data = self.sample_data
-        
-        # Métriques système
-        ws['A4'] = "Métriques Système"
-        ws['A4'].font = Font(size=14, bold=True)
-        
-        headers = ['Métrique', 'Valeur', 'Statut']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=5, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-        
-        metrics = [
-            ['Performance', f"{data['system_metrics']['performance_score']}%", 'Excellent'],
-            ['Sécurité', f"{data['system_metrics']['security_score']}%", 'Excellent'],
-            ['Uptime', f"{data['system_metrics']['uptime']}%", 'Optimal']
-        ]
-        
-        for row, metric in enumerate(metrics, 6):
-            for col, value in enumerate(metric, 1):
-                ws.cell(row=row, column=col, value=value)
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self.jobs_lock:
+            if self.executor is None:
+                # forkserver (ou spawn) : les workers ne copient pas les threads et
+                # verrous du processus appelant (callbacks de jobs, cache d'instantanés)
+                start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                    mp_context=multiprocessing.get_context(start_method))
+            return self.executor
     
-    def _add_missions_excel_data(self, ws, header_font, header_fill):
-        """Ajoute les données de missions à Excel"""
-        data = self.sample_data['mission_stats']
-        
-        ws['A4'] = "Statistiques Missions"
-        ws['A4'].font = Font(size=14, bold=True)
+    def _complete_job_request(self, job_id: str, request: ReportRequest, future):
+        """Enregistre le résultat d'un rendu (appelé à la fin de chaque format)"""
+        try:
+            result = future.result()
+            request.status = "completed"
+            request.file_path = result['file_path']
+            request.started_at = result['started_at']
+            request.render_time = result['render_time']
+            request.queue_time = (result['started_at'] - request.requested_at).total_seconds()
+            self._register_artifact(request.content_key, request.format, request.file_path)
+        except Exception as e:
+            request.status = "error"
+            request.error_message = str(e)
         
-        stats = [
-            ['Total Missions', data['total']],
-            ['Missions Terminées', data['completed']],
-            ['Missions Actives', data['active']],
-            ['Taux de Succès', f"{data['success_rate']}%"],
-            ['Durée Moyenne', f"{data['avg_duration']} jours"],
-            ['Satisfaction Client', f"{data['client_satisfaction']}/10"]
-        ]
+        request.generated_at = datetime.datetime.now()
+        self._save_request(request)
         
-        for row, (label, value) in enumerate(stats, 5):
-            ws.cell(row=row, column=1, value=label).font = Font(bold=True)
-            ws.cell(row=row, column=2, value=value)
+        with self.jobs_lock:
+            job = self.jobs.get(job_id)
+            if job is not None:
+                job['remaining'] -= 1
+                if job['remaining'] <= 0:
+                    self.jobs.pop(job_id, None)
     
-    def _add_financial_excel_data(self, ws, header_font, header_fill):
-        """Ajoute les données financières à Excel"""
-        data = self.sample_data['financial_data']
-        
-        ws['A4'] = "Analyse Financière"
-        ws['A4'].font = Font(size=14, bold=True)
+    def wait_for_job(self, job_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Attend la fin d'un job (utile pour les scripts et les tests)"""
+        with self.jobs_lock:
+            job = self.jobs.get(job_id)
+            futures = list(job['futures']) if job else []
+        if futures:
+            wait(futures, timeout=timeout)
+            # Laisser les callbacks de fin enregistrer les résultats
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                with self.jobs_lock:
+                    if job_id not in self.jobs:
+                        break
+                time.sleep(0.01)
+        return self.get_job_status(job_id)
+    
+    def get_job_status(self, job_id: str) -> Dict[str, Any]:
+        """État d'un job : statut global et détail par format"""
+        requests = self.get_report_history(job_id=job_id)
+        if not requests:
+            return {'job_id': job_id, 'status': 'unknown', 'reports': []}
         
-        financials = [
-            ['Revenus', f"€{data['revenue']:,}"],
-            ['Coûts', f"€{data['costs']:,}"],
-            ['Profit', f"€{data['profit']:,}"],
-            ['ROI', f"{data['roi']}%"],
-            ['Croissance', f"{data['growth_rate']}%"]
-        ]
+        statuses = {request.status for request in requests}
+        if statuses == {'completed'}:
+            status = 'completed'
+        elif 'pending' in statuses or 'running' in statuses:
+            status = 'running' if statuses & {'running', 'completed', 'error'} else 'pending'
+        else:
+            status = 'error' if statuses == {'error'} else 'partial'
         
-        for row, (label, value) in enumerate(financials, 5):
-            ws.cell(row=row, column=1, value=label).font = Font(bold=True)
-            ws.cell(row=row, column=2, value=value)
+        return {
+            'job_id': job_id,
+            'status': status,
+            'reports': [
+                {
+                    'request_id': request.id,
+                    'format': request.format.value,
+                    'status': request.status,
+                    'file_path': request.file_path,
+                    'queue_time': request.queue_time,
+                    'render_time': request.render_time,
+                    'error_message': request.error_message
+                }
+                for request in requests
+            ]
+        }
+    
+    def shutdown(self, wait_for_jobs: bool = True):
+        """Arrête le pool de rendu"""
+        with self.jobs_lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait_for_jobs)
+    
+    def export_query(self, db_path: Union[str, Path], query: str, params: Sequence = (),
+                     format: ReportFormat = ReportFormat.EXCEL, title: str = "Export") -> str:
+        """
+        Exporte le résultat d'une requête SQL en flux (Excel, PDF ou CSV) :
+        les lignes sont lues par lots depuis le curseur et écrites au fur et
+        à mesure, en mémoire bornée quel que soit le nombre de lignes.
+        """
+        conn = sqlite3.connect(str(db_path))
+        try:
+            cursor = conn.execute(query, params)
+            headers = [column[0] for column in cursor.description]
+            rows = self._iter_cursor(cursor)
+            file_path = self._export_file_path(title, format)
+            
+            if format == ReportFormat.EXCEL:
+                return self.export_table_excel(title, headers, rows, file_path)
+            elif format == ReportFormat.PDF:
+                return self.export_table_pdf(title, headers, rows, file_path)
+            elif format == ReportFormat.CSV:
+                return self.export_table_csv(headers, rows, file_path)
+            else:
+                raise ValueError(f"Format {format.value} non supporté pour l'export en flux")
+        finally:
+            conn.close()
+    
+    def export_report_history(self, format: ReportFormat = ReportFormat.EXCEL) -> str:
+        """Exporte tout l'historique des demandes de rapports"""
+        return self.export_query(
+            self.db_path,
+            """
+                SELECT id, template_id, name, format, requested_by, requested_at, status,
+                       generated_at, queue_time, render_time, file_path
+                FROM report_requests ORDER BY requested_at
+            """,
+            format=format,
+            title="Historique_Rapports"
+        )
+    
+    def _iter_cursor(self, cursor: sqlite3.Cursor) -> Iterator[tuple]:
+        while True:
+            batch = cursor.fetchmany(CURSOR_BATCH_SIZE)
+            if not batch:
+                return
+            yield from batch
+    
+    def _export_file_path(self, title: str, format: ReportFormat) -> Path:
+        safe_title = "".join(c if c.isalnum() or c in "-_" else "_" for c in title)
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        return self.reports_path / f"{safe_title}_{timestamp}_{uuid.uuid4().hex[:8]}.{format.value}"
     
-    def _generate_word_report(self, template: ReportTemplate, request: ReportRequest) -> str:
-        """Génère un rapport Word"""
-        filename = f"{request.name}.docx"
-        file_path = self.reports_path / filename
+    def export_table_excel(self, title: str, headers: List[str], rows: Iterable[Sequence],
+                           file_path: Union[str, Path]) -> str:
+        """Écrit un tableau dans un classeur en écriture seule (nouvelle feuille à la limite Excel)"""
+        wb = Workbook(write_only=True)
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        sheet_title = "".join(c for c in title if c not in '[]:*?/\\')[:25] or "Export"
         
-        doc = Document()
+        ws = None
+        sheet_rows = 0
+        sheet_count = 0
         
-        # Titre
-        title = doc.add_heading(template.name, 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        def new_sheet():
+            sheet = wb.create_sheet(title=f"{sheet_title}_{sheet_count}" if sheet_count > 1 else sheet_title)
+            header_cells = []
+            for header in headers:
+                cell = WriteOnlyCell(sheet, value=header)
+                cell.font = header_font
+                cell.fill = header_fill
+                header_cells.append(cell)
+            sheet.append(header_cells)
+            return sheet
         
-        # Date
-        date_para = doc.add_paragraph(f"Généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M')}")
-        date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        for row in rows:
+            if ws is None or sheet_rows >= EXCEL_MAX_ROWS_PER_SHEET:
+                sheet_count += 1
+                ws = new_sheet()
+                sheet_rows = 0
+            ws.append([self._excel_value(value) for value in row])
+            sheet_rows += 1
         
-        # Contenu selon le type
-        if template.type == ReportType.INTELLIGENCE:
-            self._add_intelligence_word_content(doc)
-        elif template.type == ReportType.PERFORMANCE:
-            self._add_performance_word_content(doc)
+        if ws is None:
+            sheet_count += 1
+            new_sheet()
         
-        doc.save(str(file_path))
+        wb.save(str(file_path))
         return str(file_path)
     
-    def _add_intelligence_word_content(self, doc):
-        """Ajoute le contenu intelligence au document Word"""
-        data = self.sample_data
-        
-        doc.add_heading('Synthèse Intelligence Quotidienne', level=1)
+    def _excel_value(self, value: Any) -> Any:
+        if value is None or isinstance(value, (int, float, str, datetime.datetime, datetime.date)):
+            return value
+        if isinstance(value, bytes):
+            return value.hex()
+        return str(value)
+    
+    def export_table_pdf(self, title: str, headers: List[str], rows: Iterable[Sequence],
+                         file_path: Union[str, Path]) -> str:
+        """Écrit un tableau PDF par blocs de lignes, découpés page par page avec en-tête répété"""
+        doc = SimpleDocTemplate(str(file_path), pagesize=A4)
+        styles = getSampleStyleSheet()
         
-        doc.add_paragraph(
-            f"Cette synthèse présente l'analyse de {len(data['intelligence_insights'])} sources "
-            f"d'intelligence avec une relevance moyenne de 9.2/10."
-        )
+        def flowables():
+            yield Paragraph(title, styles['Heading1'])
+            yield Paragraph(f"Généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M')}", styles['Normal'])
+            yield Spacer(1, 20)
+            
+            chunk = []
+            emitted = False
+            for row in rows:
+                chunk.append(["" if value is None else str(value) for value in row])
+                if len(chunk) >= PDF_TABLE_CHUNK_ROWS:
+                    yield self._build_stream_table(headers, chunk)
+                    chunk = []
+                    emitted = True
+            if chunk or not emitted:
+                yield self._build_stream_table(headers, chunk)
         
-        doc.add_heading('Insights Clés', level=2)
-        for insight in data['intelligence_insights']:
-            doc.add_paragraph(
-                f"• {insight['source']}: {insight['topic']} (Relevance: {insight['relevance']}/10)",
-                style='List Bullet'
-            )
+        doc.build(StreamingFlowables(flowables()))
+        return str(file_path)
+    
+    def _build_stream_table(self, headers: List[str], chunk: List[List[str]]):
+        table = Table([headers] + chunk, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 7),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey)
+        ]))
+        return table
     
-    def _add_performance_word_content(self, doc):
-        """Ajoute le contenu performance au document Word"""
-        data = self.sample_data
+    def export_table_csv(self, headers: List[str], rows: Iterable[Sequence],
+                         file_path: Union[str, Path]) -> str:
+        """Écrit un tableau CSV ligne à ligne"""
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(rows)
+        return str(file_path)
+    
+    def _compute_data_version(self) -> str:
+        """Version des données sources (empreinte de leur contenu)"""
+        payload = json.dumps(self.sample_data, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def update_report_data(self, updates: Dict[str, Any]):
+        """Met à jour les données sources ; les rapports suivants seront régénérés"""
+        self.sample_data.update(updates)
+        self.data_version = self._compute_data_version()
+    
+    def _get_data_snapshot(self, template: ReportTemplate,
+                           parameters: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """Données du rapport, assemblées une fois par (template, paramètres, version des données)"""
+        data_version = self.data_version
+        key = (template.id, json.dumps(parameters, sort_keys=True, default=str), data_version)
         
-        doc.add_heading('Rapport de Performance', level=1)
+        with self.snapshot_lock:
+            snapshot = self.snapshot_cache.get(key)
+            if snapshot is not None:
+                self.snapshot_cache.move_to_end(key)
+                self.snapshot_stats['hits'] += 1
+                return snapshot, data_version
+            self.snapshot_stats['misses'] += 1
         
-        doc.add_paragraph(
-            f"Score global de performance: {data['system_metrics']['performance_score']}% "
-            f"avec {data['system_metrics']['active_agents']} agents actifs."
-        )
+        # Copie indépendante : une mise à jour des données n'altère pas un rendu en cours
+        snapshot = json.loads(json.dumps(self.sample_data, default=str))
+        
+        with self.snapshot_lock:
+            self.snapshot_cache[key] = snapshot
+            while len(self.snapshot_cache) > SNAPSHOT_CACHE_SIZE:
+                self.snapshot_cache.popitem(last=False)
+        
+        return snapshot, data_version
+    
+    def _artifact_key(self, template: ReportTemplate, report_format: ReportFormat,
+                      parameters: Dict[str, Any], data_version: str) -> str:
+        """Empreinte des entrées d'un rendu"""
+        payload = json.dumps({
+            'template_id': template.id,
+            'template_name': template.name,
+            'template_type': template.type.value,
+            'sections': template.sections,
+            'format': report_format.value,
+            'parameters': parameters,
+            'data_version': data_version,
+            'renderer_version': RENDERER_VERSION
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
     
-    def _generate_html_report(self, template: ReportTemplate, request: ReportRequest) -> str:
-        """Génère un rapport HTML"""
-        filename = f"{request.name}.html"
-        file_path = self.reports_path / filename
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>{template.name}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                h1 {{ color: #366092; text-align: center; }}
-                h2 {{ color: #4a90e2; border-bottom: 2px solid #4a90e2; }}
-                table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
-                th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-                th {{ background-color: #366092; color: white; }}
-                .metric {{ background-color: #f9f9f9; }}
-            </style>
-        </head>
-        <body>
-            <h1>{template.name}</h1>
-            <p style="text-align: center;">Généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M')}</p>
+    def _find_artifact(self, content_key: str) -> Optional[str]:
+        """Chemin d'un rendu existant pour ces entrées, s'il est toujours sur disque"""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT file_path FROM report_artifacts WHERE content_key = ?", (content_key,)
+            ).fetchone()
+            if row is None:
+                return None
             
-            <h2>Métriques Principales</h2>
-            <table>
-                <tr><th>Métrique</th><th>Valeur</th></tr>
-                <tr class="metric"><td>Performance</td><td>{self.sample_data['system_metrics']['performance_score']}%</td></tr>
-                <tr class="metric"><td>Sécurité</td><td>{self.sample_data['system_metrics']['security_score']}%</td></tr>
-                <tr class="metric"><td>Uptime</td><td>{self.sample_data['system_metrics']['uptime']}%</td></tr>
-            </table>
-        </body>
-        </html>
-        """
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            if not os.path.exists(row[0]):
+                conn.execute("DELETE FROM report_artifacts WHERE content_key = ?", (content_key,))
+                return None
+            
+            conn.execute("""
+                UPDATE report_artifacts SET hits = hits + 1, last_used_at = ? 
+                WHERE content_key = ?
+            """, (datetime.datetime.now().isoformat(), content_key))
+            return row[0]
+    
+    def _register_artifact(self, content_key: str, report_format: ReportFormat, file_path: str):
+        now = datetime.datetime.now().isoformat()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO report_artifacts 
+                (content_key, format, file_path, created_at, last_used_at, hits)
+                VALUES (?, ?, ?, ?, ?, 0)
+            """, (content_key, report_format.value, file_path, now, now))
+    
+    def create_schedule(self, template_id: str, frequency: ReportFrequency, format: ReportFormat,
+                        parameters: Dict[str, Any] = None, name: Optional[str] = None,
+                        first_execution: Optional[datetime.datetime] = None) -> ReportSchedule:
+        """Planifie la génération récurrente d'un rapport"""
+        template = self._get_template(template_id)
+        if not template:
+            raise ValueError(f"Template {template_id} non trouvé")
         
-        return str(file_path)
+        schedule = ReportSchedule(
+            id=f"schedule_{uuid.uuid4().hex[:8]}",
+            template_id=template_id,
+            name=name or template.name,
+            frequency=frequency,
+            format=format,
+            parameters=parameters or template.parameters,
+            next_execution=first_execution or datetime.datetime.now()
+        )
+        self._save_schedule(schedule)
+        return schedule
     
-    def _generate_json_report(self, template: ReportTemplate, request: ReportRequest) -> str:
-        """Génère un rapport JSON"""
-        filename = f"{request.name}.json"
-        file_path = self.reports_path / filename
+    def run_due_schedules(self, now: Optional[datetime.datetime] = None) -> List[str]:
+        """
+        Exécute les planifications arrivées à échéance. Si ni les données ni les
+        paramètres n'ont changé depuis la dernière exécution, le rapport existant
+        est réutilisé sans nouveau rendu.
+        """
+        now = now or datetime.datetime.now()
         
-        report_data = {
-            "template": {
-                "id": template.id,
-                "name": template.name,
-                "type": template.type.value
-            },
-            "generated_at": datetime.datetime.now().isoformat(),
-            "data": self.sample_data
-        }
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT * FROM report_schedules 
+                WHERE active = 1 AND next_execution <= ?
+                ORDER BY next_execution
+            """, (now.isoformat(),)).fetchall()
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False)
+        file_paths = []
+        for row in rows:
+            schedule = ReportSchedule(
+                id=row['id'],
+                template_id=row['template_id'],
+                name=row['name'],
+                frequency=ReportFrequency(row['frequency']),
+                format=ReportFormat(row['format']),
+                parameters=json.loads(row['parameters'] or '{}'),
+                next_execution=datetime.datetime.fromisoformat(row['next_execution']),
+                last_execution=datetime.datetime.fromisoformat(row['last_execution']) if row['last_execution'] else None,
+                active=bool(row['active'])
+            )
+            
+            file_path = self.generate_report(schedule.template_id, schedule.format, schedule.parameters)
+            if file_path:
+                file_paths.append(file_path)
+            
+            schedule.last_execution = now
+            interval = FREQUENCY_INTERVALS.get(schedule.frequency)
+            if interval is None:
+                schedule.active = False
+            else:
+                while schedule.next_execution <= now:
+                    schedule.next_execution += interval
+            self._save_schedule(schedule)
         
-        return str(file_path)
+        return file_paths
+    
+    def _save_schedule(self, schedule: ReportSchedule):
+        """Sauvegarde une planification"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO report_schedules
+                (id, template_id, name, frequency, format, parameters, next_execution, last_execution, active)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                schedule.id, schedule.template_id, schedule.name, schedule.frequency.value,
+                schedule.format.value, json.dumps(schedule.parameters),
+                schedule.next_execution.isoformat(),
+                schedule.last_execution.isoformat() if schedule.last_execution else None,
+                schedule.active
+            ))
     
     def get_available_templates(self) -> List[ReportTemplate]:
         """Récupère tous les templates disponibles"""
@@ -752,15 +1350,23 @@ class AdvancedReportGenerator:
             
             return templates
     
-    def get_report_history(self, limit: int = 50) -> List[ReportRequest]:
-        """Récupère l'historique des rapports générés"""
+    def get_report_history(self, limit: int = 50, job_id: Optional[str] = None,
+                           status: Optional[str] = None) -> List[ReportRequest]:
+        """Récupère l'historique des rapports (statut de job, temps d'attente et de rendu)"""
+        query = "SELECT * FROM report_requests WHERE 1=1"
+        params = []
+        if job_id:
+            query += " AND job_id = ?"
+            params.append(job_id)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY requested_at DESC LIMIT ?"
+        params.append(limit)
+        
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM report_requests 
-                ORDER BY requested_at DESC 
-                LIMIT ?
-            """, (limit,))
+            cursor = conn.execute(query, params)
             
             requests = []
             for row in cursor.fetchall():
@@ -775,7 +1381,12 @@ class AdvancedReportGenerator:
                     status=row['status'],
                     file_path=row['file_path'],
                     generated_at=datetime.datetime.fromisoformat(row['generated_at']) if row['generated_at'] else None,
-                    error_message=row['error_message']
+                    error_message=row['error_message'],
+                    job_id=row['job_id'],
+                    started_at=datetime.datetime.fromisoformat(row['started_at']) if row['started_at'] else None,
+                    queue_time=row['queue_time'],
+                    render_time=row['render_time'],
+                    content_key=row['content_key']
                 )
                 requests.append(request)
             
@@ -823,14 +1434,17 @@ class AdvancedReportGenerator:
             conn.execute("""
                 INSERT OR REPLACE INTO report_requests
                 (id, template_id, name, format, parameters, requested_by, requested_at, 
-                 status, file_path, generated_at, error_message)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 status, file_path, generated_at, error_message,
+                 job_id, started_at, queue_time, render_time, content_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 request.id, request.template_id, request.name, request.format.value,
                 json.dumps(request.parameters), request.requested_by,
                 request.requested_at.isoformat(), request.status, request.file_path,
                 request.generated_at.isoformat() if request.generated_at else None,
-                request.error_message
+                request.error_message, request.job_id,
+                request.started_at.isoformat() if request.started_at else None,
+                request.queue_time, request.render_time, request.content_key
             ))
 
 # Instance globale
@@ -40,6 +40,7 @@ from security_manager import SecurityManager
 from rbac_system import RBACSystem
 from audit_system import AuditSystem
 from encryption_system import EncryptionSystem
+from wsgi_server import ServerConfig, serve_wsgi, is_production_mode
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -547,13 +548,43 @@ class SubstansEnterpriseIntegration:
         except Exception as e:
             logger.error(f"Erreur sauvegarde: {e}")
     
-    def run(self, host='0.0.0.0', port=5000, debug=False):
+    def post_fork(self):
+        """Échauffement d'un worker WSGI après le fork (échoue si un système n'a pas pu être réinitialisé)"""
+        failed = []
+        for name, system in self.systems.items():
+            if hasattr(system, 'post_fork'):
+                try:
+                    system.post_fork()
+                except Exception as e:
+                    logger.error(f"Erreur post-fork système {name}: {e}")
+                    failed.append(name)
+        if failed:
+            raise RuntimeError(f"post_fork en échec: {', '.join(failed)}")
+        
+        # Statut à jour dès la première requête du worker
+        self._update_system_status()
+    
+    def run(self, host='0.0.0.0', port=5000, debug=False, production=False,
+            server_config: Optional[ServerConfig] = None):
         """Lance l'application enterprise"""
         logger.info(f"Démarrage Substans Enterprise v{self.config['version']}")
         logger.info(f"Systèmes actifs: {len(self.systems)}")
         logger.info(f"Écoute sur {host}:{port}")
         
-        self.app.run(host=host, port=port, debug=debug, threaded=True)
+        if not production:
+            self.app.run(host=host, port=port, debug=debug, threaded=True)
+            return
+        
+        # Systèmes initialisés une fois dans le maître puis partagés par fork
+        # (preload : un HUP remplace les workers sans recharger le code) ;
+        # les services de fond (monitoring, sauvegardes) restent dans le maître,
+        # post_fork relance dans chaque worker les threads propres au processus
+        # (écriture différée, synchronisation des révocations et blocages)
+        serve_wsgi(
+            app=self.app,
+            config=server_config or ServerConfig(host=host, port=port),
+            post_worker_init=[self.post_fork]
+        )
     
     def shutdown(self):
         """Arrêt propre du système"""
@@ -575,7 +606,7 @@ if __name__ == "__main__":
     try:
         # Créer et lancer l'intégration enterprise
         enterprise = SubstansEnterpriseIntegration()
-        enterprise.run(debug=False)
+        enterprise.run(debug=False, production=is_production_mode())
         
     except KeyboardInterrupt:
         logger.info("Interruption utilisateur")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Serveur WSGI de production pour les applications Flask Substans.AI
+Multi-processus / multi-threads (gunicorn), keep-alive, rechargement gracieux
+et hooks d'initialisation exécutés dans chaque worker après le fork.
+"""
+
+import os
+import logging
+import multiprocessing
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from gunicorn.app.base import BaseApplication
+    GUNICORN_AVAILABLE = True
+except ImportError:
+    BaseApplication = object
+    GUNICORN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+@dataclass
+class ServerConfig:
+    """Configuration du serveur WSGI (surchargeable par variables SUBSTANS_WSGI_*)"""
+    host: str = "0.0.0.0"
+    port: int = 5000
+    workers: int = field(default_factory=lambda: _env_int(
+        'SUBSTANS_WSGI_WORKERS', min(2 * multiprocessing.cpu_count() + 1, 8)))
+    threads: int = field(default_factory=lambda: _env_int('SUBSTANS_WSGI_THREADS', 4))
+    keepalive: int = field(default_factory=lambda: _env_int('SUBSTANS_WSGI_KEEPALIVE', 5))
+    timeout: int = field(default_factory=lambda: _env_int('SUBSTANS_WSGI_TIMEOUT', 60))
+    graceful_timeout: int = field(default_factory=lambda: _env_int('SUBSTANS_WSGI_GRACEFUL_TIMEOUT', 30))
+    max_requests: int = field(default_factory=lambda: _env_int('SUBSTANS_WSGI_MAX_REQUESTS', 0))
+    max_requests_jitter: int = field(default_factory=lambda: _env_int('SUBSTANS_WSGI_MAX_REQUESTS_JITTER', 0))
+    reload: bool = False  # rechargement sur modification du code (développement)
+
+    def to_gunicorn_options(self) -> Dict[str, Any]:
+        return {
+            'bind': f"{self.host}:{self.port}",
+            'workers': self.workers,
+            'threads': self.threads,
+            'worker_class': 'gthread' if self.threads > 1 else 'sync',
+            'keepalive': self.keepalive,
+            'timeout': self.timeout,
+            'graceful_timeout': self.graceful_timeout,
+            'max_requests': self.max_requests,
+            'max_requests_jitter': self.max_requests_jitter,
+            'reload': self.reload,
+        }
+
+def is_production_mode() -> bool:
+    """Mode de service demandé par l'environnement (SUBSTANS_SERVER_MODE=production)"""
+    return os.environ.get('SUBSTANS_SERVER_MODE', '').lower() == 'production'
+
+class SubstansWSGIApplication(BaseApplication):
+    """Application gunicorn embarquée"""
+
+    def __init__(self, app=None, app_factory: Optional[Callable[[], Any]] = None,
+                 options: Optional[Dict[str, Any]] = None,
+                 post_worker_init: Optional[List[Callable[[], None]]] = None):
+        self.application = app
+        self.app_factory = app_factory
+        self.options = options or {}
+        self.post_worker_init_hooks = post_worker_init or []
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+        # Application déjà construite : partagée par fork. Fabrique : construite dans chaque worker.
+        self.cfg.set('preload_app', self.application is not None)
+        self.cfg.set('post_worker_init', self._post_worker_init)
+
+    def load(self):
+        if self.application is None:
+            self.application = self.app_factory()
+        return self.application
+
+    def _post_worker_init(self, worker):
+        for hook in self.post_worker_init_hooks:
+            try:
+                hook()
+            except Exception as e:
+                # Un worker sans son état propre (threads, verrous) ne doit pas
+                # servir : l'exception fait échouer son démarrage dans gunicorn
+                logger.error(f"Erreur initialisation worker {worker.pid}: {e}")
+                raise
+        logger.info(f"Worker {worker.pid} prêt")
+
+def serve_wsgi(app=None, app_factory: Optional[Callable[[], Any]] = None,
+               config: Optional[ServerConfig] = None,
+               post_worker_init: Optional[List[Callable[[], None]]] = None):
+    """
+    Sert une application Flask en production.
+
+    - `app` : application déjà initialisée, partagée entre workers (preload)
+    - `app_factory` : fabrique appelée dans chaque worker après le fork
+    - `post_worker_init` : hooks d'échauffement exécutés dans chaque worker ;
+      une exception fait échouer le démarrage du worker
+
+    `kill -HUP <pid maître>` remplace les workers sans couper les connexions
+    en cours (dans la limite de `graceful_timeout`). Le nouveau code n'est
+    chargé que si `app_factory` importe l'application dans le worker ; avec
+    `app`, le code reste celui du maître et un déploiement demande de
+    redémarrer le serveur.
+    """
+    if app is None and app_factory is None:
+        raise ValueError("app ou app_factory requis")
+
+    config = config or ServerConfig()
+
+    if not GUNICORN_AVAILABLE:
+        logger.warning("gunicorn non installé, repli sur le serveur Flask intégré")
+        app = app if app is not None else app_factory()
+        for hook in post_worker_init or []:
+            hook()
+        app.run(host=config.host, port=config.port, debug=False, threaded=True)
+        return
+
+    logger.info(f"🚀 Serveur WSGI sur {config.host}:{config.port} "
+                f"({config.workers} workers x {config.threads} threads)")
+    SubstansWSGIApplication(
+        app=app,
+        app_factory=app_factory,
+        options=config.to_gunicorn_options(),
+        post_worker_init=post_worker_init
+    ).run()
@@ -151,6 +151,8 @@ class AuditSystem:
                 'debug': 30  # 30 jours
             },
             'archive_after_days': 90,
+            'archive_chunk_size': 5000,  # événements par segment d'archive
+            'archive_max_segments_per_run': 50,
             'compression_enabled': True,
             'integrity_checks': True,
             'real_time_monitoring': True,
@@ -304,6 +306,20 @@ class AuditSystem:
                     checksum TEXT NOT NULL
                 );
                 
+                CREATE TABLE IF NOT EXISTS audit_archive_segments (
+                    archive_file TEXT PRIMARY KEY,
+                    first_rowid INTEGER NOT NULL,
+                    last_rowid INTEGER NOT NULL,
+                    min_timestamp TEXT NOT NULL,
+                    max_timestamp TEXT NOT NULL,
+                    event_count INTEGER NOT NULL,
+                    categories TEXT NOT NULL,
+                    levels TEXT NOT NULL,
+                    users TEXT NOT NULL,
+                    file_checksum TEXT NOT NULL,
+                    archived_at TEXT NOT NULL
+                );
+                
                 CREATE TABLE IF NOT EXISTS compliance_violations (
                     id TEXT PRIMARY KEY,
                     event_id TEXT NOT NULL,
@@ -334,6 +350,8 @@ class AuditSystem:
                 CREATE INDEX IF NOT EXISTS idx_audit_events_level ON audit_events(level);
                 CREATE INDEX IF NOT EXISTS idx_compliance_violations_detected_at ON compliance_violations(detected_at);
                 CREATE INDEX IF NOT EXISTS idx_audit_metrics_timestamp ON audit_metrics(timestamp);
+                CREATE INDEX IF NOT EXISTS idx_audit_archive_event ON audit_archive(original_event_id);
+                CREATE INDEX IF NOT EXISTS idx_archive_segments_time ON audit_archive_segments(max_timestamp);
             """)
     
     def _init_compliance_rules(self):
@@ -649,8 +667,9 @@ class AuditSystem:
                         category: Optional[AuditCategory] = None,
                         level: Optional[AuditLevel] = None,
                         user_id: Optional[str] = None,
-                        limit: int = 1000) -> List[AuditEvent]:
-        """Récupère les événements d'audit"""
+                        limit: int = 1000,
+                        include_archived: bool = True) -> List[AuditEvent]:
+        """Récupère les événements d'audit (base puis segments archivés si nécessaire)"""
         query = "SELECT * FROM audit_events WHERE 1=1"
         params = []
         
@@ -684,33 +703,105 @@ class AuditSystem:
             cursor = conn.execute(query, params)
             
             for row in cursor.fetchall():
-                event = AuditEvent(
-                    id=row['id'],
-                    timestamp=datetime.fromisoformat(row['timestamp']),
-                    level=AuditLevel(row['level']),
-                    category=AuditCategory(row['category']),
-                    event_type=row['event_type'],
-                    user_id=row['user_id'],
-                    session_id=row['session_id'],
-                    ip_address=row['ip_address'],
-                    user_agent=row['user_agent'],
-                    resource_type=row['resource_type'],
-                    resource_id=row['resource_id'],
-                    action=row['action'],
-                    description=row['description'],
-                    details=json.loads(row['details']),
-                    before_state=json.loads(row['before_state']) if row['before_state'] else None,
-                    after_state=json.loads(row['after_state']) if row['after_state'] else None,
-                    success=bool(row['success']),
-                    error_message=row['error_message'],
-                    compliance_tags=json.loads(row['compliance_tags']),
-                    retention_policy=row['retention_policy'],
-                    checksum=row['checksum']
-                )
-                events.append(event)
+                events.append(self._row_to_event(row))
+        
+        if include_archived:
+            events = self._merge_archived_events(events, start_date, end_date,
+                                                 category, level, user_id, limit)
         
         return events
     
+    def _row_to_event(self, row) -> AuditEvent:
+        """Construit un événement depuis une ligne SQLite ou un dict d'archive"""
+        return AuditEvent(
+            id=row['id'],
+            timestamp=datetime.fromisoformat(row['timestamp']),
+            level=AuditLevel(row['level']),
+            category=AuditCategory(row['category']),
+            event_type=row['event_type'],
+            user_id=row['user_id'],
+            session_id=row['session_id'],
+            ip_address=row['ip_address'],
+            user_agent=row['user_agent'],
+            resource_type=row['resource_type'],
+            resource_id=row['resource_id'],
+            action=row['action'],
+            description=row['description'],
+            details=json.loads(row['details']),
+            before_state=json.loads(row['before_state']) if row['before_state'] else None,
+            after_state=json.loads(row['after_state']) if row['after_state'] else None,
+            success=bool(row['success']),
+            error_message=row['error_message'],
+            compliance_tags=json.loads(row['compliance_tags']),
+            retention_policy=row['retention_policy'],
+            checksum=row['checksum']
+        )
+    
+    def _merge_archived_events(self, events: List[AuditEvent],
+                               start_date: Optional[datetime], end_date: Optional[datetime],
+                               category: Optional[AuditCategory], level: Optional[AuditLevel],
+                               user_id: Optional[str], limit: int) -> List[AuditEvent]:
+        """
+        Complète les résultats avec les segments archivés qui peuvent contenir
+        des événements correspondants, du plus récent au plus ancien. Un segment
+        n'est ouvert que si son index (période, catégories, niveaux, utilisateurs)
+        le permet.
+        """
+        query = "SELECT * FROM audit_archive_segments WHERE 1=1"
+        params = []
+        if start_date:
+            query += " AND max_timestamp >= ?"
+            params.append(start_date.isoformat())
+        if end_date:
+            query += " AND min_timestamp <= ?"
+            params.append(end_date.isoformat())
+        query += " ORDER BY max_timestamp DESC"
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            segments = conn.execute(query, params).fetchall()
+        
+        start_iso = start_date.isoformat() if start_date else None
+        end_iso = end_date.isoformat() if end_date else None
+        
+        for segment in segments:
+            # Assez de résultats plus récents que tout ce que contient ce segment
+            if len(events) >= limit:
+                events.sort(key=lambda e: e.timestamp, reverse=True)
+                del events[limit:]
+                if events[-1].timestamp.isoformat() >= segment['max_timestamp']:
+                    break
+            
+            if category and category.value not in json.loads(segment['categories']):
+                continue
+            if level and level.value not in json.loads(segment['levels']):
+                continue
+            if user_id and user_id not in json.loads(segment['users']):
+                continue
+            
+            segment_path = os.path.join(self.archive_path, segment['archive_file'])
+            if not os.path.exists(segment_path):
+                logger.error(f"Segment d'archive manquant: {segment_path}")
+                continue
+            
+            with gzip.open(segment_path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    if start_iso and record['timestamp'] < start_iso:
+                        continue
+                    if end_iso and record['timestamp'] > end_iso:
+                        continue
+                    if category and record['category'] != category.value:
+                        continue
+                    if level and record['level'] != level.value:
+                        continue
+                    if user_id and record['user_id'] != user_id:
+                        continue
+                    events.append(self._row_to_event(record))
+        
+        events.sort(key=lambda e: e.timestamp, reverse=True)
+        return events[:limit]
+    
     def generate_report(self, report_type: str, start_date: datetime,
                        end_date: datetime, generated_by: str,
                        parameters: Dict[str, Any] = None) -> AuditReport:
@@ -987,45 +1078,124 @@ class AuditSystem:
         logger.info("Services d'audit démarrés")
     
     def _archive_old_events(self):
-        """Archive les anciens événements"""
-        archive_date = datetime.now() - timedelta(days=self.config['archive_after_days'])
+        """
+        Archive les anciens événements par segments : lecture en flux par
+        rowid croissant, un fichier JSON Lines compressé par segment, puis une
+        transaction courte par segment (index, registre, suppression par plage).
+        """
+        archive_date = (datetime.now() - timedelta(days=self.config['archive_after_days'])).isoformat()
+        chunk_size = self.config['archive_chunk_size']
+        last_rowid = 0
+        total_archived = 0
+        
+        for _ in range(self.config['archive_max_segments_per_run']):
+            segment = self._write_archive_segment(archive_date, last_rowid, chunk_size)
+            if segment is None:
+                break
+            
+            self._commit_archive_segment(segment, archive_date)
+            last_rowid = segment['last_rowid']
+            total_archived += segment['event_count']
+            
+            if segment['event_count'] < chunk_size:
+                break
+        
+        if total_archived:
+            logger.info(f"Archivé {total_archived} événements")
+    
+    def _write_archive_segment(self, archive_date: str, after_rowid: int,
+                               chunk_size: int) -> Optional[Dict[str, Any]]:
+        """Écrit le prochain lot d'événements dans un segment compressé"""
+        archive_file = f"audit_segment_{int(time.time() * 1000000)}.jsonl.gz"
+        segment_path = os.path.join(self.archive_path, archive_file)
+        
+        segment = {
+            'archive_file': archive_file,
+            'first_rowid': None,
+            'last_rowid': None,
+            'min_timestamp': None,
+            'max_timestamp': None,
+            'event_count': 0,
+            'categories': set(),
+            'levels': set(),
+            'users': set(),
+            'events': []  # (id, checksum) pour le registre
+        }
         
         with sqlite3.connect(self.db_path) as conn:
-            # Récupérer les événements à archiver
+            conn.row_factory = sqlite3.Row
             cursor = conn.execute("""
-                SELECT * FROM audit_events 
-                WHERE timestamp < ? 
-                LIMIT 1000
-            """, (archive_date.isoformat(),))
+                SELECT rowid AS archive_rowid, * FROM audit_events 
+                WHERE timestamp < ? AND rowid > ?
+                ORDER BY rowid
+                LIMIT ?
+            """, (archive_date, after_rowid, chunk_size))
+            
+            with gzip.open(segment_path, 'wt', encoding='utf-8') as f:
+                for row in cursor:
+                    record = dict(row)
+                    rowid = record.pop('archive_rowid')
+                    f.write(json.dumps(record) + "\n")
+                    
+                    if segment['first_rowid'] is None:
+                        segment['first_rowid'] = rowid
+                    segment['last_rowid'] = rowid
+                    timestamp = record['timestamp']
+                    if segment['min_timestamp'] is None or timestamp < segment['min_timestamp']:
+                        segment['min_timestamp'] = timestamp
+                    if segment['max_timestamp'] is None or timestamp > segment['max_timestamp']:
+                        segment['max_timestamp'] = timestamp
+                    segment['categories'].add(record['category'])
+                    segment['levels'].add(record['level'])
+                    if record['user_id']:
+                        segment['users'].add(record['user_id'])
+                    segment['events'].append((record['id'], record['checksum']))
+                    segment['event_count'] += 1
+        
+        if segment['event_count'] == 0:
+            os.remove(segment_path)
+            return None
+        
+        file_hash = hashlib.sha256()
+        with open(segment_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                file_hash.update(block)
+            os.fsync(f.fileno())
+        segment['file_checksum'] = file_hash.hexdigest()
+        
+        return segment
+    
+    def _commit_archive_segment(self, segment: Dict[str, Any], archive_date: str):
+        """Enregistre le segment et supprime ses événements dans une transaction bornée"""
+        archived_at = datetime.now().isoformat()
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT INTO audit_archive_segments 
+                (archive_file, first_rowid, last_rowid, min_timestamp, max_timestamp,
+                 event_count, categories, levels, users, file_checksum, archived_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                segment['archive_file'], segment['first_rowid'], segment['last_rowid'],
+                segment['min_timestamp'], segment['max_timestamp'], segment['event_count'],
+                json.dumps(sorted(segment['categories'])), json.dumps(sorted(segment['levels'])),
+                json.dumps(sorted(segment['users'])), segment['file_checksum'], archived_at
+            ))
             
-            events_to_archive = cursor.fetchall()
+            conn.executemany("""
+                INSERT OR REPLACE INTO audit_archive 
+                (id, original_event_id, archived_at, archive_file, checksum)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (f"arch_{event_id}", event_id, archived_at, segment['archive_file'], checksum)
+                for event_id, checksum in segment['events']
+            ])
             
-            if events_to_archive:
-                # Créer le fichier d'archive
-                archive_file = f"audit_archive_{int(time.time())}.json.gz"
-                archive_path = os.path.join(self.archive_path, archive_file)
-                
-                # Compresser et sauvegarder
-                with gzip.open(archive_path, 'wt') as f:
-                    json.dump([dict(row) for row in events_to_archive], f)
-                
-                # Enregistrer dans la table d'archive
-                for event in events_to_archive:
-                    conn.execute("""
-                        INSERT INTO audit_archive 
-                        (id, original_event_id, archived_at, archive_file, checksum)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (
-                        f"arch_{int(time.time() * 1000000)}", event['id'],
-                        datetime.now().isoformat(), archive_file, event['checksum']
-                    ))
-                
-                # Supprimer les événements archivés
-                event_ids = [event['id'] for event in events_to_archive]
-                placeholders = ','.join(['?' for _ in event_ids])
-                conn.execute(f"DELETE FROM audit_events WHERE id IN ({placeholders})", event_ids)
-                
-                logger.info(f"Archivé {len(events_to_archive)} événements dans {archive_file}")
+            # Suppression par plage de rowid, avec le même critère que la lecture
+            conn.execute("""
+                DELETE FROM audit_events 
+                WHERE rowid BETWEEN ? AND ? AND timestamp < ?
+            """, (segment['first_rowid'], segment['last_rowid'], archive_date))
     
     def _cleanup_expired_events(self):
         """Nettoie les événements expirés"""
@@ -17,11 +17,15 @@ from enum import Enum
 import sqlite3
 import threading
 import time
+import itertools
+import atexit
+from collections import OrderedDict
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
 from cryptography.hazmat.backends import default_backend
 import hmac
 
@@ -130,6 +134,72 @@ class EncryptionPolicy:
         data['updated_at'] = self.updated_at.isoformat()
         return data
 
+class KeyCache:
+    """
+    Cache borné et expirant des clés déchiffrées, avec les objets de
+    chiffrement associés (réutilisés d'une opération à l'autre).
+    """
+    
+    def __init__(self, max_size: int = 1000, ttl_seconds: int = 900):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict = OrderedDict()  # key_id -> [clé, expiration, chiffreurs]
+        self.lock = threading.RLock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def get(self, key_id: str) -> Optional['EncryptionKey']:
+        entry = self._get_entry(key_id)
+        return entry[0] if entry else None
+    
+    def get_ciphers(self, key_id: str) -> Optional[Dict[str, Any]]:
+        """Objets de chiffrement construits pour cette clé"""
+        with self.lock:
+            entry = self.entries.get(key_id)
+            return entry[2] if entry else None
+    
+    def put(self, key: 'EncryptionKey'):
+        with self.lock:
+            self.entries[key.id] = [key, time.monotonic() + self.ttl_seconds, {}]
+            self.entries.move_to_end(key.id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+    
+    def invalidate(self, key_id: str):
+        with self.lock:
+            self.entries.pop(key_id, None)
+    
+    def remove_if(self, predicate) -> int:
+        """Retire les clés expirées du cache ou satisfaisant le prédicat"""
+        now = time.monotonic()
+        with self.lock:
+            removed = [key_id for key_id, (key, expires, _) in self.entries.items()
+                       if expires <= now or predicate(key)]
+            for key_id in removed:
+                del self.entries[key_id]
+        return len(removed)
+    
+    def _get_entry(self, key_id: str) -> Optional[list]:
+        with self.lock:
+            entry = self.entries.get(key_id)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    # Matériel de clé expiré : rechargé depuis le keystore au prochain accès
+                    del self.entries[key_id]
+                self.stats['misses'] += 1
+                return None
+            
+            self.entries.move_to_end(key_id)
+            self.stats['hits'] += 1
+            return entry
+    
+    def hit_rate(self) -> float:
+        total = self.stats['hits'] + self.stats['misses']
+        return round(self.stats['hits'] / total * 100, 2) if total else 0.0
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+
 class EncryptionSystem:
     """Système de chiffrement enterprise"""
     
@@ -146,12 +216,29 @@ class EncryptionSystem:
             'max_key_age_days': 365,
             'require_key_backup': True,
             'audit_all_operations': True,
-            'performance_monitoring': True
+            'performance_monitoring': True,
+            'write_behind_interval': 2,  # secondes entre deux écritures groupées
+            'write_behind_batch_size': 5000,
+            'usage_lease_size': 100  # utilisations réservées en base par bloc (clés avec max_usage)
         }
         
-        # Cache des clés actives
-        self.key_cache = {}
-        self.cache_lock = threading.RLock()
+        # Cache des clés actives (borné, expirant) et index des politiques
+        self.key_cache = KeyCache(max_size=1000, ttl_seconds=900)
+        self.cache_lock = self.key_cache.lock
+        self.policy_index: Dict[str, EncryptionPolicy] = {}  # data_type -> politique
+        self.selected_keys: Dict[Tuple[str, str], str] = {}  # (algorithme, niveau) -> key_id
+        
+        # Compteurs d'utilisation en mémoire, blocs d'utilisations réservés en
+        # base pour les clés avec max_usage, et écritures différées
+        self.usage_lock = threading.Lock()
+        self.lease_lock = threading.Lock()
+        self.usage_counts: Dict[str, int] = {}
+        self.usage_leases: Dict[str, int] = {}  # key_id -> utilisations réservées non consommées
+        self.pending_usage: Dict[str, int] = {}
+        self.pending_operations: List[tuple] = []
+        self.pending_registrations: List[tuple] = []
+        self.write_behind_wakeup = threading.Event()
+        self.record_sequence = itertools.count()
         
         # Métriques de performance
         self.performance_metrics = {
@@ -208,6 +295,7 @@ class EncryptionSystem:
         self._init_database()
         self._init_master_key()
         self._init_default_policies()
+        self._rebuild_policy_index()
         self._start_encryption_services()
         
         logger.info("Encryption System initialisé")
@@ -433,8 +521,9 @@ class EncryptionSystem:
         self._save_key(encryption_key)
         
         # Ajouter au cache
-        with self.cache_lock:
-            self.key_cache[key_id] = encryption_key
+        with self.usage_lock:
+            self.usage_counts[key_id] = 0
+        self.key_cache.put(encryption_key)
         
         # Mettre à jour les métriques
         self.performance_metrics['key_generations'] += 1
@@ -481,9 +570,9 @@ class EncryptionSystem:
     def get_key(self, key_id: str) -> Optional[EncryptionKey]:
         """Récupère une clé de chiffrement"""
         # Vérifier le cache
-        with self.cache_lock:
-            if key_id in self.key_cache:
-                return self.key_cache[key_id]
+        cached = self.key_cache.get(key_id)
+        if cached is not None:
+            return cached
         
         # Charger depuis la base de données
         with sqlite3.connect(self.db_path) as conn:
@@ -528,191 +617,264 @@ class EncryptionSystem:
             is_active=bool(row['is_active'])
         )
         
+        # Le compteur en mémoire inclut les utilisations pas encore écrites
+        with self.usage_lock:
+            encryption_key.usage_count = self.usage_counts.setdefault(key_id, encryption_key.usage_count)
+        
         # Ajouter au cache
-        with self.cache_lock:
-            self.key_cache[key_id] = encryption_key
+        self.key_cache.put(encryption_key)
         
         return encryption_key
     
+    def _get_ciphers(self, key: EncryptionKey) -> Dict[str, Any]:
+        """
+        Objets de chiffrement réutilisables pour une clé (AESGCM, Fernet,
+        HMAC préparé...), construits au premier usage et gardés avec la clé.
+        """
+        ciphers = self.key_cache.get_ciphers(key.id)
+        if ciphers is None:
+            # Clé hors cache (évincée entre-temps) : objets non conservés
+            ciphers = {}
+        
+        if not ciphers:
+            if key.algorithm == EncryptionAlgorithm.AES_256_GCM:
+                ciphers['aesgcm'] = AESGCM(key.key_data)
+            elif key.algorithm == EncryptionAlgorithm.AES_256_CBC:
+                ciphers['aes'] = algorithms.AES(key.key_data)
+            elif key.algorithm == EncryptionAlgorithm.FERNET:
+                ciphers['fernet'] = Fernet(key.key_data)
+            elif key.algorithm == EncryptionAlgorithm.CHACHA20_POLY1305:
+                ciphers['chacha'] = ChaCha20Poly1305(key.key_data)
+        
+        return ciphers
+    
     def encrypt_data(self, data: Union[str, bytes], key_id: Optional[str] = None,
                     algorithm: Optional[EncryptionAlgorithm] = None,
                     data_type: Optional[str] = None,
                     user_id: Optional[str] = None,
                     ip_address: str = "") -> EncryptionResult:
         """Chiffre des données"""
-        
-        start_time = time.time()
+        return self.encrypt_bulk([data], key_id, algorithm, data_type, user_id, ip_address)[0]
+    
+    def encrypt_bulk(self, payloads: List[Union[str, bytes]], key_id: Optional[str] = None,
+                     algorithm: Optional[EncryptionAlgorithm] = None,
+                     data_type: Optional[str] = None,
+                     user_id: Optional[str] = None,
+                     ip_address: str = "") -> List[EncryptionResult]:
+        """
+        Chiffre une liste de données avec une même clé (ex. chiffrement de
+        champs PII) : une résolution de clé, une réservation d'utilisation
+        atomique pour tout le lot, journalisation écrite par lots.
+        """
+        if not payloads:
+            return []
         
         # Convertir en bytes si nécessaire
-        if isinstance(data, str):
-            data = data.encode('utf-8')
-        
-        # Déterminer la clé à utiliser
-        if not key_id:
-            # Sélectionner une clé selon la politique
-            key_id = self._select_key_for_data_type(data_type, algorithm)
+        payloads = [data.encode('utf-8') if isinstance(data, str) else data for data in payloads]
         
-        if not key_id:
-            # Générer une nouvelle clé si nécessaire
-            algorithm = algorithm or self.config['default_algorithm']
-            key_id = self.generate_key(
-                name=f"auto_key_{data_type or 'generic'}",
-                algorithm=algorithm,
-                security_level=self.config['default_security_level']
-            )
+        # Déterminer la clé et réserver les utilisations
+        key = self._resolve_encryption_key(key_id, algorithm, data_type, len(payloads))
+        ciphers = self._get_ciphers(key)
         
-        # Récupérer la clé
-        key = self.get_key(key_id)
-        if not key:
-            raise ValueError(f"Clé introuvable: {key_id}")
-        
-        # Vérifier la validité de la clé
-        if not key.is_active:
-            raise ValueError(f"Clé inactive: {key_id}")
-        
-        if key.expires_at and key.expires_at < datetime.now():
-            raise ValueError(f"Clé expirée: {key_id}")
-        
-        if key.max_usage and key.usage_count >= key.max_usage:
-            raise ValueError(f"Limite d'utilisation atteinte: {key_id}")
-        
-        # Chiffrer selon l'algorithme
+        results = []
+        data = b""
+        start_time = time.time()
         try:
-            if key.algorithm == EncryptionAlgorithm.AES_256_GCM:
-                encrypted_data, iv, tag = self._encrypt_aes_gcm(data, key.key_data)
-            elif key.algorithm == EncryptionAlgorithm.AES_256_CBC:
-                encrypted_data, iv = self._encrypt_aes_cbc(data, key.key_data, key.iv)
-                tag = None
-            elif key.algorithm == EncryptionAlgorithm.FERNET:
-                fernet = Fernet(key.key_data)
-                encrypted_data = fernet.encrypt(data)
-                iv = None
-                tag = None
-            elif key.algorithm == EncryptionAlgorithm.CHACHA20_POLY1305:
-                encrypted_data, iv, tag = self._encrypt_chacha20_poly1305(data, key.key_data)
-            else:
-                raise ValueError(f"Algorithme de chiffrement non supporté: {key.algorithm}")
+            for data in payloads:
+                start_time = time.time()
+                
+                # Chiffrer selon l'algorithme
+                if key.algorithm == EncryptionAlgorithm.AES_256_GCM:
+                    encrypted_data, iv, tag = self._encrypt_aes_gcm(data, ciphers['aesgcm'])
+                elif key.algorithm == EncryptionAlgorithm.AES_256_CBC:
+                    encrypted_data, iv = self._encrypt_aes_cbc(data, ciphers['aes'], key.iv)
+                    tag = None
+                elif key.algorithm == EncryptionAlgorithm.FERNET:
+                    encrypted_data = ciphers['fernet'].encrypt(data)
+                    iv = None
+                    tag = None
+                elif key.algorithm == EncryptionAlgorithm.CHACHA20_POLY1305:
+                    encrypted_data, iv, tag = self._encrypt_chacha20_poly1305(data, ciphers['chacha'])
+                else:
+                    raise ValueError(f"Algorithme de chiffrement non supporté: {key.algorithm}")
+                
+                # Créer le résultat
+                result = EncryptionResult(
+                    encrypted_data=encrypted_data,
+                    key_id=key.id,
+                    algorithm=key.algorithm,
+                    iv=iv,
+                    tag=tag,
+                    metadata={
+                        'data_type': data_type,
+                        'original_size': len(data),
+                        'encrypted_size': len(encrypted_data),
+                        'timestamp': datetime.now().isoformat()
+                    }
+                )
+                results.append(result)
+                
+                # Enregistrer l'opération
+                processing_time = time.time() - start_time
+                self._log_operation('encrypt', key.id, key.algorithm, len(data), 
+                                  processing_time, True, None, user_id, ip_address)
+                
+                # Enregistrer dans le registre des données chiffrées
+                if data_type:
+                    self._register_encrypted_data(result, data_type)
+                
+                # Mettre à jour les métriques
+                self.performance_metrics['encryption_operations'] += 1
+                self._update_average_time('encryption', processing_time)
             
-            # Incrémenter le compteur d'utilisation
-            self._increment_key_usage(key_id)
+            logger.debug(f"{len(results)} données chiffrées avec la clé {key.id}")
+            return results
             
-            # Créer le résultat
-            result = EncryptionResult(
-                encrypted_data=encrypted_data,
-                key_id=key_id,
-                algorithm=key.algorithm,
-                iv=iv,
-                tag=tag,
-                metadata={
-                    'data_type': data_type,
-                    'original_size': len(data),
-                    'encrypted_size': len(encrypted_data),
-                    'timestamp': datetime.now().isoformat()
-                }
-            )
-            
-            # Enregistrer l'opération
+        except Exception as e:
+            # Rendre les utilisations réservées mais non consommées
+            self._release_key_usage(key, len(payloads) - len(results))
             processing_time = time.time() - start_time
-            self._log_operation('encrypt', key_id, key.algorithm, len(data), 
-                              processing_time, True, None, user_id, ip_address)
+            self._log_operation('encrypt', key.id, key.algorithm, len(data), 
+                              processing_time, False, str(e), user_id, ip_address)
+            raise
+    
+    def _resolve_encryption_key(self, key_id: Optional[str],
+                                algorithm: Optional[EncryptionAlgorithm],
+                                data_type: Optional[str], count: int) -> EncryptionKey:
+        """Détermine la clé à utiliser et y réserve `count` utilisations"""
+        auto_selected = False
+        if not key_id:
+            # Sélectionner une clé selon la politique
+            key_id = self._select_key_for_data_type(data_type, algorithm)
+            auto_selected = key_id is not None
+        
+        if key_id:
+            # Récupérer la clé
+            key = self.get_key(key_id)
+            if not key:
+                raise ValueError(f"Clé introuvable: {key_id}")
             
-            # Enregistrer dans le registre des données chiffrées
-            if data_type:
-                self._register_encrypted_data(result, data_type)
+            # Vérifier la validité de la clé
+            if not key.is_active:
+                raise ValueError(f"Clé inactive: {key_id}")
             
-            # Mettre à jour les métriques
-            self.performance_metrics['encryption_operations'] += 1
-            self._update_average_time('encryption', processing_time)
+            if key.expires_at and key.expires_at < datetime.now():
+                raise ValueError(f"Clé expirée: {key_id}")
             
-            logger.debug(f"Données chiffrées avec la clé {key_id}")
-            return result
+            if self._reserve_key_usage(key, count):
+                return key
             
-        except Exception as e:
-            processing_time = time.time() - start_time
-            self._log_operation('encrypt', key_id, key.algorithm, len(data), 
-                              processing_time, False, str(e), user_id, ip_address)
-            raise
+            if not auto_selected:
+                raise ValueError(f"Limite d'utilisation atteinte: {key_id}")
+            
+            # Clé sélectionnée épuisée : ne plus la proposer
+            self.selected_keys = {
+                selection: selected for selection, selected in self.selected_keys.items()
+                if selected != key_id
+            }
+        
+        # Générer une nouvelle clé si nécessaire
+        algorithm = algorithm or self.config['default_algorithm']
+        key_id = self.generate_key(
+            name=f"auto_key_{data_type or 'generic'}",
+            algorithm=algorithm,
+            security_level=self.config['default_security_level']
+        )
+        key = self.get_key(key_id)
+        if not self._reserve_key_usage(key, count):
+            raise ValueError(f"Limite d'utilisation atteinte: {key_id}")
+        return key
     
     def decrypt_data(self, encrypted_result: Union[EncryptionResult, Dict[str, Any]],
                     user_id: Optional[str] = None,
                     ip_address: str = "") -> bytes:
         """Déchiffre des données"""
-        
-        start_time = time.time()
-        
-        # Convertir depuis dict si nécessaire
-        if isinstance(encrypted_result, dict):
-            encrypted_result = EncryptionResult(
-                encrypted_data=base64.b64decode(encrypted_result['encrypted_data']),
-                key_id=encrypted_result['key_id'],
-                algorithm=EncryptionAlgorithm(encrypted_result['algorithm']),
-                iv=base64.b64decode(encrypted_result['iv']) if encrypted_result.get('iv') else None,
-                tag=base64.b64decode(encrypted_result['tag']) if encrypted_result.get('tag') else None,
-                metadata=encrypted_result.get('metadata', {})
-            )
-        
-        # Récupérer la clé
-        key = self.get_key(encrypted_result.key_id)
-        if not key:
-            raise ValueError(f"Clé introuvable: {encrypted_result.key_id}")
-        
-        # Déchiffrer selon l'algorithme
-        try:
-            if encrypted_result.algorithm == EncryptionAlgorithm.AES_256_GCM:
-                decrypted_data = self._decrypt_aes_gcm(
-                    encrypted_result.encrypted_data, key.key_data,
-                    encrypted_result.iv, encrypted_result.tag
-                )
-            elif encrypted_result.algorithm == EncryptionAlgorithm.AES_256_CBC:
-                decrypted_data = self._decrypt_aes_cbc(
-                    encrypted_result.encrypted_data, key.key_data, encrypted_result.iv
-                )
-            elif encrypted_result.algorithm == EncryptionAlgorithm.FERNET:
-                fernet = Fernet(key.key_data)
-                decrypted_data = fernet.decrypt(encrypted_result.encrypted_data)
-            elif encrypted_result.algorithm == EncryptionAlgorithm.CHACHA20_POLY1305:
-                decrypted_data = self._decrypt_chacha20_poly1305(
-                    encrypted_result.encrypted_data, key.key_data,
-                    encrypted_result.iv, encrypted_result.tag
-                )
-            else:
-                raise ValueError(f"Algorithme de déchiffrement non supporté: {encrypted_result.algorithm}")
-            
-            # Enregistrer l'opération
-            processing_time = time.time() - start_time
-            self._log_operation('decrypt', encrypted_result.key_id, encrypted_result.algorithm,
-                              len(encrypted_result.encrypted_data), processing_time, True,
-                              None, user_id, ip_address)
+        return self.decrypt_bulk([encrypted_result], user_id, ip_address)[0]
+    
+    def decrypt_bulk(self, encrypted_results: List[Union[EncryptionResult, Dict[str, Any]]],
+                     user_id: Optional[str] = None,
+                     ip_address: str = "") -> List[bytes]:
+        """Déchiffre une liste de résultats (clés résolues une fois par key_id)"""
+        keys: Dict[str, Tuple[EncryptionKey, Dict[str, Any]]] = {}
+        decrypted = []
+        
+        for encrypted_result in encrypted_results:
+            start_time = time.time()
             
-            # Mettre à jour les métriques
-            self.performance_metrics['decryption_operations'] += 1
-            self._update_average_time('decryption', processing_time)
+            # Convertir depuis dict si nécessaire
+            if isinstance(encrypted_result, dict):
+                encrypted_result = EncryptionResult(
+                    encrypted_data=base64.b64decode(encrypted_result['encrypted_data']),
+                    key_id=encrypted_result['key_id'],
+                    algorithm=EncryptionAlgorithm(encrypted_result['algorithm']),
+                    iv=base64.b64decode(encrypted_result['iv']) if encrypted_result.get('iv') else None,
+                    tag=base64.b64decode(encrypted_result['tag']) if encrypted_result.get('tag') else None,
+                    metadata=encrypted_result.get('metadata', {})
+                )
             
-            logger.debug(f"Données déchiffrées avec la clé {encrypted_result.key_id}")
-            return decrypted_data
+            # Récupérer la clé
+            if encrypted_result.key_id not in keys:
+                key = self.get_key(encrypted_result.key_id)
+                if not key:
+                    raise ValueError(f"Clé introuvable: {encrypted_result.key_id}")
+                keys[encrypted_result.key_id] = (key, self._get_ciphers(key))
+            key, ciphers = keys[encrypted_result.key_id]
             
-        except Exception as e:
-            processing_time = time.time() - start_time
-            self._log_operation('decrypt', encrypted_result.key_id, encrypted_result.algorithm,
-                              len(encrypted_result.encrypted_data), processing_time, False,
-                              str(e), user_id, ip_address)
-            raise
+            # Déchiffrer selon l'algorithme
+            try:
+                if encrypted_result.algorithm == EncryptionAlgorithm.AES_256_GCM:
+                    decrypted_data = self._decrypt_aes_gcm(
+                        encrypted_result.encrypted_data, ciphers['aesgcm'],
+                        encrypted_result.iv, encrypted_result.tag
+                    )
+                elif encrypted_result.algorithm == EncryptionAlgorithm.AES_256_CBC:
+                    decrypted_data = self._decrypt_aes_cbc(
+                        encrypted_result.encrypted_data, ciphers['aes'], encrypted_result.iv
+                    )
+                elif encrypted_result.algorithm == EncryptionAlgorithm.FERNET:
+                    decrypted_data = ciphers['fernet'].decrypt(encrypted_result.encrypted_data)
+                elif encrypted_result.algorithm == EncryptionAlgorithm.CHACHA20_POLY1305:
+                    decrypted_data = self._decrypt_chacha20_poly1305(
+                        encrypted_result.encrypted_data, ciphers['chacha'],
+                        encrypted_result.iv, encrypted_result.tag
+                    )
+                else:
+                    raise ValueError(f"Algorithme de déchiffrement non supporté: {encrypted_result.algorithm}")
+                
+                # Enregistrer l'opération
+                processing_time = time.time() - start_time
+                self._log_operation('decrypt', encrypted_result.key_id, encrypted_result.algorithm,
+                                  len(encrypted_result.encrypted_data), processing_time, True,
+                                  None, user_id, ip_address)
+                
+                # Mettre à jour les métriques
+                self.performance_metrics['decryption_operations'] += 1
+                self._update_average_time('decryption', processing_time)
+                
+                decrypted.append(decrypted_data)
+                
+            except Exception as e:
+                processing_time = time.time() - start_time
+                self._log_operation('decrypt', encrypted_result.key_id, encrypted_result.algorithm,
+                                  len(encrypted_result.encrypted_data), processing_time, False,
+                                  str(e), user_id, ip_address)
+                raise
+        
+        logger.debug(f"{len(decrypted)} données déchiffrées")
+        return decrypted
     
-    def _encrypt_aes_gcm(self, data: bytes, key: bytes) -> Tuple[bytes, bytes, bytes]:
+    def _encrypt_aes_gcm(self, data: bytes, aesgcm: AESGCM) -> Tuple[bytes, bytes, bytes]:
         """Chiffrement AES-256-GCM"""
         iv = os.urandom(12)  # 96 bits pour GCM
-        cipher = Cipher(algorithms.AES(key), modes.GCM(iv), backend=default_backend())
-        encryptor = cipher.encryptor()
-        encrypted_data = encryptor.update(data) + encryptor.finalize()
-        return encrypted_data, iv, encryptor.tag
+        sealed = aesgcm.encrypt(iv, data, None)
+        # Même format qu'auparavant : texte chiffré et tag de 128 bits séparés
+        return sealed[:-16], iv, sealed[-16:]
     
-    def _decrypt_aes_gcm(self, encrypted_data: bytes, key: bytes, iv: bytes, tag: bytes) -> bytes:
+    def _decrypt_aes_gcm(self, encrypted_data: bytes, aesgcm: AESGCM, iv: bytes, tag: bytes) -> bytes:
         """Déchiffrement AES-256-GCM"""
-        cipher = Cipher(algorithms.AES(key), modes.GCM(iv, tag), backend=default_backend())
-        decryptor = cipher.decryptor()
-        return decryptor.update(encrypted_data) + decryptor.finalize()
+        return aesgcm.decrypt(iv, encrypted_data + tag, None)
     
-    def _encrypt_aes_cbc(self, data: bytes, key: bytes, iv: bytes) -> Tuple[bytes, bytes]:
+    def _encrypt_aes_cbc(self, data: bytes, aes: algorithms.AES, iv: bytes) -> Tuple[bytes, bytes]:
         """Chiffrement AES-256-CBC"""
         if not iv:
             iv = os.urandom(16)
@@ -721,14 +883,14 @@ class EncryptionSystem:
         pad_len = 16 - (len(data) % 16)
         padded_data = data + bytes([pad_len] * pad_len)
         
-        cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
+        cipher = Cipher(aes, modes.CBC(iv), backend=default_backend())
         encryptor = cipher.encryptor()
         encrypted_data = encryptor.update(padded_data) + encryptor.finalize()
         return encrypted_data, iv
     
-    def _decrypt_aes_cbc(self, encrypted_data: bytes, key: bytes, iv: bytes) -> bytes:
+    def _decrypt_aes_cbc(self, encrypted_data: bytes, aes: algorithms.AES, iv: bytes) -> bytes:
         """Déchiffrement AES-256-CBC"""
-        cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
+        cipher = Cipher(aes, modes.CBC(iv), backend=default_backend())
         decryptor = cipher.decryptor()
         padded_data = decryptor.update(encrypted_data) + decryptor.finalize()
         
@@ -736,32 +898,17 @@ class EncryptionSystem:
         pad_len = padded_data[-1]
         return padded_data[:-pad_len]
     
-    def _encrypt_chacha20_poly1305(self, data: bytes, key: bytes) -> Tuple[bytes, bytes, bytes]:
-        """Chiffrement ChaCha20-Poly1305"""
+    def _encrypt_chacha20_poly1305(self, data: bytes,
+                                   chacha: ChaCha20Poly1305) -> Tuple[bytes, bytes, bytes]:
+        """Chiffrement ChaCha20-Poly1305 (AEAD)"""
         nonce = os.urandom(12)
-        cipher = Cipher(algorithms.ChaCha20(key, nonce), None, backend=default_backend())
-        encryptor = cipher.encryptor()
-        encrypted_data = encryptor.update(data) + encryptor.finalize()
-        
-        # Calculer le tag d'authentification
-        h = hmac.new(key, nonce + encrypted_data, hashlib.sha256)
-        tag = h.digest()[:16]  # 128 bits
-        
-        return encrypted_data, nonce, tag
+        sealed = chacha.encrypt(nonce, data, None)
+        return sealed[:-16], nonce, sealed[-16:]
     
-    def _decrypt_chacha20_poly1305(self, encrypted_data: bytes, key: bytes, 
+    def _decrypt_chacha20_poly1305(self, encrypted_data: bytes, chacha: ChaCha20Poly1305,
                                   nonce: bytes, tag: bytes) -> bytes:
-        """Déchiffrement ChaCha20-Poly1305"""
-        # Vérifier le tag d'authentification
-        h = hmac.new(key, nonce + encrypted_data, hashlib.sha256)
-        expected_tag = h.digest()[:16]
-        
-        if not hmac.compare_digest(tag, expected_tag):
-            raise ValueError("Tag d'authentification invalide")
-        
-        cipher = Cipher(algorithms.ChaCha20(key, nonce), None, backend=default_backend())
-        decryptor = cipher.decryptor()
-        return decryptor.update(encrypted_data) + decryptor.finalize()
+        """Déchiffrement ChaCha20-Poly1305 (AEAD)"""
+        return chacha.decrypt(nonce, encrypted_data + tag, None)
     
     def _select_key_for_data_type(self, data_type: Optional[str], 
                                  algorithm: Optional[EncryptionAlgorithm]) -> Optional[str]:
@@ -774,6 +921,17 @@ class EncryptionSystem:
         if not policy:
             return None
         
+        # Réutiliser la dernière clé retenue tant qu'elle reste utilisable
+        selection = (policy.required_algorithm.value, policy.min_security_level.value)
+        key_id = self.selected_keys.get(selection)
+        if key_id:
+            key = self.get_key(key_id)
+            if (key and key.is_active
+                    and not (key.expires_at and key.expires_at <= datetime.now())
+                    and not (key.max_usage and key.usage_count >= key.max_usage)):
+                return key_id
+            self.selected_keys.pop(selection, None)
+        
         # Chercher une clé existante compatible
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
@@ -788,91 +946,238 @@ class EncryptionSystem:
             """
             
             cursor = conn.execute(query, (
-                policy.required_algorithm.value,
-                policy.min_security_level.value,
+                selection[0], selection[1],
                 datetime.now().isoformat()
             ))
             
             row = cursor.fetchone()
-            return row['id'] if row else None
+        
+        if row:
+            self.selected_keys[selection] = row['id']
+            return row['id']
+        return None
     
     def _find_policy_for_data_type(self, data_type: str) -> Optional[EncryptionPolicy]:
         """Trouve une politique pour un type de données"""
+        return self.policy_index.get(data_type)
+    
+    def _rebuild_policy_index(self):
+        """Compile les politiques actives en un index par type de données"""
+        index = {}
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("SELECT * FROM encryption_policies WHERE active = TRUE")
             
             for row in cursor.fetchall():
-                data_types = json.loads(row['data_types'])
-                if data_type in data_types:
-                    return EncryptionPolicy(
-                        id=row['id'],
-                        name=row['name'],
-                        description=row['description'],
-                        data_types=data_types,
-                        required_algorithm=EncryptionAlgorithm(row['required_algorithm']),
-                        min_security_level=SecurityLevel(row['min_security_level']),
-                        key_rotation_days=row['key_rotation_days'],
-                        max_key_usage=row['max_key_usage'],
-                        require_authentication=bool(row['require_authentication']),
-                        audit_level=row['audit_level'],
-                        conditions=json.loads(row['conditions']),
-                        active=bool(row['active']),
-                        created_at=datetime.fromisoformat(row['created_at']),
-                        updated_at=datetime.fromisoformat(row['updated_at'])
-                    )
+                policy = self._row_to_policy(row)
+                for data_type in policy.data_types:
+                    # La première politique trouvée l'emporte, comme lors du parcours
+                    index.setdefault(data_type, policy)
         
-        return None
+        self.policy_index = index
+        self.selected_keys = {}
     
-    def _increment_key_usage(self, key_id: str):
-        """Incrémente le compteur d'utilisation d'une clé"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                UPDATE encryption_keys 
-                SET usage_count = usage_count + 1 
-                WHERE id = ?
-            """, (key_id,))
-        
-        # Mettre à jour le cache
-        with self.cache_lock:
-            if key_id in self.key_cache:
-                self.key_cache[key_id].usage_count += 1
+    def _row_to_policy(self, row: sqlite3.Row) -> EncryptionPolicy:
+        return EncryptionPolicy(
+            id=row['id'],
+            name=row['name'],
+            description=row['description'],
+            data_types=json.loads(row['data_types']),
+            required_algorithm=EncryptionAlgorithm(row['required_algorithm']),
+            min_security_level=SecurityLevel(row['min_security_level']),
+            key_rotation_days=row['key_rotation_days'],
+            max_key_usage=row['max_key_usage'],
+            require_authentication=bool(row['require_authentication']),
+            audit_level=row['audit_level'],
+            conditions=json.loads(row['conditions']),
+            active=bool(row['active']),
+            created_at=datetime.fromisoformat(row['created_at']),
+            updated_at=datetime.fromisoformat(row['updated_at'])
+        )
+    
+    def _reserve_key_usage(self, key: EncryptionKey, count: int = 1) -> bool:
+        """
+        Réserve `count` utilisations d'une clé. Sans limite, le compteur est
+        accumulé en mémoire et écrit périodiquement. Avec max_usage, les
+        utilisations sont consommées sur un bloc réservé en base de façon
+        atomique (voir _lease_key_usage) : la limite vaut pour tous les
+        processus, workers WSGI compris, avec une écriture par bloc.
+        """
+        if key.max_usage:
+            with self.usage_lock:
+                if self.usage_leases.get(key.id, 0) >= count:
+                    self._consume_lease(key, count)
+                    return True
+            return self._lease_key_usage(key, count)
+        
+        with self.usage_lock:
+            current = self.usage_counts.setdefault(key.id, key.usage_count)
+            self.usage_counts[key.id] = current + count
+            self.pending_usage[key.id] = self.pending_usage.get(key.id, 0) + count
+            key.usage_count = current + count
+            return True
+    
+    def _lease_key_usage(self, key: EncryptionKey, count: int) -> bool:
+        """
+        Réserve en base un bloc d'au moins `count` utilisations pour ce
+        processus. Au-delà de `count`, le bloc ne prend pas plus de la moitié
+        du solde restant, pour en laisser aux autres workers.
+        """
+        with self.lease_lock:
+            with self.usage_lock:
+                leased = self.usage_leases.get(key.id, 0)
+                if leased >= count:
+                    # Bloc obtenu entre-temps par un autre thread
+                    self._consume_lease(key, count)
+                    return True
+            
+            needed = count - leased
+            with sqlite3.connect(self.db_path) as conn:
+                # Verrou d'écriture immédiat : lecture du solde et réservation atomiques
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT usage_count, max_usage FROM encryption_keys WHERE id = ?", (key.id,)
+                ).fetchone()
+                if row is None:
+                    return False
+                usage_count, max_usage = row
+                remaining = max_usage - usage_count
+                granted = 0
+                if remaining >= needed:
+                    granted = max(needed, min(self.config['usage_lease_size'], remaining // 2))
+                    conn.execute("""
+                        UPDATE encryption_keys SET usage_count = usage_count + ? WHERE id = ?
+                    """, (granted, key.id))
+            
+            with self.usage_lock:
+                leased = self.usage_leases.get(key.id, 0) + granted
+                self.usage_leases[key.id] = leased
+                # Compteur local : réservé en base moins le bloc non consommé
+                self._set_usage_count(key, usage_count + granted - leased)
+                if granted == 0:
+                    return False
+                self._consume_lease(key, count)
+                return True
+    
+    def _consume_lease(self, key: EncryptionKey, count: int):
+        """Consomme `count` utilisations du bloc réservé (usage_lock tenu)"""
+        self.usage_leases[key.id] -= count
+        self._set_usage_count(key, self.usage_counts.get(key.id, key.usage_count) + count)
+    
+    def _release_key_usage(self, key: EncryptionKey, count: int):
+        """Rend des utilisations réservées mais non consommées"""
+        if count <= 0:
+            return
+        
+        with self.usage_lock:
+            if key.max_usage:
+                # Rendues au bloc du processus, sans écriture en base
+                self.usage_leases[key.id] = self.usage_leases.get(key.id, 0) + count
+            else:
+                self.pending_usage[key.id] = self.pending_usage.get(key.id, 0) - count
+            self._set_usage_count(key, self.usage_counts.get(key.id, count) - count)
+    
+    def _set_usage_count(self, key: EncryptionKey, usage_count: int):
+        """Aligne les compteurs en mémoire d'une clé (usage_lock tenu)"""
+        self.usage_counts[key.id] = usage_count
+        key.usage_count = usage_count
+        cached = self.key_cache.get(key.id)
+        if cached is not None:
+            cached.usage_count = usage_count
+    
+    def release_usage_leases(self):
+        """Rend en base les utilisations réservées par ce processus et non consommées"""
+        with self.lease_lock:
+            with self.usage_lock:
+                leases = {key_id: count for key_id, count in self.usage_leases.items() if count > 0}
+                self.usage_leases = {}
+            
+            if not leases:
+                return
+            
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.executemany("""
+                        UPDATE encryption_keys SET usage_count = MAX(usage_count - ?, 0) WHERE id = ?
+                    """, [(count, key_id) for key_id, count in leases.items()])
+            except Exception as e:
+                logger.error(f"Erreur restitution des utilisations réservées: {e}")
     
     def _log_operation(self, operation_type: str, key_id: str, algorithm: EncryptionAlgorithm,
                       data_size: int, processing_time: float, success: bool,
                       error_message: Optional[str], user_id: Optional[str], ip_address: str):
-        """Enregistre une opération de chiffrement"""
-        operation_id = f"op_{int(time.time() * 1000000)}"
+        """Enregistre une opération de chiffrement (écrite par lots)"""
+        operation_id = f"op_{int(time.time() * 1000000)}_{next(self.record_sequence)}"
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO encryption_operations 
-                (id, operation_type, key_id, algorithm, data_size, processing_time,
-                 success, error_message, user_id, ip_address, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+        with self.usage_lock:
+            self.pending_operations.append((
                 operation_id, operation_type, key_id, algorithm.value, data_size,
                 processing_time, success, error_message, user_id, ip_address,
                 datetime.now().isoformat()
             ))
+            pending = len(self.pending_operations)
+        
+        if pending >= self.config['write_behind_batch_size']:
+            self.write_behind_wakeup.set()
     
     def _register_encrypted_data(self, result: EncryptionResult, data_type: str):
-        """Enregistre des données chiffrées dans le registre"""
-        registry_id = f"reg_{int(time.time() * 1000000)}"
+        """Enregistre des données chiffrées dans le registre (écrit par lots)"""
+        registry_id = f"reg_{int(time.time() * 1000000)}_{next(self.record_sequence)}"
         data_identifier = hashlib.sha256(result.encrypted_data).hexdigest()[:16]
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO encrypted_data_registry 
-                (id, data_identifier, data_type, key_id, algorithm, 
-                 encryption_metadata, created_at, access_count)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+        with self.usage_lock:
+            self.pending_registrations.append((
                 registry_id, data_identifier, data_type, result.key_id,
                 result.algorithm.value, json.dumps(result.metadata),
                 datetime.now().isoformat(), 0
             ))
     
+    def flush_pending_writes(self):
+        """Écrit compteurs, journal et registre en attente dans une transaction"""
+        with self.usage_lock:
+            usage = self.pending_usage
+            operations = self.pending_operations
+            registrations = self.pending_registrations
+            self.pending_usage = {}
+            self.pending_operations = []
+            self.pending_registrations = []
+        
+        usage = {key_id: count for key_id, count in usage.items() if count}
+        if not usage and not operations and not registrations:
+            return
+        
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                if usage:
+                    conn.executemany("""
+                        UPDATE encryption_keys 
+                        SET usage_count = usage_count + ? 
+                        WHERE id = ?
+                    """, [(count, key_id) for key_id, count in usage.items()])
+                if operations:
+                    conn.executemany("""
+                        INSERT OR IGNORE INTO encryption_operations 
+                        (id, operation_type, key_id, algorithm, data_size, processing_time,
+                         success, error_message, user_id, ip_address, timestamp)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, operations)
+                if registrations:
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO encrypted_data_registry 
+                        (id, data_identifier, data_type, key_id, algorithm, 
+                         encryption_metadata, created_at, access_count)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """, registrations)
+        except Exception as e:
+            logger.error(f"Erreur écriture différée chiffrement: {e}")
+            # Base verrouillée ou indisponible : tout est remis en attente,
+            # devant les écritures arrivées entre-temps
+            with self.usage_lock:
+                for key_id, count in usage.items():
+                    self.pending_usage[key_id] = self.pending_usage.get(key_id, 0) + count
+                self.pending_operations = operations + self.pending_operations
+                self.pending_registrations = registrations + self.pending_registrations
+    
     def _update_average_time(self, operation_type: str, processing_time: float):
         """Met à jour le temps moyen de traitement"""
         metric_key = f'average_{operation_type}_time'
@@ -904,6 +1209,10 @@ class EncryptionSystem:
                     policy.updated_at.isoformat()
                 ))
             
+            # Recompiler l'index (pas encore construit pendant l'initialisation)
+            if hasattr(self, 'policy_index'):
+                self._rebuild_policy_index()
+            
             logger.info(f"Politique de chiffrement créée: {policy.name}")
             return True
             
@@ -919,22 +1228,7 @@ class EncryptionSystem:
             row = cursor.fetchone()
             
             if row:
-                return EncryptionPolicy(
-                    id=row['id'],
-                    name=row['name'],
-                    description=row['description'],
-                    data_types=json.loads(row['data_types']),
-                    required_algorithm=EncryptionAlgorithm(row['required_algorithm']),
-                    min_security_level=SecurityLevel(row['min_security_level']),
-                    key_rotation_days=row['key_rotation_days'],
-                    max_key_usage=row['max_key_usage'],
-                    require_authentication=bool(row['require_authentication']),
-                    audit_level=row['audit_level'],
-                    conditions=json.loads(row['conditions']),
-                    active=bool(row['active']),
-                    created_at=datetime.fromisoformat(row['created_at']),
-                    updated_at=datetime.fromisoformat(row['updated_at'])
-                )
+                return self._row_to_policy(row)
         
         return None
     
@@ -976,9 +1270,7 @@ class EncryptionSystem:
             conn.execute("UPDATE encryption_keys SET is_active = FALSE WHERE id = ?", (key_id,))
         
         # Retirer du cache
-        with self.cache_lock:
-            if key_id in self.key_cache:
-                self.key_cache[key_id].is_active = False
+        self.key_cache.invalidate(key_id)
     
     def _log_key_rotation(self, old_key_id: str, new_key_id: str, reason: str,
                          rotation_time: float, success: bool):
@@ -998,6 +1290,8 @@ class EncryptionSystem:
     
     def get_encryption_dashboard(self) -> Dict[str, Any]:
         """Récupère le tableau de bord de chiffrement"""
+        self.flush_pending_writes()
+        
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             
@@ -1051,8 +1345,10 @@ class EncryptionSystem:
             'operation_statistics': operation_stats,
             'expiring_keys_30_days': expiring_keys,
             'active_policies': active_policies,
-            'performance_metrics': self.performance_metrics,
+            'performance_metrics': {**self.performance_metrics,
+                                    'cache_hit_rate': self.key_cache.hit_rate()},
             'cache_size': len(self.key_cache),
+            'cache_statistics': dict(self.key_cache.stats),
             'generated_at': datetime.now().isoformat()
         }
     
@@ -1078,8 +1374,40 @@ class EncryptionSystem:
         
         maintenance_thread = threading.Thread(target=encryption_maintenance, daemon=True)
         maintenance_thread.start()
+        self._start_write_behind()
         logger.info("Services de chiffrement démarrés")
     
+    def _start_write_behind(self):
+        """Démarre l'écriture groupée périodique des compteurs, journaux et registre"""
+        def write_behind():
+            while True:
+                self.write_behind_wakeup.wait(self.config['write_behind_interval'])
+                self.write_behind_wakeup.clear()
+                self.flush_pending_writes()
+        
+        threading.Thread(target=write_behind, daemon=True).start()
+        atexit.register(self.flush_pending_writes)
+        atexit.register(self.release_usage_leases)
+    
+    def post_fork(self):
+        """
+        Réinitialise l'état propre au processus dans un worker WSGI après le
+        fork : verrous, tampons d'écriture (ceux hérités restent à la charge
+        du processus parent) et thread d'écriture différée. La maintenance
+        (rotation, intégrité) reste assurée par le processus parent.
+        """
+        self.key_cache.lock = threading.RLock()
+        self.cache_lock = self.key_cache.lock
+        self.usage_lock = threading.Lock()
+        self.lease_lock = threading.Lock()
+        self.usage_counts = {}
+        self.usage_leases = {}
+        self.pending_usage = {}
+        self.pending_operations = []
+        self.pending_registrations = []
+        self.write_behind_wakeup = threading.Event()
+        self._start_write_behind()
+    
     def _auto_rotate_keys(self):
         """Rotation automatique des clés"""
         if not self.config['key_rotation_enabled']:
@@ -1103,18 +1431,14 @@ class EncryptionSystem:
     
     def _cleanup_key_cache(self):
         """Nettoie le cache des clés"""
-        with self.cache_lock:
-            # Retirer les clés inactives du cache
-            inactive_keys = [
-                key_id for key_id, key in self.key_cache.items()
-                if not key.is_active or (key.expires_at and key.expires_at < datetime.now())
-            ]
-            
-            for key_id in inactive_keys:
-                del self.key_cache[key_id]
-            
-            if inactive_keys:
-                logger.info(f"Nettoyé {len(inactive_keys)} clés du cache")
+        # Retirer les clés inactives ou expirées du cache
+        now = datetime.now()
+        removed = self.key_cache.remove_if(
+            lambda key: not key.is_active or (key.expires_at and key.expires_at < now)
+        )
+        
+        if removed:
+            logger.info(f"Nettoyé {removed} clés du cache")
     
     def _verify_key_integrity(self):
         """Vérifie l'intégrité des clés"""
@@ -327,13 +327,16 @@ class MLEngine:
         
         return model_id
 
-    def train_model(self, model_id: str, training_data: pd.DataFrame,
+    def train_model(self, model_id: str, training_data: Union[pd.DataFrame, Dict[str, np.ndarray]],
                    validation_split: float = 0.2) -> Dict[str, Any]:
-        """Entraîne un modèle ML"""
+        """Entraîne un modèle ML (DataFrame ou colonnes numpy)"""
         
         if model_id not in self.models:
             raise ValueError(f"Modèle {model_id} non trouvé")
         
+        if not isinstance(training_data, pd.DataFrame):
+            training_data = pd.DataFrame(training_data, copy=False)
+        
         model = self.models[model_id]
         ml_model = self.model_metadata[model_id]
         
@@ -718,55 +721,49 @@ class MLEngine:
         
         return model_id
 
-    def _generate_agent_recommendation_training_data(self) -> pd.DataFrame:
+    def _generate_agent_recommendation_training_data(self, n_samples: int = 1000,
+                                                     seed: int = 42) -> Dict[str, np.ndarray]:
         """Génère des données d'entraînement pour la recommandation d'agents"""
         
-        np.random.seed(42)
-        n_samples = 1000
+        rng = np.random.default_rng(seed)
         
-        data = {
-            'sector': np.random.choice(['tech', 'finance', 'healthcare', 'energy'], n_samples),
-            'complexity': np.random.uniform(1, 10, n_samples),
-            'urgency': np.random.uniform(1, 5, n_samples),
-            'budget': np.random.uniform(10000, 1000000, n_samples),
-            'expertise_required': np.random.choice(['junior', 'senior', 'expert'], n_samples),
-            'best_agent': np.random.choice(['efs', 'eia', 'ec', 'ess', 'ebf'], n_samples)
+        return {
+            'sector': rng.choice(['tech', 'finance', 'healthcare', 'energy'], n_samples),
+            'complexity': rng.uniform(1, 10, n_samples),
+            'urgency': rng.uniform(1, 5, n_samples),
+            'budget': rng.uniform(10000, 1000000, n_samples),
+            'expertise_required': rng.choice(['junior', 'senior', 'expert'], n_samples),
+            'best_agent': rng.choice(['efs', 'eia', 'ec', 'ess', 'ebf'], n_samples)
         }
-        
-        return pd.DataFrame(data)
 
-    def _generate_workflow_optimization_training_data(self) -> pd.DataFrame:
+    def _generate_workflow_optimization_training_data(self, n_samples: int = 1000,
+                                                      seed: int = 42) -> Dict[str, np.ndarray]:
         """Génère des données d'entraînement pour l'optimisation de workflow"""
         
-        np.random.seed(42)
-        n_samples = 1000
+        rng = np.random.default_rng(seed)
         
-        data = {
-            'nodes_count': np.random.randint(3, 20, n_samples),
-            'parallel_ratio': np.random.uniform(0, 1, n_samples),
-            'complexity': np.random.uniform(1, 10, n_samples),
-            'data_size': np.random.uniform(100, 10000, n_samples),
-            'execution_time': np.random.uniform(60, 3600, n_samples)
+        return {
+            'nodes_count': rng.integers(3, 20, n_samples),
+            'parallel_ratio': rng.uniform(0, 1, n_samples),
+            'complexity': rng.uniform(1, 10, n_samples),
+            'data_size': rng.uniform(100, 10000, n_samples),
+            'execution_time': rng.uniform(60, 3600, n_samples)
         }
-        
-        return pd.DataFrame(data)
 
-    def _generate_success_prediction_training_data(self) -> pd.DataFrame:
+    def _generate_success_prediction_training_data(self, n_samples: int = 1000,
+                                                   seed: int = 42) -> Dict[str, np.ndarray]:
         """Génère des données d'entraînement pour la prédiction de succès"""
         
-        np.random.seed(42)
-        n_samples = 1000
+        rng = np.random.default_rng(seed)
         
-        data = {
-            'budget': np.random.uniform(10000, 1000000, n_samples),
-            'timeline': np.random.uniform(1, 52, n_samples),  # semaines
-            'complexity': np.random.uniform(1, 10, n_samples),
-            'team_size': np.random.randint(1, 20, n_samples),
-            'experience': np.random.uniform(1, 10, n_samples),
-            'success_probability': np.random.uniform(0, 1, n_samples)
+        return {
+            'budget': rng.uniform(10000, 1000000, n_samples),
+            'timeline': rng.uniform(1, 52, n_samples),  # semaines
+            'complexity': rng.uniform(1, 10, n_samples),
+            'team_size': rng.integers(1, 20, n_samples),
+            'experience': rng.uniform(1, 10, n_samples),
+            'success_probability': rng.uniform(0, 1, n_samples)
         }
-        
-        return pd.DataFrame(data)
 
     def _extract_mission_features(self, mission_context: Dict[str, Any]) -> Dict[str, Any]:
         """Extrait les features d'une mission"""
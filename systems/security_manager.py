@@ -5,6 +5,7 @@ Système de sécurité complet avec authentification, autorisation et audit
 """
 
 import hashlib
+import hmac
 import secrets
 import sqlite3
 import json
@@ -22,7 +23,9 @@ import base64
 import re
 import threading
 import time
-from collections import defaultdict, deque
+import atexit
+from collections import defaultdict, deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import ipaddress
 
 # Configuration du logging
@@ -122,6 +125,113 @@ class SecurityPolicy:
         data['updated_at'] = self.updated_at.isoformat()
         return data
 
+class SecurityCache:
+    """Cache LRU borné avec expiration par entrée"""
+    
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 60.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def get(self, key: Any) -> Optional[Any]:
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self.entries[key]
+                self.stats['misses'] += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+    
+    def put(self, key: Any, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+    
+    def pop(self, key: Any) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            return entry[0] if entry else None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {'size': len(self.entries), **self.stats}
+
+class IntrusionCounter:
+    """
+    Compteurs d'échecs par IP en classes de temps fixes (fenêtre glissante
+    approchée), avec un plafond LRU sur le nombre d'IPs suivies.
+    """
+    
+    def __init__(self, window_seconds: int = 3600, bucket_count: int = 12,
+                 max_tracked_ips: int = 100000):
+        self.bucket_seconds = window_seconds / bucket_count
+        self.bucket_count = bucket_count
+        self.max_tracked_ips = max_tracked_ips
+        self.counters: OrderedDict = OrderedDict()  # ip -> (indices de classe, compteurs)
+        self.lock = threading.Lock()
+        self.evictions = 0
+    
+    def record(self, ip_address: str) -> int:
+        """Compte un échec et retourne le total sur la fenêtre"""
+        current = int(time.time() / self.bucket_seconds)
+        slot = current % self.bucket_count
+        
+        with self.lock:
+            entry = self.counters.get(ip_address)
+            if entry is None:
+                entry = ([0] * self.bucket_count, [0] * self.bucket_count)
+                self.counters[ip_address] = entry
+                while len(self.counters) > self.max_tracked_ips:
+                    self.counters.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self.counters.move_to_end(ip_address)
+            
+            stamps, counts = entry
+            if stamps[slot] != current:
+                stamps[slot] = current
+                counts[slot] = 0
+            counts[slot] += 1
+            
+            return self._total(entry, current)
+    
+    def count(self, ip_address: str) -> int:
+        with self.lock:
+            entry = self.counters.get(ip_address)
+            return self._total(entry, int(time.time() / self.bucket_seconds)) if entry else 0
+    
+    def clear(self, ip_address: str):
+        with self.lock:
+            self.counters.pop(ip_address, None)
+    
+    def purge_expired(self) -> int:
+        """Oublie les IPs sans échec dans la fenêtre"""
+        current = int(time.time() / self.bucket_seconds)
+        with self.lock:
+            expired = [ip for ip, entry in self.counters.items() if self._total(entry, current) == 0]
+            for ip in expired:
+                del self.counters[ip]
+        return len(expired)
+    
+    def _total(self, entry: tuple, current: int) -> int:
+        stamps, counts = entry
+        oldest = current - self.bucket_count
+        return sum(count for stamp, count in zip(stamps, counts) if stamp > oldest)
+    
+    def __len__(self) -> int:
+        return len(self.counters)
+
 class SecurityManager:
     """Gestionnaire de sécurité enterprise"""
     
@@ -154,16 +264,54 @@ class SecurityManager:
                 'log_all_access': True,
                 'log_failed_attempts': True,
                 'retention_days': 365
+            },
+            'password_hashing': {
+                'algorithm': 'pbkdf2_sha256',
+                'iterations': 100000,  # relevé à la connexion si modifié
+                'workers': 4,
+                'max_pending': 32,  # au-delà, les connexions sont refusées
+                'timeout_seconds': 10
+            },
+            'login_admission': {
+                'attempts_per_minute': 20,  # par IP, avant tout calcul de hash
+                'max_tracked_ips': 50000
             }
         }
         
         # Système de détection d'intrusion
         self.intrusion_detection = {
-            'failed_logins': defaultdict(deque),
+            'failed_logins': IntrusionCounter(window_seconds=3600, bucket_count=12),
             'suspicious_ips': set(),
             'rate_limits': defaultdict(deque),
-            'blocked_ips': defaultdict(datetime)
+            'blocked_ips': {}  # ip -> datetime de fin de blocage
         }
+        self.blocklist_id = 0  # dernier blocage lu (autres processus)
+        
+        # Hachage des mots de passe hors du thread appelant, file bornée
+        hashing = self.config['password_hashing']
+        self.hash_executor = ThreadPoolExecutor(max_workers=hashing['workers'],
+                                                thread_name_prefix="password_hash")
+        self.hash_slots = threading.BoundedSemaphore(hashing['max_pending'])
+        
+        # Admission des connexions par IP (seau à jetons) et cache des utilisateurs
+        self.login_admission: OrderedDict = OrderedDict()
+        self.login_admission_lock = threading.Lock()
+        self.user_cache = SecurityCache(max_size=10000, ttl_seconds=30)
+        self.whitelist_cache = SecurityCache(max_size=10000, ttl_seconds=60)
+        
+        # Tokens JWT vérifiés (clé : empreinte du token), révocations et sessions
+        self.token_cache = SecurityCache(max_size=50000, ttl_seconds=300)
+        self.revoked_tokens: Dict[str, float] = {}  # empreinte -> expiration (epoch)
+        self.revoked_tokens_lock = threading.Lock()
+        self.revoked_tokens_id = 0  # dernière révocation lue (autres processus)
+        self.session_cache = SecurityCache(max_size=50000, ttl_seconds=300)
+        self.pending_session_activity: Dict[str, str] = {}  # token -> last_activity
+        self.pending_security_events: deque = deque()
+        self.max_pending_security_events = 100000
+        self.dropped_security_events = 0
+        self.write_behind_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.write_behind_interval = 5
         
         # Chiffrement
         self.encryption_key = self._derive_encryption_key()
@@ -199,7 +347,10 @@ class SecurityManager:
         
         self._init_database()
         self._init_default_policies()
+        self._load_revoked_tokens()
+        self._load_blocklist()
         self._start_security_monitor()
+        self._start_write_behind()
         
         logger.info("Security Manager initialisé")
     
@@ -284,10 +435,23 @@ class SecurityManager:
                     FOREIGN KEY (user_id) REFERENCES users (id)
                 );
                 
+                CREATE TABLE IF NOT EXISTS ip_blocklist (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ip BLOB UNIQUE NOT NULL,
+                    blocked_until REAL NOT NULL
+                );
+                
+                CREATE TABLE IF NOT EXISTS revoked_tokens (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    token_digest TEXT UNIQUE NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                
                 CREATE INDEX IF NOT EXISTS idx_security_events_timestamp ON security_events(timestamp);
                 CREATE INDEX IF NOT EXISTS idx_security_events_threat_level ON security_events(threat_level);
                 CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id);
                 CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at);
+                CREATE INDEX IF NOT EXISTS idx_sessions_token ON sessions(token);
             """)
         
         # Créer un utilisateur admin par défaut
@@ -387,6 +551,8 @@ class SecurityManager:
                     user.active
                 ))
             
+            self.user_cache.pop(('username', user.username))
+            
             # Ajouter à l'historique des mots de passe
             self._add_password_to_history(user.id, password_hash)
             
@@ -410,6 +576,18 @@ class SecurityManager:
                          ip_address: str = "", user_agent: str = "") -> Optional[Dict[str, Any]]:
         """Authentifie un utilisateur"""
         try:
+            # Admission par IP avant tout calcul de hash
+            if not self._admit_login_attempt(ip_address):
+                self._log_security_event(
+                    event_type="login_rate_limited",
+                    threat_level=ThreatLevel.MEDIUM,
+                    description=f"Trop de tentatives de connexion depuis {ip_address}",
+                    details={'ip_address': ip_address, 'username': username},
+                    ip_address=ip_address,
+                    user_agent=user_agent
+                )
+                return None
+            
             # Vérifier les tentatives de connexion suspectes
             if self._is_ip_blocked(ip_address):
                 self._log_security_event(
@@ -446,11 +624,19 @@ class SecurityManager:
                     self._unlock_user_account(user.id)
                     user.account_locked = False
             
-            # Vérifier le mot de passe
-            if not self._verify_password(password, user.password_hash, user.salt):
+            # Vérifier le mot de passe (pool de hachage borné)
+            verified = self._run_hashing(self._verify_password, password, user.password_hash, user.salt)
+            if verified is None:
+                logger.warning("Pool de hachage saturé, connexion refusée")
+                return None
+            if not verified:
                 self._handle_failed_login(user.id, ip_address, user_agent, "Mot de passe incorrect")
                 return None
             
+            # Mettre à niveau le hash si ses paramètres ne sont plus ceux de la configuration
+            if self._needs_rehash(user.password_hash):
+                self._upgrade_password_hash(user.id, password)
+            
             # Vérifier la whitelist IP si requise
             if self._requires_ip_whitelist(user):
                 if not self._is_ip_whitelisted(user.id, ip_address):
@@ -510,33 +696,105 @@ class SecurityManager:
         
         return True
     
-    def _hash_password(self, password: str, salt: str) -> str:
-        """Hashe un mot de passe avec salt"""
-        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000).hex()
+    def _hash_password(self, password: str, salt: str, iterations: Optional[int] = None) -> str:
+        """
+        Hashe un mot de passe avec salt. Le résultat encode ses paramètres
+        (`pbkdf2_sha256$<itérations>$<hex>`) pour pouvoir faire évoluer le coût.
+        """
+        iterations = iterations or self.config['password_hashing']['iterations']
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations).hex()
+        return f"pbkdf2_sha256${iterations}${digest}"
+    
+    @staticmethod
+    def _parse_password_hash(password_hash: str) -> Tuple[int, str]:
+        """Retourne (itérations, empreinte) ; les anciens hashs hex utilisent 100 000 itérations"""
+        if password_hash.startswith('pbkdf2_sha256$'):
+            _, iterations, digest = password_hash.split('$', 2)
+            return int(iterations), digest
+        return 100000, password_hash
     
     def _verify_password(self, password: str, password_hash: str, salt: str) -> bool:
-        """Vérifie un mot de passe"""
-        return self._hash_password(password, salt) == password_hash
+        """Vérifie un mot de passe (comparaison en temps constant)"""
+        iterations, digest = self._parse_password_hash(password_hash)
+        candidate = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations).hex()
+        return hmac.compare_digest(candidate, digest)
+    
+    def _needs_rehash(self, password_hash: str) -> bool:
+        """Vrai si le hash n'utilise pas les paramètres courants"""
+        iterations, _ = self._parse_password_hash(password_hash)
+        return (not password_hash.startswith('pbkdf2_sha256$') or
+                iterations != self.config['password_hashing']['iterations'])
+    
+    def _upgrade_password_hash(self, user_id: str, password: str):
+        """Recalcule le hash avec les paramètres courants après une connexion réussie"""
+        salt = secrets.token_hex(32)
+        password_hash = self._run_hashing(self._hash_password, password, salt)
+        if password_hash is None:
+            return  # pool saturé : nouvelle tentative à la prochaine connexion
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                UPDATE users SET password_hash = ?, salt = ?, updated_at = ?
+                WHERE id = ?
+            """, (password_hash, salt, datetime.now().isoformat(), user_id))
+        
+        self._invalidate_user_cache(user_id)
+        logger.info(f"Hash de mot de passe mis à niveau: {user_id}")
+    
+    def _run_hashing(self, func, *args):
+        """
+        Exécute un calcul de hash dans le pool dédié. Retourne None sans
+        calculer si la file d'attente est pleine (rafale de connexions).
+        """
+        if not self.hash_slots.acquire(blocking=False):
+            return None
+        
+        try:
+            future = self.hash_executor.submit(func, *args)
+        except Exception:
+            self.hash_slots.release()
+            raise
+        future.add_done_callback(lambda _: self.hash_slots.release())
+        
+        try:
+            return future.result(timeout=self.config['password_hashing']['timeout_seconds'])
+        except Exception as e:
+            logger.error(f"Erreur calcul hash: {e}")
+            return None
+    
+    def _admit_login_attempt(self, ip_address: str) -> bool:
+        """Seau à jetons par IP, vérifié avant toute recherche ou hachage"""
+        policy = self.config['login_admission']
+        capacity = policy['attempts_per_minute']
+        refill_rate = capacity / 60.0
+        now = time.monotonic()
+        
+        with self.login_admission_lock:
+            tokens, last = self.login_admission.pop(ip_address, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            
+            self.login_admission[ip_address] = (tokens, now)
+            while len(self.login_admission) > policy['max_tracked_ips']:
+                self.login_admission.popitem(last=False)
+        
+        return allowed
     
     def _handle_failed_login(self, user_id: Optional[str], ip_address: str, 
                            user_agent: str, reason: str):
         """Gère une tentative de connexion échouée"""
-        # Incrémenter le compteur d'échecs pour l'IP
-        self.intrusion_detection['failed_logins'][ip_address].append(datetime.now())
-        
-        # Nettoyer les anciens échecs (> 1 heure)
-        cutoff = datetime.now() - timedelta(hours=1)
-        while (self.intrusion_detection['failed_logins'][ip_address] and 
-               self.intrusion_detection['failed_logins'][ip_address][0] < cutoff):
-            self.intrusion_detection['failed_logins'][ip_address].popleft()
+        # Incrémenter le compteur d'échecs pour l'IP (fenêtre d'une heure)
+        failed_count = self.intrusion_detection['failed_logins'].record(ip_address)
         
         # Vérifier si l'IP doit être bloquée
-        failed_count = len(self.intrusion_detection['failed_logins'][ip_address])
         if failed_count >= 10:  # 10 échecs en 1 heure
             self._block_ip(ip_address, duration_minutes=60)
         
         # Incrémenter le compteur d'échecs pour l'utilisateur
         if user_id:
+            self._invalidate_user_cache(user_id)
             with sqlite3.connect(self.db_path) as conn:
                 conn.execute("""
                     UPDATE users 
@@ -571,10 +829,10 @@ class SecurityManager:
                 SET failed_login_attempts = 0, last_login = ?, updated_at = ?
                 WHERE id = ?
             """, (datetime.now().isoformat(), datetime.now().isoformat(), user_id))
+        self._invalidate_user_cache(user_id)
         
         # Nettoyer les échecs pour cette IP
-        if ip_address in self.intrusion_detection['failed_logins']:
-            self.intrusion_detection['failed_logins'][ip_address].clear()
+        self.intrusion_detection['failed_logins'].clear(ip_address)
         
         # Enregistrer l'événement
         self._log_security_event(
@@ -598,6 +856,7 @@ class SecurityManager:
                 SET account_locked = TRUE, locked_until = ?, updated_at = ?
                 WHERE id = ?
             """, (locked_until.isoformat(), datetime.now().isoformat(), user_id))
+        self._invalidate_user_cache(user_id)
         
         self._log_security_event(
             event_type="account_locked",
@@ -616,6 +875,7 @@ class SecurityManager:
                     failed_login_attempts = 0, updated_at = ?
                 WHERE id = ?
             """, (datetime.now().isoformat(), user_id))
+        self._invalidate_user_cache(user_id)
         
         self._log_security_event(
             event_type="account_unlocked",
@@ -630,6 +890,11 @@ class SecurityManager:
         blocked_until = datetime.now() + timedelta(minutes=duration_minutes)
         self.intrusion_detection['blocked_ips'][ip_address] = blocked_until
         
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO ip_blocklist (ip, blocked_until) VALUES (?, ?)
+            """, (self._pack_ip(ip_address), blocked_until.timestamp()))
+        
         self._log_security_event(
             event_type="ip_blocked",
             threat_level=ThreatLevel.HIGH,
@@ -646,10 +911,36 @@ class SecurityManager:
                 return True
             else:
                 # Débloquer l'IP
-                del self.intrusion_detection['blocked_ips'][ip_address]
+                self.intrusion_detection['blocked_ips'].pop(ip_address, None)
         
         return False
     
+    @staticmethod
+    def _pack_ip(ip_address: str) -> bytes:
+        """Forme binaire compacte d'une IP (4 ou 16 octets)"""
+        try:
+            return ipaddress.ip_address(ip_address).packed
+        except ValueError:
+            return ip_address.encode()
+    
+    @staticmethod
+    def _unpack_ip(packed: bytes) -> str:
+        if len(packed) in (4, 16):
+            return str(ipaddress.ip_address(packed))
+        return packed.decode()
+    
+    def _load_blocklist(self):
+        """Charge les blocages en cours, y compris ceux posés par d'autres processus"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("""
+                SELECT id, ip, blocked_until FROM ip_blocklist
+                WHERE id > ? AND blocked_until > ?
+            """, (self.blocklist_id, time.time()))
+            for row_id, packed, blocked_until in cursor.fetchall():
+                self.intrusion_detection['blocked_ips'][self._unpack_ip(packed)] = \
+                    datetime.fromtimestamp(blocked_until)
+                self.blocklist_id = max(self.blocklist_id, row_id)
+    
     def _create_session(self, user_id: str, ip_address: str, user_agent: str) -> str:
         """Crée une session utilisateur"""
         session_id = secrets.token_urlsafe(32)
@@ -687,62 +978,292 @@ class SecurityManager:
         
         return jwt.encode(payload, self.secret_key, algorithm='HS256')
     
+    @staticmethod
+    def _token_digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+    
     def validate_jwt_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Valide un token JWT"""
+        """Valide un token JWT (claims vérifiés mis en cache jusqu'à leur expiration)"""
+        digest = self._token_digest(token)
+        if digest in self.revoked_tokens:
+            return None
+        
+        payload = self.token_cache.get(digest)
+        if payload is not None:
+            return payload
+        
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=['HS256'])
-            return payload
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+        
+        remaining = payload.get('exp', time.time() + self.token_cache.ttl_seconds) - time.time()
+        if remaining > 0:
+            self.token_cache.put(digest, payload, ttl_seconds=remaining)
+        return payload
+    
+    def revoke_jwt_token(self, token: str):
+        """Révoque un token JWT avant son expiration"""
+        digest = self._token_digest(token)
+        try:
+            expires_at = float(jwt.decode(
+                token, self.secret_key, algorithms=['HS256'],
+                options={'verify_exp': False}
+            ).get('exp', time.time() + 86400))
+        except jwt.InvalidTokenError:
+            return  # token invalide : déjà refusé
+        
+        self.token_cache.pop(digest)
+        self._revoke_digest(digest, expires_at)
+    
+    def _revoke_digest(self, digest: str, expires_at: float):
+        """Enregistre une révocation (token JWT ou session), partagée entre processus"""
+        with self.revoked_tokens_lock:
+            self.revoked_tokens[digest] = expires_at
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO revoked_tokens (token_digest, expires_at)
+                VALUES (?, ?)
+            """, (digest, expires_at))
+    
+    def _load_revoked_tokens(self):
+        """Charge les révocations encore valides, y compris celles des autres processus"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("""
+                SELECT id, token_digest, expires_at FROM revoked_tokens
+                WHERE id > ? AND expires_at >= ?
+            """, (self.revoked_tokens_id, time.time()))
+            rows = cursor.fetchall()
+        
+        with self.revoked_tokens_lock:
+            for row_id, digest, expires_at in rows:
+                self.revoked_tokens[digest] = expires_at
+                self.revoked_tokens_id = max(self.revoked_tokens_id, row_id)
+    
+    def validate_session(self, session_token: str) -> Optional[Dict[str, Any]]:
+        """
+        Valide une session. L'état est mis en cache ; la dernière activité est
+        enregistrée en mémoire et écrite en base par lots. Les sessions
+        terminées par un autre processus sont refusées dès la synchronisation
+        des révocations, avant toute lecture du cache.
+        """
+        if self._token_digest(session_token) in self.revoked_tokens:
+            return None
+        
+        session = self.session_cache.get(session_token)
+        
+        if session is None:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.execute("""
+                    SELECT id, user_id, ip_address, expires_at FROM sessions
+                    WHERE token = ? AND active = TRUE
+                """, (session_token,))
+                row = cursor.fetchone()
+            
+            if not row:
+                return None
+            
+            session = {
+                'session_id': row['id'],
+                'user_id': row['user_id'],
+                'ip_address': row['ip_address'],
+                'expires_at': datetime.fromisoformat(row['expires_at'])
+            }
+            remaining = (session['expires_at'] - datetime.now()).total_seconds()
+            if remaining > 0:
+                self.session_cache.put(session_token, session, ttl_seconds=remaining)
+        
+        now = datetime.now()
+        if now >= session['expires_at']:
+            return None
+        
+        with self.write_behind_lock:
+            self.pending_session_activity[session_token] = now.isoformat()
+        
+        return session
+    
+    def end_session(self, session_token: str):
+        """Termine une session"""
+        session = self.session_cache.pop(session_token)
+        with self.write_behind_lock:
+            self.pending_session_activity.pop(session_token, None)
+        
+        # Révocation visible des autres processus (dont le cache peut encore
+        # contenir la session) jusqu'à l'expiration naturelle de celle-ci
+        if session is not None:
+            expires_at = session['expires_at'].timestamp()
+        else:
+            expires_at = time.time() + self.config['session_policy']['timeout_minutes'] * 60
+        self._revoke_digest(self._token_digest(session_token), expires_at)
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE sessions SET active = FALSE WHERE token = ?", (session_token,))
+    
+    def _flush_pending_writes(self):
+        """Écrit les mises à jour différées en une transaction"""
+        with self.flush_lock:
+            with self.write_behind_lock:
+                activity = self.pending_session_activity
+                self.pending_session_activity = {}
+                events = list(self.pending_security_events)
+                self.pending_security_events.clear()
+            
+            if not activity and not events:
+                return
+            
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    if events:
+                        conn.executemany("""
+                            INSERT OR IGNORE INTO security_events 
+                            (id, event_type, threat_level, user_id, ip_address, user_agent,
+                             description, details, timestamp, resolved, resolution_notes)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """, events)
+                    if activity:
+                        conn.executemany("""
+                            UPDATE sessions SET last_activity = ? WHERE token = ?
+                        """, [(last_activity, token) for token, last_activity in activity.items()])
+            except Exception as e:
+                logger.error(f"Erreur écriture différée sécurité: {e}")
+                # Base verrouillée ou indisponible : tout est remis en attente
+                self._requeue_pending_writes(activity, events)
+    
+    def _requeue_pending_writes(self, activity: Dict[str, str], events: List[tuple]):
+        """Réintègre un lot non écrit devant les écritures arrivées entre-temps"""
+        with self.write_behind_lock:
+            for token, last_activity in activity.items():
+                # Une activité enregistrée depuis est plus récente
+                self.pending_session_activity.setdefault(token, last_activity)
+            
+            # Les événements du lot sont plus anciens : ils repassent devant,
+            # dans la limite de max_pending_security_events
+            room = self.max_pending_security_events - len(self.pending_security_events)
+            kept = events[-room:] if room > 0 else []
+            dropped = len(events) - len(kept)
+            self.pending_security_events.extendleft(reversed(kept))
+            self.dropped_security_events += dropped
+        
+        if dropped:
+            logger.warning(f"{dropped} événements de sécurité perdus : file d'attente pleine")
+    
+    def _start_write_behind(self):
+        """Démarre l'écriture différée périodique"""
+        def write_behind_loop():
+            while True:
+                time.sleep(self.write_behind_interval)
+                try:
+                    self._flush_pending_writes()
+                    self._load_revoked_tokens()
+                    self._load_blocklist()
+                except Exception as e:
+                    logger.error(f"Erreur écriture différée sécurité: {e}")
+        
+        threading.Thread(target=write_behind_loop, daemon=True).start()
+        atexit.register(self._flush_pending_writes)
+    
+    def post_fork(self):
+        """
+        Réinitialise l'état propre au processus dans un worker WSGI après le
+        fork : les threads (écriture différée, synchronisation, monitoring,
+        hachage) ne survivent pas au fork et un verrou peut y avoir été copié
+        à l'état verrouillé. Les écritures en attente héritées restent à la
+        charge du processus parent.
+        """
+        for cache in (self.user_cache, self.whitelist_cache, self.token_cache, self.session_cache):
+            cache.lock = threading.Lock()
+        self.intrusion_detection['failed_logins'].lock = threading.Lock()
+        self.login_admission_lock = threading.Lock()
+        self.revoked_tokens_lock = threading.Lock()
+        self.write_behind_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending_session_activity = {}
+        self.pending_security_events = deque()
+        
+        hashing = self.config['password_hashing']
+        self.hash_executor = ThreadPoolExecutor(max_workers=hashing['workers'],
+                                                thread_name_prefix="password_hash")
+        self.hash_slots = threading.BoundedSemaphore(hashing['max_pending'])
+        
+        self._load_revoked_tokens()
+        self._load_blocklist()
+        self._start_security_monitor()
+        self._start_write_behind()
     
     def get_user(self, user_id: str) -> Optional[User]:
         """Récupère un utilisateur par ID"""
+        user = self.user_cache.get(('id', user_id))
+        if user is not None:
+            return user
+        
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,))
             row = cursor.fetchone()
             
             if row:
-                return User(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    password_hash=row['password_hash'],
-                    salt=row['salt'],
-                    roles=json.loads(row['roles']),
-                    permissions=json.loads(row['permissions']),
-                    security_level=SecurityLevel(row['security_level']),
-                    mfa_enabled=bool(row['mfa_enabled']),
-                    mfa_secret=row['mfa_secret'],
-                    last_login=datetime.fromisoformat(row['last_login']) if row['last_login'] else None,
-                    failed_login_attempts=row['failed_login_attempts'],
-                    account_locked=bool(row['account_locked']),
-                    locked_until=datetime.fromisoformat(row['locked_until']) if row['locked_until'] else None,
-                    created_at=datetime.fromisoformat(row['created_at']),
-                    updated_at=datetime.fromisoformat(row['updated_at']),
-                    active=bool(row['active'])
-                )
+                return self._cache_user(self._row_to_user(row))
             return None
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Récupère un utilisateur par nom d'utilisateur"""
+        user = self.user_cache.get(('username', username))
+        if user is not None:
+            return user or None  # False : utilisateur inexistant mis en cache
+        
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute("SELECT * FROM users WHERE username = ?", (username,))
             row = cursor.fetchone()
             
             if row:
-                return self.get_user(row['id'])
-            return None
+                return self._cache_user(self._row_to_user(row))
+        
+        self.user_cache.put(('username', username), False)
+        return None
+    
+    def _row_to_user(self, row: sqlite3.Row) -> User:
+        return User(
+            id=row['id'],
+            username=row['username'],
+            email=row['email'],
+            password_hash=row['password_hash'],
+            salt=row['salt'],
+            roles=json.loads(row['roles']),
+            permissions=json.loads(row['permissions']),
+            security_level=SecurityLevel(row['security_level']),
+            mfa_enabled=bool(row['mfa_enabled']),
+            mfa_secret=row['mfa_secret'],
+            last_login=datetime.fromisoformat(row['last_login']) if row['last_login'] else None,
+            failed_login_attempts=row['failed_login_attempts'],
+            account_locked=bool(row['account_locked']),
+            locked_until=datetime.fromisoformat(row['locked_until']) if row['locked_until'] else None,
+            created_at=datetime.fromisoformat(row['created_at']),
+            updated_at=datetime.fromisoformat(row['updated_at']),
+            active=bool(row['active'])
+        )
+    
+    def _cache_user(self, user: User) -> User:
+        self.user_cache.put(('id', user.id), user)
+        self.user_cache.put(('username', user.username), user)
+        return user
+    
+    def _invalidate_user_cache(self, user_id: str):
+        """Retire un utilisateur du cache après toute écriture le concernant"""
+        user = self.user_cache.pop(('id', user_id))
+        if user is not None:
+            self.user_cache.pop(('username', user.username))
     
     def _log_security_event(self, event_type: str, threat_level: ThreatLevel,
                           description: str, details: Dict[str, Any],
                           user_id: Optional[str] = None, ip_address: str = "",
                           user_agent: str = ""):
         """Enregistre un événement de sécurité"""
-        event_id = f"sec_{int(time.time() * 1000000)}"
+        event_id = f"sec_{int(time.time() * 1000000)}_{secrets.token_hex(3)}"
         
         event = SecurityEvent(
             id=event_id,
@@ -758,18 +1279,32 @@ class SecurityManager:
             resolution_notes=None
         )
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO security_events 
-                (id, event_type, threat_level, user_id, ip_address, user_agent,
-                 description, details, timestamp, resolved, resolution_notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                event.id, event.event_type, event.threat_level.value,
-                event.user_id, event.ip_address, event.user_agent,
-                event.description, json.dumps(event.details),
-                event.timestamp.isoformat(), event.resolved, event.resolution_notes
-            ))
+        row = (
+            event.id, event.event_type, event.threat_level.value,
+            event.user_id, event.ip_address, event.user_agent,
+            event.description, json.dumps(event.details),
+            event.timestamp.isoformat(), event.resolved, event.resolution_notes
+        )
+        
+        # Écriture par lots (thread d'écriture différée). File pleine : l'appelant
+        # écrit lui-même le lot en attente (contre-pression) avant d'ajouter
+        with self.write_behind_lock:
+            full = len(self.pending_security_events) >= self.max_pending_security_events
+        if full:
+            self._flush_pending_writes()
+        
+        dropped = False
+        with self.write_behind_lock:
+            if len(self.pending_security_events) >= self.max_pending_security_events:
+                # Base toujours indisponible : le plus ancien événement est perdu
+                self.pending_security_events.popleft()
+                self.dropped_security_events += 1
+                dropped = True
+            self.pending_security_events.append(row)
+        
+        if dropped:
+            logger.warning(f"Événement de sécurité perdu : file d'attente pleine "
+                           f"({self.dropped_security_events} au total)")
     
     def create_security_policy(self, policy: SecurityPolicy):
         """Crée une politique de sécurité"""
@@ -799,6 +1334,10 @@ class SecurityManager:
     
     def _is_ip_whitelisted(self, user_id: str, ip_address: str) -> bool:
         """Vérifie si une IP est dans la whitelist"""
+        cached = self.whitelist_cache.get((user_id, ip_address))
+        if cached is not None:
+            return cached
+        
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.execute("""
                 SELECT COUNT(*) FROM ip_whitelist 
@@ -806,8 +1345,10 @@ class SecurityManager:
                 AND ip_address = ? AND active = TRUE
             """, (user_id, ip_address))
             
-            count = cursor.fetchone()[0]
-            return count > 0
+            whitelisted = cursor.fetchone()[0] > 0
+        
+        self.whitelist_cache.put((user_id, ip_address), whitelisted)
+        return whitelisted
     
     def _add_password_to_history(self, user_id: str, password_hash: str):
         """Ajoute un mot de passe à l'historique"""
@@ -844,6 +1385,9 @@ class SecurityManager:
         query += " ORDER BY timestamp DESC LIMIT ?"
         params.append(limit)
         
+        # Inclure les événements encore en attente d'écriture
+        self._flush_pending_writes()
+        
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(query, params)
@@ -869,6 +1413,8 @@ class SecurityManager:
     
     def get_security_dashboard(self) -> Dict[str, Any]:
         """Récupère le tableau de bord de sécurité"""
+        self._flush_pending_writes()
+        
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             
@@ -913,7 +1459,16 @@ class SecurityManager:
             'active_sessions': active_sessions,
             'locked_accounts': locked_accounts,
             'blocked_ips': blocked_ips_count,
+            'tracked_ips': len(self.intrusion_detection['failed_logins']),
+            'dropped_security_events': self.dropped_security_events,
             'recent_events': [event.to_dict() for event in recent_events],
+            'caches': {
+                'users': self.user_cache.get_stats(),
+                'ip_whitelist': self.whitelist_cache.get_stats(),
+                'jwt_tokens': self.token_cache.get_stats(),
+                'sessions': self.session_cache.get_stats(),
+                'revoked_tokens': len(self.revoked_tokens)
+            },
             'generated_at': datetime.now().isoformat()
         }
     
@@ -942,12 +1497,26 @@ class SecurityManager:
                     # Nettoyer les IPs bloquées expirées
                     now = datetime.now()
                     expired_ips = [
-                        ip for ip, blocked_until in self.intrusion_detection['blocked_ips'].items()
+                        ip for ip, blocked_until in list(self.intrusion_detection['blocked_ips'].items())
                         if now >= blocked_until
                     ]
                     
                     for ip in expired_ips:
-                        del self.intrusion_detection['blocked_ips'][ip]
+                        self.intrusion_detection['blocked_ips'].pop(ip, None)
+                    
+                    with sqlite3.connect(self.db_path) as conn:
+                        conn.execute("DELETE FROM ip_blocklist WHERE blocked_until <= ?", (time.time(),))
+                    
+                    self.intrusion_detection['failed_logins'].purge_expired()
+                    
+                    # Oublier les révocations de tokens expirés
+                    now_epoch = time.time()
+                    with self.revoked_tokens_lock:
+                        expired_digests = [d for d, exp in self.revoked_tokens.items() if exp < now_epoch]
+                        for digest in expired_digests:
+                            del self.revoked_tokens[digest]
+                    with sqlite3.connect(self.db_path) as conn:
+                        conn.execute("DELETE FROM revoked_tokens WHERE expires_at < ?", (now_epoch,))
                     
                     time.sleep(300)  # 5 minutes
                     
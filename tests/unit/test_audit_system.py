@@ -0,0 +1,55 @@
+import sqlite3
+from datetime import datetime, timedelta
+import pytest
+from backend.substans_ai_megacabinet.audit_system import AuditSystem, AuditLevel, AuditCategory
+
+class TestAuditArchive:
+    @pytest.fixture
+    def audit(self, tmp_path):
+        archive_path = tmp_path / "archive"
+        archive_path.mkdir()
+        audit = AuditSystem(str(tmp_path / "audit.db"), str(archive_path))
+        audit.config['archive_chunk_size'] = 4
+        return audit
+
+    def _log_old_events(self, audit, users):
+        category = list(AuditCategory)[0]
+        for user_id in users:
+            audit.log_event(AuditLevel.INFO, category, "test_event", "read",
+                            f"Accès de {user_id}", user_id=user_id)
+
+        # Événements antérieurs au seuil d'archivage, dans l'ordre d'insertion
+        start = datetime.now() - timedelta(days=audit.config['archive_after_days'] + 10)
+        with sqlite3.connect(audit.db_path) as conn:
+            rowids = [rowid for (rowid,) in conn.execute("SELECT rowid FROM audit_events ORDER BY rowid")]
+            for offset, rowid in enumerate(rowids):
+                conn.execute("UPDATE audit_events SET timestamp = ? WHERE rowid = ?",
+                             ((start + timedelta(minutes=offset)).isoformat(), rowid))
+
+    def test_archived_events_round_trip(self, audit):
+        self._log_old_events(audit, ["u1", "u2", "u3"] * 3)
+        before = {event.id: event for event in audit.get_audit_events()}
+
+        audit._archive_old_events()
+
+        with sqlite3.connect(audit.db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0] == 0
+            assert conn.execute("SELECT COUNT(*) FROM audit_archive_segments").fetchone()[0] == 3
+
+        assert audit.get_audit_events(include_archived=False) == []
+        after = audit.get_audit_events()
+        assert [event.id for event in after] == list(before)
+        for event in after:
+            assert event == before[event.id]
+
+    def test_archived_events_filtered_by_user(self, audit):
+        self._log_old_events(audit, ["u1"] * 4 + ["u2"] * 4)
+        audit._archive_old_events()
+
+        events = audit.get_audit_events(user_id="u2")
+        assert len(events) == 4
+        assert {event.user_id for event in events} == {"u2"}
+
+        events = audit.get_audit_events(user_id="u2", limit=2)
+        assert len(events) == 2
+        assert events[0].timestamp > events[1].timestamp
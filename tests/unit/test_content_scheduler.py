@@ -0,0 +1,84 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from backend.substans_ai_megacabinet.content_scheduler import (
+    PlatformCalendarIndex, ScheduledContent, Platform, PublicationStatus
+)
+
+CONTENT_TYPES = ["insight", "market_update", "tech_breakthrough"]
+
+def make_content(index, scheduled_for, content_type):
+    return ScheduledContent(
+        id=f"content_{index}",
+        platform=Platform.LINKEDIN,
+        content="Contenu de test",
+        scheduled_for=scheduled_for,
+        status=PublicationStatus.SCHEDULED,
+        created_at=scheduled_for,
+        content_type=content_type,
+        source_intelligence_id="intel_test",
+        estimated_metrics={}
+    )
+
+def linear_has_conflict(contents, candidate, min_interval, content_type, content_interval):
+    """Vérification d'origine : parcours de tous les contenus programmés"""
+    for existing in contents:
+        time_diff = abs((existing.scheduled_for - candidate).total_seconds())
+        if time_diff < min_interval.total_seconds():
+            return True
+        if existing.content_type == content_type and time_diff < content_interval.total_seconds():
+            return True
+    return False
+
+class TestPlatformCalendarIndex:
+    @pytest.fixture
+    def calendar(self):
+        rng = random.Random(42)
+        start = datetime(2025, 1, 6, 8, 0)
+        contents = [
+            make_content(i, start + timedelta(minutes=rng.randrange(0, 60 * 24 * 30, 15)),
+                         rng.choice(CONTENT_TYPES))
+            for i in range(300)
+        ]
+        index = PlatformCalendarIndex()
+        for content in contents:
+            index.add(content)
+        return index, contents, rng, start
+
+    @pytest.mark.parametrize("min_hours,content_hours", [(4, 24), (2, 2), (6, 48), (0, 72)])
+    def test_conflicts_match_linear_scan(self, calendar, min_hours, content_hours):
+        index, contents, rng, start = calendar
+        min_interval = timedelta(hours=min_hours)
+        content_interval = timedelta(hours=content_hours)
+
+        for _ in range(500):
+            candidate = start + timedelta(minutes=rng.randrange(-60 * 24, 60 * 24 * 31, 5))
+            content_type = rng.choice(CONTENT_TYPES)
+            expected = linear_has_conflict(contents, candidate, min_interval, content_type, content_interval)
+            blocked_until = index.conflict_end(candidate, min_interval, content_type, content_interval)
+            assert (blocked_until is not None) == expected
+            if blocked_until is not None:
+                assert blocked_until > candidate
+
+    def test_conflicts_match_linear_scan_after_removals(self, calendar):
+        index, contents, rng, start = calendar
+        removed = rng.sample(contents, 150)
+        for content in removed:
+            index.remove(content)
+        remaining = [content for content in contents if content not in removed]
+        assert len(index) == len(remaining)
+
+        min_interval, content_interval = timedelta(hours=4), timedelta(hours=24)
+        for _ in range(500):
+            candidate = start + timedelta(minutes=rng.randrange(0, 60 * 24 * 30, 5))
+            content_type = rng.choice(CONTENT_TYPES)
+            expected = linear_has_conflict(remaining, candidate, min_interval, content_type, content_interval)
+            blocked_until = index.conflict_end(candidate, min_interval, content_type, content_interval)
+            assert (blocked_until is not None) == expected
+
+    def test_daily_and_monthly_counts(self, calendar):
+        index, contents, _, _ = calendar
+        for day in {content.scheduled_for.date() for content in contents}:
+            assert index.daily_counts[day] == sum(1 for c in contents if c.scheduled_for.date() == day)
+        total = sum(count for count in index.monthly_counts.values())
+        assert total == len(contents)
@@ -0,0 +1,75 @@
+import sqlite3
+import pytest
+import backend.substans_ai_megacabinet.encryption_system as encryption_system
+from backend.substans_ai_megacabinet.encryption_system import EncryptionSystem, EncryptionAlgorithm
+
+class FailingSqlite:
+    """Module sqlite3 dont toutes les connexions échouent (base verrouillée)"""
+    OperationalError = sqlite3.OperationalError
+    Row = sqlite3.Row
+
+    @staticmethod
+    def connect(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+class TestEncryptionSystem:
+    @pytest.fixture
+    def paths(self, tmp_path):
+        return str(tmp_path / "encryption.db"), str(tmp_path / "keystore")
+
+    @pytest.fixture
+    def system(self, paths):
+        system = EncryptionSystem(*paths)
+        # Pas d'écriture différée pendant le test : les flush sont explicites
+        system.config['write_behind_interval'] = 3600
+        return system
+
+    def _db_usage_count(self, db_path, key_id):
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute(
+                "SELECT usage_count FROM encryption_keys WHERE id = ?", (key_id,)
+            ).fetchone()[0]
+
+    def test_max_usage_enforced_across_instances(self, paths, system):
+        other = EncryptionSystem(*paths)
+        key_id = system.generate_key("limited", EncryptionAlgorithm.AES_256_GCM, max_usage=8)
+
+        successes = 0
+        for instance in (system, other) * 6:
+            try:
+                instance.encrypt_data(b"payload", key_id=key_id)
+                successes += 1
+            except ValueError:
+                pass
+
+        assert successes == 8
+        assert self._db_usage_count(paths[0], key_id) == 8
+
+    def test_unused_leases_are_released(self, paths, system):
+        key_id = system.generate_key("leased", EncryptionAlgorithm.AES_256_GCM, max_usage=1000)
+
+        system.encrypt_data(b"payload", key_id=key_id)
+        assert self._db_usage_count(paths[0], key_id) > 1  # bloc réservé
+
+        system.release_usage_leases()
+        assert self._db_usage_count(paths[0], key_id) == 1
+
+    def test_flush_failure_requeues_pending_writes(self, system, monkeypatch):
+        key_id = system.generate_key("unlimited", EncryptionAlgorithm.AES_256_GCM)
+        system.flush_pending_writes()
+
+        system.encrypt_data(b"payload", key_id=key_id)
+        pending_usage = dict(system.pending_usage)
+        pending_operations = list(system.pending_operations)
+        assert pending_usage and pending_operations
+
+        monkeypatch.setattr(encryption_system, "sqlite3", FailingSqlite)
+        system.flush_pending_writes()
+
+        assert system.pending_usage == pending_usage
+        assert system.pending_operations == pending_operations
+
+        monkeypatch.undo()
+        system.flush_pending_writes()
+        assert system.pending_operations == []
+        assert self._db_usage_count(system.db_path, key_id) == pending_usage[key_id]
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+import backend.substans_ai_megacabinet.file_processor as file_processor
+from backend.substans_ai_megacabinet.file_processor import FileProcessor
+
+class TestDeferredCsvExtraction:
+    @pytest.fixture
+    def processor(self, tmp_path, monkeypatch):
+        # Petits seuils : extraction différée en plusieurs blocs
+        monkeypatch.setattr(file_processor, "LAZY_CSV_SIZE_THRESHOLD", 1024)
+        monkeypatch.setattr(file_processor, "PREVIEW_ROWS", 50)
+        monkeypatch.setattr(file_processor, "CSV_CHUNK_ROWS", 300)
+        return FileProcessor(knowledge_base_path=str(tmp_path / "kb"), background_extraction=False)
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        rows = [
+            {
+                'id': i,
+                'amount': round((i * 37 % 101) * 1.25 - 40, 2),
+                'quantity': (i * 13) % 7 if i % 11 else None,
+                'label': f"item \"{i}\"\nligne" if i % 97 == 0 else f"item {i}"
+            }
+            for i in range(1000)
+        ]
+        path = tmp_path / "data.csv"
+        pd.DataFrame(rows).to_csv(path, index=False)
+        return str(path)
+
+    def test_deferred_stats_match_pandas_describe(self, processor, csv_path):
+        result = processor.process_files([csv_path])[0]
+        assert result['extraction_status'] == 'partial'
+
+        while processor.continue_deferred_extractions():
+            pass
+
+        record = processor.get_file_record(result['file_hash'])
+        assert record['extraction_status'] == 'complete'
+
+        df = pd.read_csv(csv_path)
+        expected = df.describe()
+        assert record['rows'] == len(df)
+        assert set(record['summary_stats']) == set(expected.columns)
+        for column, stats in record['summary_stats'].items():
+            for name in ('count', 'mean', 'std', 'min', 'max'):
+                assert stats[name] == pytest.approx(expected[column][name], rel=1e-9, abs=1e-9)
+
+    def test_failed_extraction_is_not_reused(self, processor, csv_path):
+        file_hash = processor.process_files([csv_path])[0]['file_hash']
+        processor._finish_deferred_extraction(file_hash, 'csv', {}, error="fichier tronqué")
+        assert processor.get_extraction_status(file_hash)['extraction_status'] == 'failed'
+
+        result = processor.process_files([csv_path])[0]
+        assert result['extraction_status'] == 'partial'
+        assert processor.get_extraction_status(file_hash)['extraction_status'] == 'partial'